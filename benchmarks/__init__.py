@@ -0,0 +1,3 @@
+"""
+Benchmarks for the calculator and the Textual application.
+"""
@@ -0,0 +1,230 @@
+"""
+Throughput of the calculator: scalar, batch, compiled, discounted cash
+flow, cache hits, streaming, usage events, sweeps, ranking and sensitivity reports.
+
+Run with: python -m benchmarks.bench_calculator
+"""
+
+import io
+import json
+from functools import partial
+
+import numpy as np
+
+from src.calculator import (
+    CashFlowTerms,
+    UsageEstimator,
+    UtilityCache,
+    build_lookup_tables,
+    calculate_discounted_batch,
+    calculate_discounted_utilities,
+    calculate_utilities,
+    calculate_utilities_batch,
+    calculate_utilities_compiled,
+    encode_purchases,
+    get_scoring_table,
+    rank_options,
+    score_options,
+    score_purchase,
+    select_within_budget,
+    sensitivity_report,
+    sensitivity_scenarios,
+    sweep_probabilities,
+)
+from src.scoring import score_stream
+from src.scoring.usage import ingest_usage_events
+
+from .common import best_time, random_purchases
+
+
+def bench_scalar(count: int) -> dict[str, float]:
+    purchases = random_purchases(count)
+
+    def reference():
+        for purchase in purchases:
+            calculate_utilities(purchase)
+
+    def compiled():
+        for purchase in purchases:
+            score_purchase(purchase)
+
+    return {
+        "records_per_s": count / best_time(reference),
+        "compiled_records_per_s": count / best_time(compiled),
+    }
+
+
+def bench_batch(count: int) -> dict[str, float]:
+    purchases = random_purchases(count)
+    lookup = build_lookup_tables()
+    table = get_scoring_table()
+    columns = encode_purchases(purchases, lookup)
+    compiled_columns = encode_purchases(purchases, table.lookup)
+
+    return {
+        "encode_records_per_s": count
+        / best_time(lambda: encode_purchases(purchases, lookup), repeat=1),
+        "records_per_s": count
+        / best_time(lambda: calculate_utilities_batch(columns, lookup)),
+        "compiled_records_per_s": count
+        / best_time(lambda: calculate_utilities_compiled(compiled_columns, table)),
+    }
+
+
+def bench_discounted(count: int) -> dict[str, float]:
+    """Discounted cash flow with recurring costs, resale and breakeven month."""
+    lookup = build_lookup_tables()
+    columns = encode_purchases(random_purchases(count), lookup)
+    terms = CashFlowTerms(
+        monthly_subscription=np.random.default_rng(0).uniform(0, 50, count)
+    )
+    return {
+        "records_per_s": count
+        / best_time(lambda: calculate_discounted_batch(columns, terms, lookup)),
+    }
+
+
+def bench_cache(count: int) -> dict[str, float]:
+    """Cache hits against the calculation they replace.
+
+    A hit costs about as much as calculate_utilities, so the cache only pays
+    off in front of something slower, such as a discounted cash flow.
+    """
+    purchases = random_purchases(count)
+    discounted = partial(calculate_discounted_utilities, tables=build_lookup_tables())
+
+    def score_all(calculate):
+        for purchase in purchases:
+            calculate(purchase)
+
+    results = {}
+    for name, calculate in (
+        ("scalar", calculate_utilities),
+        ("discounted", discounted),
+    ):
+        # Every lookup is a hit once the first run has filled the cache
+        cache = UtilityCache(maxsize=count, calculate=calculate)
+        results[f"{name}_records_per_s"] = count / best_time(
+            partial(score_all, calculate)
+        )
+        results[f"{name}_cache_hit_records_per_s"] = count / best_time(
+            partial(score_all, cache)
+        )
+    return results
+
+
+def bench_streaming(count: int, chunk_size: int = 10_000) -> dict[str, float]:
+    data = "".join(json.dumps(purchase) + "\n" for purchase in random_purchases(count))
+
+    def run(engine: str, explain: bool = False):
+        score_stream(
+            io.StringIO(data),
+            io.StringIO(),
+            chunk_size=chunk_size,
+            engine=engine,
+            explain=explain,
+        )
+
+    return {
+        "records_per_s": count / best_time(lambda: run("batch"), repeat=1),
+        "compiled_records_per_s": count / best_time(lambda: run("compiled"), repeat=1),
+        "explain_records_per_s": count
+        / best_time(lambda: run("batch", explain=True), repeat=1),
+    }
+
+
+def bench_usage(count: int) -> dict[str, float]:
+    """Usage events streamed from JSONL into the estimator."""
+    data = "".join(
+        json.dumps(
+            {
+                "category": purchase["category"],
+                "life_areas": purchase["life_areas"],
+                "used": i % 3 == 0,
+            }
+        )
+        + "\n"
+        for i, purchase in enumerate(random_purchases(count))
+    )
+    seconds = best_time(
+        lambda: ingest_usage_events(io.StringIO(data), UsageEstimator()), repeat=1
+    )
+    return {"events_per_s": count / seconds}
+
+
+def bench_sweep(points: int, decisions: int) -> dict[str, float]:
+    results = calculate_utilities(random_purchases(1)[0])
+    batch = calculate_utilities_batch(encode_purchases(random_purchases(decisions)))
+    grid = np.linspace(0.0, 1.0, points)
+    small_grid = np.linspace(0.0, 1.0, 101)
+
+    return {
+        "grid_points": points * points,
+        "single_ms": best_time(lambda: sweep_probabilities(results, grid, grid)) * 1000,
+        "batch_decisions": decisions,
+        "batch_ms": best_time(
+            lambda: sweep_probabilities(batch, small_grid, small_grid)
+        )
+        * 1000,
+    }
+
+
+def bench_ranking(candidates: int, k: int = 100) -> dict[str, float]:
+    purchases = random_purchases(candidates)
+    scores = score_options(purchases)
+    # Small enough for the exact solver: 1000 candidates over 2000 budget steps
+    small = {name: value[:1000] for name, value in scores.items()}
+
+    def rank_and_select():
+        ranked = rank_options(purchases, k)
+        select_within_budget(scores["price"], scores["gain"], 10_000)
+        return ranked
+
+    return {
+        "candidates": candidates,
+        "rank_ms": best_time(lambda: rank_options(purchases, k)) * 1000,
+        "greedy_ms": best_time(
+            lambda: select_within_budget(scores["price"], scores["gain"], 10_000)
+        )
+        * 1000,
+        "dp_ms": best_time(
+            lambda: select_within_budget(small["price"], small["gain"], 2000)
+        )
+        * 1000,
+        "rank_and_select_ms": best_time(rank_and_select) * 1000,
+    }
+
+
+def bench_sensitivity() -> dict[str, float]:
+    purchase = random_purchases(1)[0]
+    scenarios = sensitivity_scenarios(purchase)
+
+    def full_report():
+        return sensitivity_report(sensitivity_scenarios(purchase), 0.5, 0.1)
+
+    return {
+        "report_ms": best_time(full_report, repeat=100) * 1000,
+        "report_from_scenarios_ms": best_time(
+            lambda: sensitivity_report(scenarios, 0.5, 0.1), repeat=100
+        )
+        * 1000,
+    }
+
+
+def run(quick: bool = False) -> dict[str, dict[str, float]]:
+    scale = 10 if quick else 1
+    return {
+        "scalar": bench_scalar(100_000 // scale),
+        "batch": bench_batch(1_000_000 // scale),
+        "discounted": bench_discounted(1_000_000 // scale),
+        "cache": bench_cache(5_000 // scale),
+        "streaming": bench_streaming(100_000 // scale),
+        "usage": bench_usage(1_000_000 // scale),
+        "sweep": bench_sweep(1001, 1000 // scale),
+        "ranking": bench_ranking(100_000 // scale),
+        "sensitivity": bench_sensitivity(),
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
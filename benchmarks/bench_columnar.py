@@ -0,0 +1,65 @@
+"""
+Throughput of Parquet and Arrow scoring against JSONL streaming.
+
+Skipped, with an empty result, when pyarrow is not installed.
+
+Run with: python -m benchmarks.bench_columnar [COUNT]
+"""
+
+import io
+import json
+import os
+import sys
+import tempfile
+
+from src.scoring.stream import score_stream
+
+from .common import best_time, random_purchases
+
+
+def run(count: int = 1_000_000) -> dict[str, dict[str, float]]:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        from src.scoring.columnar import score_columnar
+    except ImportError:
+        return {}
+
+    purchases = random_purchases(count)
+    with tempfile.TemporaryDirectory() as tmp:
+        jsonl_path = os.path.join(tmp, "input.jsonl")
+        parquet_path = os.path.join(tmp, "input.parquet")
+        arrow_path = os.path.join(tmp, "input.arrow")
+        with open(jsonl_path, "w", encoding="utf-8") as file:
+            file.writelines(json.dumps(purchase) + "\n" for purchase in purchases)
+        table = pa.Table.from_pylist(purchases)
+        pq.write_table(table, parquet_path)
+        with pa.ipc.new_file(arrow_path, table.schema) as writer:
+            writer.write_table(table)
+        del purchases, table
+
+        def jsonl() -> None:
+            with open(jsonl_path, encoding="utf-8") as file:
+                score_stream(file, io.StringIO(), engine="compiled")
+
+        def columnar(path: str, input_format: str, output_format: str) -> None:
+            output = os.path.join(tmp, f"output.{output_format}")
+            score_columnar(path, output, input_format, output_format, engine="compiled")
+
+        return {
+            "columnar": {
+                "jsonl_records_per_s": count / best_time(jsonl, repeat=1),
+                "parquet_records_per_s": count
+                / best_time(lambda: columnar(parquet_path, "parquet", "parquet")),
+                "arrow_records_per_s": count
+                / best_time(lambda: columnar(arrow_path, "arrow", "arrow")),
+                "parquet_to_jsonl_records_per_s": count
+                / best_time(lambda: columnar(parquet_path, "parquet", "jsonl")),
+            }
+        }
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(json.dumps(run(count), indent=2))
@@ -0,0 +1,55 @@
+"""
+Insert rate and page latency of the decision history store.
+
+Run with: python -m benchmarks.bench_history [COUNT]
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+from src.calculator import calculate_utilities
+from src.history import Cursor, DecisionStore
+
+from .common import best_time, random_purchases
+
+DISTINCT_ITEMS = 1000
+
+
+def _decisions(count: int):
+    for i, purchase in enumerate(random_purchases(count)):
+        purchase["item_name"] = f"Item {i % DISTINCT_ITEMS}"
+        yield purchase, calculate_utilities(purchase), 0.5, 0.1, float(i)
+
+
+def run(count: int = 1_000_000) -> dict[str, dict[str, float]]:
+    with (
+        tempfile.TemporaryDirectory() as directory,
+        DecisionStore(Path(directory) / "history.sqlite3") as store,
+    ):
+        decisions = list(_decisions(count))
+        insert_s = best_time(lambda: store.record_many(decisions), repeat=1)
+
+        # Rows were inserted in created_at order, so ids follow it
+        middle = Cursor(float(count // 2), count // 2 + 1)
+
+        def page_ms(**kwargs) -> float:
+            return best_time(lambda: store.page(**kwargs), repeat=5) * 1000
+
+        return {
+            "history": {
+                "rows": count,
+                "insert_records_per_s": count / insert_s,
+                "latest_page_ms": page_ms(),
+                "deep_page_ms": page_ms(after=middle),
+                "item_name_page_ms": page_ms(item_name="item 7"),
+                "category_page_ms": page_ms(category="qol"),
+                "income_level_page_ms": page_ms(income_level="high"),
+            }
+        }
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(json.dumps(run(count), indent=2))
@@ -0,0 +1,73 @@
+"""
+Memory per record of the PurchaseData and UtilityMetrics representations.
+
+Run with: python -m benchmarks.bench_memory [COUNT]
+"""
+
+import sys
+import tracemalloc
+
+from src.calculator import (
+    PurchaseRecord,
+    UtilityRecord,
+    build_lookup_tables,
+    calculate_utilities_batch,
+    encode_purchases,
+    pack_purchases,
+    pack_utilities,
+)
+from src.calculator.batch import UTILITY_COLUMNS
+
+from .common import random_purchases
+
+
+def measure(build) -> tuple[int, object]:
+    """Bytes allocated and kept alive by ``build()``."""
+    tracemalloc.start()
+    try:
+        result = build()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return size, result
+
+
+def utility_rows(batch) -> zip:
+    """Fresh float objects per record, as scalar results would hold."""
+    return zip(*(batch[name].tolist() for name in UTILITY_COLUMNS))
+
+
+def run(count: int = 100_000) -> dict[str, float]:
+    """Bytes per record of each representation."""
+    purchases = random_purchases(count)
+    tables = build_lookup_tables()
+    batch = calculate_utilities_batch(encode_purchases(purchases, tables), tables)
+
+    cases = {
+        "purchase_dict": lambda: [
+            {**purchase, "life_areas": list(purchase["life_areas"])}
+            for purchase in purchases
+        ],
+        "purchase_record": lambda: [
+            PurchaseRecord.from_dict(purchase) for purchase in purchases
+        ],
+        "purchase_structured": lambda: pack_purchases(purchases, tables),
+        "utility_dict": lambda: [
+            dict(zip(UTILITY_COLUMNS, row)) for row in utility_rows(batch)
+        ],
+        "utility_record": lambda: [UtilityRecord(*row) for row in utility_rows(batch)],
+        "utility_structured": lambda: pack_utilities(batch),
+    }
+    return {name: measure(build)[0] / count for name, build in cases.items()}
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = sys.argv[1:] if argv is None else argv
+    count = int(args[0]) if args else 100_000
+    print(f"Bytes per record ({count:,} records; item names shared)")
+    for name, size in run(count).items():
+        print(f"  {name:<22}{size:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
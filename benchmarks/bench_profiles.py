@@ -0,0 +1,98 @@
+"""
+Cost of weight profiles: scoring with a loaded profile against the
+built-in weights, activation time and scoring while profiles are swapped.
+
+Run with: python -m benchmarks.bench_profiles [COUNT]
+"""
+
+import json
+import sys
+import threading
+import time
+
+from src.calculator import (
+    activate_profile,
+    build_scoring_table,
+    calculate_utilities_compiled,
+    encode_purchases,
+    parse_profile,
+)
+from src.scoring.stream import score_chunk
+
+from .common import best_time, random_purchases
+
+PROFILE = parse_profile(
+    {
+        "version": "bench",
+        "life_area_weights": {"career": 1.2, "personal": 0.8, "health": 1.5},
+        "category_multipliers": {"qol": 1.1, "professional": 1.3},
+    }
+)
+
+CHUNK_SIZE = 10_000
+
+
+def _score_chunks(chunk: list[dict], chunks: int) -> float:
+    """Seconds to score ``chunk`` ``chunks`` times with the active profile."""
+    return best_time(
+        lambda: [score_chunk(chunk, engine="compiled") for _ in range(chunks)],
+        repeat=1,
+    )
+
+
+def _score_while_swapping(chunk: list[dict], chunks: int) -> tuple[float, int]:
+    """Seconds to score while another thread swaps profiles, and the swaps."""
+    stop = threading.Event()
+    swaps = 0
+
+    def swap():
+        nonlocal swaps
+        while not stop.is_set():
+            activate_profile(PROFILE if swaps % 2 else None)
+            swaps += 1
+            time.sleep(0.001)
+
+    thread = threading.Thread(target=swap)
+    thread.start()
+    try:
+        return _score_chunks(chunk, chunks), swaps
+    finally:
+        stop.set()
+        thread.join()
+
+
+def run(count: int = 1_000_000) -> dict[str, dict[str, float]]:
+    purchases = random_purchases(count)
+    builtin = build_scoring_table()
+    loaded = build_scoring_table(profile=PROFILE)
+    columns = encode_purchases(purchases, builtin.lookup)
+    chunk = purchases[:CHUNK_SIZE]
+    chunks = max(1, count // len(chunk))
+
+    def records_per_s(table) -> float:
+        return count / best_time(lambda: calculate_utilities_compiled(columns, table))
+
+    try:
+        activate_ms = best_time(lambda: activate_profile(PROFILE), repeat=5) * 1000
+        swapping_s, swaps = _score_while_swapping(chunk, chunks)
+        activate_profile(None)
+        steady_s = _score_chunks(chunk, chunks)
+    finally:
+        activate_profile(None)
+
+    scored = chunks * len(chunk)
+    return {
+        "profiles": {
+            "builtin_records_per_s": records_per_s(builtin),
+            "loaded_records_per_s": records_per_s(loaded),
+            "activate_ms": activate_ms,
+            "score_chunk_records_per_s": scored / steady_s,
+            "swapping_records_per_s": scored / swapping_s,
+            "swaps": swaps,
+        }
+    }
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(json.dumps(run(count), indent=2))
@@ -0,0 +1,129 @@
+"""
+Many TUI sessions in one process, as when the app is hosted for several
+analysts at once.
+
+Every session runs headless through Textual's pilot on the same event loop
+and calculator worker. Memory is the Python heap traced while the sessions
+start and open a ResultsScreen, after one warm-up session, divided by the number of sessions. Latency
+is measured while every session types a new probability at once: the time
+until its recommendation is redrawn, debounce delay included, and how late
+the shared event loop runs a 1 ms timer meanwhile.
+
+Run with: python -m benchmarks.bench_sessions [--sessions 100]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+
+from .common import isolated_app, latency_summary, random_purchases
+
+LAG_INTERVAL = 0.001
+
+
+async def _session(
+    purchase, barrier: asyncio.Barrier, rounds: int, settles: list[float]
+) -> None:
+    """One session: open a ResultsScreen, then type once per round."""
+    from src.forms.results import ResultsScreen
+
+    app = isolated_app()
+    async with app.run_test(size=(100, 50)) as pilot:
+        await pilot.pause()
+        app.purchase_data = dict(purchase)
+        screen = ResultsScreen(app.purchase_data)
+        await app.push_screen(screen)
+        await screen.workers.wait_for_complete()
+        await pilot.pause()
+
+        await barrier.wait()  # every session is open
+        for i in range(rounds):
+            await barrier.wait()  # every session types at once
+            # Alternate between two values so every round changes the output
+            settles.append(await _settle(screen, "0.95" if i % 2 else "0.05"))
+        await barrier.wait()  # no session closes while others are typing
+
+
+async def _settle(screen, text: str) -> float:
+    """Type ``text`` as P(useful|buy) and wait until the result is redrawn."""
+    from textual.widgets import Input, Static
+
+    recommendation = screen.query_one("#recommendation", Static)
+    before = recommendation.render()
+    started = time.perf_counter()
+    screen.query_one("#p_useful_buy", Input).value = text
+    while recommendation.render() == before:
+        if time.perf_counter() - started > 10:
+            raise RuntimeError("ResultsScreen did not update")
+        await asyncio.sleep(0.002)
+    return time.perf_counter() - started
+
+
+async def _loop_lag(lags: list[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(LAG_INTERVAL)
+        lags.append(max(0.0, time.perf_counter() - started - LAG_INTERVAL))
+
+
+async def _sessions(sessions: int, rounds: int) -> dict[str, float]:
+    purchases = random_purchases(sessions + 1)
+    # Import and compile everything once, outside the measurements
+    await _session(purchases.pop(), asyncio.Barrier(1), 1, [])
+
+    barrier = asyncio.Barrier(sessions + 1)
+    settles, lags = [], []
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tasks = [
+        asyncio.create_task(_session(purchase, barrier, rounds, settles))
+        for purchase in purchases
+    ]
+    await barrier.wait()
+    heap = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_loop_lag(lags, stop))
+    for _ in range(rounds + 1):
+        await barrier.wait()
+    stop.set()
+    await asyncio.gather(probe, *tasks)
+
+    summary = {
+        "sessions": sessions,
+        "memory_per_session_kb": heap / sessions / 1024,
+    }
+    summary.update(
+        (f"settle_{name}", value) for name, value in latency_summary(settles).items()
+    )
+    summary.update(
+        (f"loop_lag_{name}", value) for name, value in latency_summary(lags).items()
+    )
+    return summary
+
+
+def bench_sessions(sessions: int, rounds: int) -> dict[str, float]:
+    return asyncio.run(_sessions(sessions, rounds))
+
+
+def run(quick: bool = False) -> dict[str, dict[str, float]]:
+    sessions = 20 if quick else 100
+    return {"concurrent_sessions": bench_sessions(sessions, 3 if quick else 5)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Memory and UI latency of many TUI sessions in one process."
+    )
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps(bench_sessions(args.sessions, args.rounds), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Startup time of the Textual app, ResultsScreen keystroke latency, the
+time to redraw the expected-utility chart and the time to rescore the bulk
+editor after one edit.
+
+Both run headless through Textual's pilot.
+Run with: python -m benchmarks.bench_tui
+"""
+
+import asyncio
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from .common import isolated_app, latency_summary, random_purchases
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def bench_startup(runs: int) -> dict[str, float]:
+    """Cold start in a fresh interpreter, best of ``runs``."""
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.startup_probe"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        process_ms = (time.perf_counter() - started) * 1000
+        samples.append(
+            {**json.loads(output.splitlines()[-1]), "process_ms": process_ms}
+        )
+    return {
+        key: min(sample[key] for sample in samples)
+        for key in ("import_ms", "first_screen_ms", "process_ms")
+    }
+
+
+async def _results_latency(bursts: int) -> tuple[list[float], list[float], int]:
+    from textual.widgets import Input, Static
+
+    from src.forms.results import ResultsScreen
+
+    purchase = random_purchases(1)[0]
+    app = isolated_app()
+    keystrokes, settles = [], []
+    recomputes = 0
+    async with app.run_test(size=(100, 50)) as pilot:
+        await pilot.pause()
+        app.purchase_data = purchase
+        screen = ResultsScreen(purchase)
+        await app.push_screen(screen)
+        await pilot.pause()
+
+        update = screen._update_expected_utilities
+
+        def counted_update():
+            nonlocal recomputes
+            recomputes += 1
+            update()
+
+        screen._update_expected_utilities = counted_update
+        probability = screen.query_one("#p_useful_buy", Input)
+        recommendation = screen.query_one("#recommendation", Static)
+        probability.focus()
+        await pilot.pause()
+
+        for i in range(bursts):
+            # Alternate between two values so every burst changes the output
+            text = "0.95" if i % 2 else "0.05"
+            probability.value = ""
+            await pilot.pause(screen.DEBOUNCE_DELAY * 2)
+            before = recommendation.render()
+            for char in text:
+                started = time.perf_counter()
+                await pilot.press(char)
+                keystrokes.append(time.perf_counter() - started)
+            typed = time.perf_counter()
+            while recommendation.render() == before:
+                if time.perf_counter() - typed > 2:
+                    raise RuntimeError("ResultsScreen did not update")
+                await pilot.pause(0.002)
+            settles.append(time.perf_counter() - typed)
+    return keystrokes, settles, recomputes
+
+
+def bench_results_latency(bursts: int) -> dict[str, float]:
+    """Latency of typing a probability into ResultsScreen.
+
+    ``keystroke_*`` is the time to handle one key event and ``settle_*`` the
+    time from the last key until the recommendation is redrawn, debounce
+    delay included.
+    """
+    keystrokes, settles, recomputes = asyncio.run(_results_latency(bursts))
+    summary = {
+        f"keystroke_{name}": value
+        for name, value in latency_summary(keystrokes).items()
+    }
+    summary.update(
+        (f"settle_{name}", value) for name, value in latency_summary(settles).items()
+    )
+    summary["recomputes_per_burst"] = recomputes / bursts
+    return summary
+
+
+async def _chart_latency(
+    size: tuple[int, int], changes: int
+) -> tuple[list[float], float, float]:
+    from textual.app import App
+
+    from src.calculator import calculate_utilities
+    from src.forms.chart import SweepChart
+
+    chart = SweepChart(calculate_utilities(random_purchases(1)[0]))
+
+    class ChartApp(App):
+        CSS = "SweepChart { height: 1fr; }"
+
+        def compose(self):
+            yield chart
+
+    app = ChartApp()
+    redraws, rows = [], 0
+    async with app.run_test(size=size) as pilot:
+        await pilot.pause()
+        started = time.perf_counter()
+        chart._layout = None  # rebuild every cached row
+        for y in range(chart.size.height):
+            chart.render_line(y)
+        full = time.perf_counter() - started
+
+        # Time spent rendering the rows Textual asks for after each change
+        render_line = chart.render_line
+        spent = []
+
+        def timed_render_line(y):
+            started = time.perf_counter()
+            line = render_line(y)
+            spent.append(time.perf_counter() - started)
+            return line
+
+        chart.render_line = timed_render_line
+        for i in range(changes):
+            spent.clear()
+            started = time.perf_counter()
+            # Move both probabilities, the worst case for the rows touched
+            chart.set_probabilities(i % 20 / 20, (i * 7 + 3) % 20 / 20)
+            moved = time.perf_counter() - started
+            await pilot.pause()
+            redraws.append(moved + sum(spent))
+            rows += len(spent)
+    return redraws, full, rows / changes
+
+
+def bench_chart(size: tuple[int, int], changes: int) -> dict[str, float]:
+    """Latency of redrawing the chart after the probabilities change.
+
+    ``redraw_*`` covers moving the lines and markers and rendering every row
+    Textual repaints; ``full_ms`` is drawing the whole chart after a resize.
+    """
+    redraws, full, rows = asyncio.run(_chart_latency(size, changes))
+    summary = {
+        f"redraw_{name}": value for name, value in latency_summary(redraws).items()
+    }
+    summary["full_ms"] = full * 1000
+    summary["rows_per_redraw"] = rows
+    return summary
+
+
+async def _bulk_edit_latency(rows: int, edits: int) -> tuple[list[float], list[float]]:
+    from src.forms.bulk_edit import BulkEditScreen
+
+    app = isolated_app()
+    recomputes, redraws = [], []
+    async with app.run_test(size=(200, 50)) as pilot:
+        await pilot.pause()
+        screen = BulkEditScreen(random_purchases(rows))
+        await app.push_screen(screen)
+        await pilot.pause()
+        for i in range(edits):
+            started = time.perf_counter()
+            screen.edit_cell(i % rows, "price", f"{100 + i}")
+            recomputes.append(time.perf_counter() - started)
+            await pilot.pause()
+            redraws.append(time.perf_counter() - started)
+    return recomputes, redraws
+
+
+def bench_bulk_edit(rows: int, edits: int) -> dict[str, float]:
+    """Latency of one cell edit in a bulk editor of ``rows`` rows.
+
+    ``recompute_*`` covers validating the cell, scoring every row and
+    updating the changed cells; ``redraw_*`` also waits for the repaint.
+    """
+    recomputes, redraws = asyncio.run(_bulk_edit_latency(rows, edits))
+    summary = {
+        f"recompute_{name}": value
+        for name, value in latency_summary(recomputes).items()
+    }
+    summary.update(
+        (f"redraw_{name}", value) for name, value in latency_summary(redraws).items()
+    )
+    summary["rows"] = rows
+    return summary
+
+
+def run(quick: bool = False) -> dict[str, dict[str, float]]:
+    return {
+        "tui_startup": bench_startup(2 if quick else 5),
+        "results_latency": bench_results_latency(10 if quick else 50),
+        "chart_latency": bench_chart((400, 120), 50 if quick else 200),
+        "bulk_edit_latency": bench_bulk_edit(1000, 20 if quick else 100),
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
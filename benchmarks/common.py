@@ -0,0 +1,73 @@
+"""
+Shared helpers for the benchmarks.
+"""
+
+import os
+import random
+import statistics
+import tempfile
+import time
+from collections.abc import Callable
+
+from src.calculator import constants
+from src.calculator.utility_calculator import PurchaseData
+
+
+def random_purchases(count: int, seed: int = 0) -> list[PurchaseData]:
+    """Random PurchaseData records within the ranges the forms accept."""
+    rng = random.Random(seed)
+    life_areas = list(constants.LIFE_AREA_WEIGHTS)
+    return [
+        {
+            "item_name": f"Item {i}",
+            "price": round(rng.uniform(1, 5000), 2),
+            "income_level": rng.choice(list(constants.INCOME_WEIGHTS)),
+            "life_areas": rng.sample(life_areas, rng.randint(0, len(life_areas))),
+            "necessity": rng.choice(list(constants.NECESSITY_SCORES)),
+            "time_use": round(rng.uniform(0, 168), 1),
+            "use_probability": rng.choice(list(constants.USE_PROBABILITY_VALUES)),
+            "life_span": rng.randint(1, 600),
+            "category": rng.choice(list(constants.CATEGORY_MULTIPLIERS)),
+        }
+        for i in range(count)
+    ]
+
+
+def best_time(function: Callable[[], object], repeat: int = 3) -> float:
+    """Fastest wall-clock time of ``repeat`` calls, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def latency_summary(timings: list[float]) -> dict[str, float]:
+    """p50/p95/p99/max of a list of latencies in seconds, reported in ms."""
+    ordered = sorted(timings)
+
+    def percentile(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))] * 1000
+
+    return {
+        "p50_ms": statistics.median(ordered) * 1000,
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+# Holds a fresh directory for every app, removed when the benchmark exits
+_STATE = tempfile.TemporaryDirectory()
+
+
+def isolated_app(**options):
+    """DGUtilityAgency with in-memory history and its own empty usage and
+    template files, so a developer's own state cannot change the timings."""
+    from src.application.DGUtiliyAgency import DGUtilityAgency
+
+    directory = tempfile.mkdtemp(dir=_STATE.name)
+    options.setdefault("usage_path", os.path.join(directory, "usage.json"))
+    options.setdefault("templates_path", os.path.join(directory, "templates.json"))
+    return DGUtilityAgency(prefetch=False, history_path=":memory:", **options)
@@ -0,0 +1,145 @@
+"""
+Load test of the HTTP scoring service over keep-alive connections.
+
+Usage: python -m benchmarks.load_test [--url http://127.0.0.1:8765]
+                                      [--connections 64] [--requests 20000]
+                                      [--records-per-request 1]
+
+Without --url a server is started on a free local port for the run.
+Prints client-side p50/p99 latency and requests per second as JSON.
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from .common import latency_summary, random_purchases
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@contextmanager
+def local_server(*args: str):
+    """Run ``main.py serve`` on a free port and yield its URL."""
+    process = subprocess.Popen(
+        [sys.executable, "main.py", "serve", "--port", "0", *args],
+        cwd=ROOT,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        # Other startup messages (such as a loaded profile) may come first
+        line, match = "", None
+        for line in process.stderr:
+            match = re.search(r"http://\S+", line)
+            if match is not None or line.startswith("error:"):
+                break
+        if match is None:
+            raise RuntimeError(f"Server did not start: {line.strip()}")
+        yield match.group(0)
+    finally:
+        process.terminate()
+        process.wait()
+
+
+async def _client(
+    host: str, port: int, request: bytes, count: int, timings: list[float]
+) -> int:
+    """Send ``count`` requests over one connection; return failures."""
+    reader, writer = await asyncio.open_connection(host, port)
+    failures = 0
+    try:
+        for _ in range(count):
+            started = time.perf_counter()
+            writer.write(request)
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = int(re.search(rb"Content-Length: (\d+)", head).group(1))
+            await reader.readexactly(length)
+            timings.append(time.perf_counter() - started)
+            if not head.startswith(b"HTTP/1.1 200"):
+                failures += 1
+    finally:
+        writer.close()
+    return failures
+
+
+async def _load(
+    url: str, connections: int, requests: int, records_per_request: int
+) -> dict[str, float]:
+    parts = urlsplit(url)
+    records = random_purchases(records_per_request)
+    body = json.dumps(records[0] if records_per_request == 1 else records).encode()
+    request = (
+        f"POST /score HTTP/1.1\r\nHost: {parts.netloc}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n"
+    ).encode() + body
+
+    timings: list[float] = []
+    per_client = [requests // connections] * connections
+    for i in range(requests % connections):
+        per_client[i] += 1
+    started = time.perf_counter()
+    failures = await asyncio.gather(
+        *(
+            _client(parts.hostname, parts.port, request, count, timings)
+            for count in per_client
+            if count
+        )
+    )
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": requests,
+        "connections": connections,
+        "records_per_request": records_per_request,
+        "failures": sum(failures),
+        "requests_per_s": requests / elapsed,
+        "records_per_s": requests * records_per_request / elapsed,
+        **latency_summary(timings),
+    }
+
+
+def load_test(
+    url: str | None = None,
+    connections: int = 64,
+    requests: int = 20_000,
+    records_per_request: int = 1,
+) -> dict[str, float]:
+    """Run the load test against ``url``, or a local server when None."""
+    if url is not None:
+        return asyncio.run(_load(url, connections, requests, records_per_request))
+    with local_server() as local_url:
+        return asyncio.run(_load(local_url, connections, requests, records_per_request))
+
+
+def run(quick: bool = False) -> dict[str, dict[str, float]]:
+    requests = 2_000 if quick else 20_000
+    return {
+        "server": load_test(requests=requests),
+        "server_batched": load_test(requests=requests // 10, records_per_request=100),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load_test")
+    parser.add_argument("--url", help="Server to test (default: start one locally)")
+    parser.add_argument("--connections", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--records-per-request", type=int, default=1)
+    args = parser.parse_args(argv)
+    result = load_test(
+        args.url, args.connections, args.requests, args.records_per_request
+    )
+    print(json.dumps(result, indent=2))
+    return 1 if result["failures"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""
+Run the benchmark suite and save the results as JSON.
+
+Usage: python -m benchmarks.run [-o results.json] [--compare baseline.json]
+                                [--quick] [--only SUITE ...]
+
+With --compare, every metric is checked against the baseline and the run
+fails when one regresses by more than --threshold. Metrics ending in
+``_per_s`` are better when higher; every other timing or size is better
+when lower.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from . import (
+    bench_calculator,
+    bench_columnar,
+    bench_history,
+    bench_memory,
+    bench_profiles,
+    bench_sessions,
+    bench_tui,
+    load_test,
+)
+
+SUITES: dict[str, Callable[[bool], dict[str, dict[str, float]]]] = {
+    "calculator": bench_calculator.run,
+    "memory": lambda quick: {"memory": bench_memory.run(10_000 if quick else 100_000)},
+    "tui": bench_tui.run,
+    "history": lambda quick: bench_history.run(100_000 if quick else 1_000_000),
+    "server": load_test.run,
+    "profiles": lambda quick: bench_profiles.run(100_000 if quick else 1_000_000),
+    "columnar": lambda quick: bench_columnar.run(100_000 if quick else 1_000_000),
+    "sessions": bench_sessions.run,
+}
+
+DEFAULT_THRESHOLD = 0.10
+
+# Sizes and counts describing a case rather than measuring it
+_INFORMATIONAL = (
+    "grid_points",
+    "batch_decisions",
+    "candidates",
+    "rows",
+    "requests",
+    "connections",
+    "records_per_request",
+    "swaps",
+    "sessions",
+)
+
+
+def run_suites(names: list[str], quick: bool) -> dict:
+    results = {}
+    for name in names:
+        print(f"Running {name} benchmarks...", file=sys.stderr)
+        results.update(SUITES[name](quick))
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "quick": quick,
+        },
+        "results": results,
+    }
+
+
+def higher_is_better(metric: str) -> bool:
+    return metric.endswith("_per_s")
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Describe every metric that regressed by more than ``threshold``."""
+    regressions = []
+    for case, metrics in current["results"].items():
+        for metric, value in metrics.items():
+            previous = baseline.get("results", {}).get(case, {}).get(metric)
+            if previous is None or metric in _INFORMATIONAL or previous == 0:
+                continue
+            change = (value - previous) / previous
+            if higher_is_better(metric):
+                change = -change
+            if change > threshold:
+                regressions.append(
+                    f"{case}.{metric}: {previous:,.2f} -> {value:,.2f} "
+                    f"({change:+.0%} worse)"
+                )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run")
+    parser.add_argument("-o", "--output", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON file to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f"Allowed relative regression (default: {DEFAULT_THRESHOLD})",
+    )
+    parser.add_argument(
+        "--quick", action="store_true", help="Smaller inputs, for CI smoke runs"
+    )
+    parser.add_argument(
+        "--only", nargs="+", choices=list(SUITES), help="Run only these suites"
+    )
+    args = parser.parse_args(argv)
+
+    report = run_suites(args.only or list(SUITES), args.quick)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        regressions = compare(report, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+        print("No regressions.", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
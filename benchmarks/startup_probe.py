@@ -0,0 +1,44 @@
+"""
+Measure one cold start of the Textual app up to the welcome screen.
+
+Run in a fresh interpreter by bench_tui; prints a JSON object of timings.
+"""
+
+import time
+
+started = time.perf_counter()
+
+import asyncio
+import json
+import os
+import tempfile
+
+from src.application.DGUtiliyAgency import DGUtilityAgency
+from src.application.startup import StartupProfile
+
+
+async def main() -> dict[str, float]:
+    startup = StartupProfile(started=started)
+    startup.mark_imported()
+    # Own state files, so the developer's history, usage and templates are
+    # neither read nor written
+    with tempfile.TemporaryDirectory() as directory:
+        app = DGUtilityAgency(
+            startup=startup,
+            history_path=os.path.join(directory, "history.sqlite3"),
+            usage_path=os.path.join(directory, "usage.json"),
+            templates_path=os.path.join(directory, "templates.json"),
+        )
+        async with app.run_test(size=(100, 50)) as pilot:
+            await pilot.pause()
+            screen = type(app.screen).__name__
+    timings = startup.as_dict()
+    return {
+        "import_ms": timings["import_ms"],
+        "first_screen_ms": timings["first_paint_ms"],
+        "screen": screen,
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(asyncio.run(main())))
@@ -1,10 +1,43 @@
-from src.application.DGUtiliyAgency import DGUtilityAgency
+import sys
+import time
 
 
 def main():
-    app = DGUtilityAgency()
+    started = time.perf_counter()
+    args = sys.argv[1:]
+    if args[:1] == ["score"]:
+        from src.scoring.cli import main as score
+
+        sys.exit(score(args[1:]))
+    if args[:1] == ["serve"]:
+        from src.scoring.server import main as serve
+
+        sys.exit(serve(args[1:]))
+    if args[:1] == ["usage"]:
+        from src.scoring.usage import main as usage
+
+        sys.exit(usage(args[1:]))
+
+    if "--metrics" in args:
+        # Before the calculator is imported, so its functions are instrumented
+        from src.instrumentation import enable
+
+        enable()
+
+    from src.application.DGUtiliyAgency import DGUtilityAgency
+    from src.application.startup import StartupProfile
+
+    # --profile-startup prints import and first paint times on exit
+    startup = StartupProfile(started=started) if "--profile-startup" in args else None
+    if startup is not None:
+        startup.mark_imported()
+
+    app = DGUtilityAgency(startup=startup)
     app.run()
 
+    if startup is not None:
+        print(startup.report(), file=sys.stderr)
+
 
 if __name__ == "__main__":
     main()
@@ -1,18 +1,135 @@
+import time
+from pathlib import Path
+
 from textual.app import App
 from textual.binding import Binding
 
+from ..forms import load_screen, prefetch_screens
 from ..forms.welcome import WelcomeScreen
+from ..instrumentation import METRICS
+from .startup import StartupProfile
+from .worker import CalculatorWorker, shared_worker
 
 
 class DGUtilityAgency(App):
     CSS_PATH = "dgutility.css"
-    purchase_data = {}
 
     BINDINGS = [
         Binding("q", "quit", "Quit", priority=True),  # Press 'q' to quit
         Binding("ctrl+c", "quit", "Quit", priority=True),  # Ctrl+C also quits
+        Binding("f12", "toggle_debug", "Debug", show=False),  # Instrumentation
     ]
 
+    def __init__(
+        self,
+        startup: StartupProfile | None = None,
+        prefetch: bool = True,
+        history_path: str | Path | None = None,
+        templates_path: str | Path | None = None,
+        usage_path: str | Path | None = None,
+        calculator: CalculatorWorker | None = None,
+    ):
+        super().__init__()
+        # Per session: many apps may run in one process
+        self.purchase_data: dict = {}
+        # Shared by every session unless one is given
+        self.calculator = calculator or shared_worker()
+        self.startup = startup
+        self.prefetch = prefetch
+        self.history_path = history_path
+        self.templates_path = templates_path
+        self.usage_path = usage_path
+        self._history = None
+        self._templates = None
+        self._usage = None
+        self._usage_loaded = False
+
+    @property
+    def history(self):
+        """The decision store, opened on first use."""
+        if self._history is None:
+            from ..history import DecisionStore, default_history_path
+
+            self._history = DecisionStore(self.history_path or default_history_path())
+        return self._history
+
+    @property
+    def templates(self):
+        """The scenario template store."""
+        if self._templates is None:
+            from ..forms.templates import TemplateStore, default_templates_path
+
+            self._templates = TemplateStore(
+                self.templates_path or default_templates_path()
+            )
+        return self._templates
+
+    @property
+    def usage(self):
+        """Usage estimates written by ``main.py usage``, or None if there are none.
+
+        The file is read once; if it cannot be read the app says so once and
+        carries on without estimates.
+        """
+        if not self._usage_loaded:
+            from ..calculator.usage import UsageEstimator, default_usage_path
+
+            self._usage_loaded = True
+            try:
+                self._usage = UsageEstimator.load(
+                    self.usage_path or default_usage_path()
+                )
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError) as error:
+                self.notify(
+                    f"Could not read usage estimates: {error}", severity="warning"
+                )
+        return self._usage
+
+    def push_screen(self, screen, *args, **kwargs):
+        """Push ``screen``, timing it until painted when instrumentation is on."""
+        if not METRICS.enabled or isinstance(screen, str):
+            return super().push_screen(screen, *args, **kwargs)
+        span = f"screen.push.{type(screen).__name__}"
+        started = time.perf_counter()
+        result = super().push_screen(screen, *args, **kwargs)
+        # Runs after the screen has composed, mounted and refreshed
+        screen.call_after_refresh(self._end_transition, span, started)
+        return result
+
+    def pop_screen(self):
+        """Pop the top screen, timing it until repainted when instrumentation is on."""
+        if not METRICS.enabled:
+            return super().pop_screen()
+        span = f"screen.pop.{type(self.screen).__name__}"
+        started = time.perf_counter()
+        result = super().pop_screen()
+        self.call_after_refresh(self._end_transition, span, started)
+        return result
+
+    def _end_transition(self, span: str, started: float) -> None:
+        METRICS.observe(span, (time.perf_counter() - started) * 1000)
+
+    def action_toggle_debug(self) -> None:
+        """Open the instrumentation screen, or close it if it is open."""
+        debug_screen = load_screen("debug")
+        if isinstance(self.screen, debug_screen):
+            self.pop_screen()
+        else:
+            self.push_screen(debug_screen())
+
+    def on_unmount(self) -> None:
+        if self._history is not None:
+            self._history.close()
+
     def on_mount(self) -> None:
         self.push_screen(WelcomeScreen())
+        self.call_after_refresh(self._on_first_paint)
 
+    def _on_first_paint(self) -> None:
+        if self.startup is not None:
+            self.startup.mark_first_paint()
+        if self.prefetch:
+            # Load the rest of the flow while the user fills in the first form
+            self.run_worker(prefetch_screens, thread=True, group="prefetch")
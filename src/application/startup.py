@@ -0,0 +1,42 @@
+"""
+Startup profiling for the TUI, enabled with ``main.py --profile-startup``.
+
+Records how long the application took to import and to paint its first
+screen, measured from the start of ``main``.
+"""
+
+import time
+from dataclasses import dataclass, field
+
+
+@dataclass
+class StartupProfile:
+    started: float = field(default_factory=time.perf_counter)
+    imported: float | None = None
+    first_paint: float | None = None
+
+    def mark_imported(self) -> None:
+        self.imported = time.perf_counter()
+
+    def mark_first_paint(self) -> None:
+        if self.first_paint is None:
+            self.first_paint = time.perf_counter()
+
+    def as_dict(self) -> dict[str, float | None]:
+        """Milliseconds since start for each recorded stage."""
+        return {
+            "import_ms": self._elapsed_ms(self.imported),
+            "first_paint_ms": self._elapsed_ms(self.first_paint),
+        }
+
+    def report(self) -> str:
+        timings = self.as_dict()
+        return "Startup: import {}, first paint {}".format(
+            *(
+                "n/a" if value is None else f"{value:.1f} ms"
+                for value in (timings["import_ms"], timings["first_paint_ms"])
+            )
+        )
+
+    def _elapsed_ms(self, mark: float | None) -> float | None:
+        return None if mark is None else (mark - self.started) * 1000
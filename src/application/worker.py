@@ -0,0 +1,55 @@
+"""
+Calculator jobs shared by every session in the process.
+
+Several apps can run in one process, one per analyst, when the TUI is
+hosted over SSH or the web. Heavy calculator jobs run on one bounded
+thread pool instead of the event loop the sessions share, and instead of a
+new thread per job, so a burst of sessions cannot start unbounded threads.
+"""
+
+import asyncio
+import os
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_MAX_WORKERS = min(4, os.cpu_count() or 1)
+
+
+class CalculatorWorker:
+    """A thread pool for calculator jobs."""
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS):
+        if max_workers < 1:
+            raise ValueError("A worker needs at least one thread")
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(
+            max_workers, thread_name_prefix="calculator"
+        )
+
+    def submit(self, function: Callable[..., T], /, *args, **kwargs) -> Future[T]:
+        """Start ``function(*args, **kwargs)`` on the pool."""
+        return self._executor.submit(function, *args, **kwargs)
+
+    async def run(self, function: Callable[..., T], /, *args, **kwargs) -> T:
+        """Run a job on the pool and wait for it without blocking the loop."""
+        return await asyncio.wrap_future(self.submit(function, *args, **kwargs))
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_shared: CalculatorWorker | None = None
+_shared_lock = threading.Lock()
+
+
+def shared_worker() -> CalculatorWorker:
+    """The worker every app in this process uses unless given its own."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = CalculatorWorker()
+        return _shared
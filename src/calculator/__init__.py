@@ -2,16 +2,146 @@
 Calculator module for computing utility metrics from purchase data.
 """
 
+from .batch import (
+    BatchUtilityMetrics,
+    LookupTables,
+    PurchaseColumns,
+    build_lookup_tables,
+    calculate_breakeven_probability_batch,
+    calculate_utilities_batch,
+    encode_columns,
+    encode_purchases,
+)
+from .cache import CacheStats, UtilityCache, canonical_key
+from .compiled import (
+    ScoringTable,
+    activate_profile,
+    build_scoring_table,
+    calculate_utilities_compiled,
+    get_scoring_table,
+    reload_constants,
+    score_purchase,
+    set_constant,
+)
+from .discounted import (
+    BatchDiscountedMetrics,
+    CashFlowTerms,
+    DiscountedUtilityMetrics,
+    calculate_discounted_batch,
+    calculate_discounted_utilities,
+)
+from .explain import (
+    TRACE_COLUMNS,
+    BatchUtilityTrace,
+    UtilityTrace,
+    explain_batch,
+    explain_utilities,
+)
+from .montecarlo import MonteCarloReport, simulate_decision
+from .profiles import WeightProfile, builtin_profile, load_profile, parse_profile
+from .ranking import (
+    BudgetSelection,
+    OptionScores,
+    RankedOptions,
+    rank_options,
+    score_options,
+    select_within_budget,
+    top_k,
+)
+from .records import (
+    PurchaseRecord,
+    UtilityRecord,
+    pack_purchases,
+    pack_utilities,
+    purchase_columns,
+    unpack_purchase,
+)
+from .reload import ProfileWatcher
+from .sensitivity import (
+    Derivatives,
+    SensitivityReport,
+    SensitivityScenarios,
+    TornadoBar,
+    sensitivity_report,
+    sensitivity_scenarios,
+)
+from .sweep import ProbabilitySweep, probability_grid, sweep_probabilities
+from .usage import UsageEstimator, UsagePosterior, default_usage_path
 from .utility_calculator import (
+    DecisionSummary,
     calculate_breakeven_probability,
     calculate_expected_utility_buy,
     calculate_expected_utility_not_buy,
     calculate_utilities,
+    summarize_decision,
 )
 
 __all__ = [
-    "calculate_utilities",
+    "TRACE_COLUMNS",
+    "BatchDiscountedMetrics",
+    "BatchUtilityMetrics",
+    "BatchUtilityTrace",
+    "BudgetSelection",
+    "CacheStats",
+    "CashFlowTerms",
+    "DecisionSummary",
+    "Derivatives",
+    "DiscountedUtilityMetrics",
+    "LookupTables",
+    "MonteCarloReport",
+    "OptionScores",
+    "ProbabilitySweep",
+    "ProfileWatcher",
+    "PurchaseColumns",
+    "PurchaseRecord",
+    "RankedOptions",
+    "ScoringTable",
+    "SensitivityReport",
+    "SensitivityScenarios",
+    "TornadoBar",
+    "UsageEstimator",
+    "UsagePosterior",
+    "UtilityCache",
+    "UtilityRecord",
+    "UtilityTrace",
+    "WeightProfile",
+    "activate_profile",
+    "build_lookup_tables",
+    "build_scoring_table",
+    "builtin_profile",
+    "calculate_breakeven_probability",
+    "calculate_breakeven_probability_batch",
+    "calculate_discounted_batch",
+    "calculate_discounted_utilities",
     "calculate_expected_utility_buy",
     "calculate_expected_utility_not_buy",
-    "calculate_breakeven_probability",
+    "calculate_utilities",
+    "calculate_utilities_batch",
+    "calculate_utilities_compiled",
+    "canonical_key",
+    "default_usage_path",
+    "encode_columns",
+    "encode_purchases",
+    "explain_batch",
+    "explain_utilities",
+    "get_scoring_table",
+    "load_profile",
+    "pack_purchases",
+    "pack_utilities",
+    "parse_profile",
+    "probability_grid",
+    "purchase_columns",
+    "rank_options",
+    "reload_constants",
+    "score_options",
+    "score_purchase",
+    "select_within_budget",
+    "sensitivity_report",
+    "sensitivity_scenarios",
+    "set_constant",
+    "simulate_decision",
+    "summarize_decision",
+    "sweep_probabilities",
+    "top_k",
+    "unpack_purchase",
 ]
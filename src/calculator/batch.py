@@ -0,0 +1,302 @@
+"""
+Vectorized batch engine for utility calculations.
+
+Categorical purchase fields are encoded once as integer codes into lookup
+tables built from a weight profile (by default the constants module), after
+which all five utility metrics are computed for every record in a single
+NumPy pass.
+"""
+
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass
+from typing import TypedDict
+
+import numpy as np
+
+from src.instrumentation import timed
+
+from . import constants
+from .profiles import WeightProfile, builtin_profile
+from .utility_calculator import PurchaseData, calculate_expected_utility_not_buy
+
+UTILITY_COLUMNS = (
+    "use_factor",
+    "u_buy_useful",
+    "u_buy_not_useful",
+    "u_not_buy_useful",
+    "u_not_buy_not_useful",
+)
+
+
+class PurchaseColumns(TypedDict):
+    """Struct-of-arrays form of many PurchaseData records.
+
+    Categorical fields hold integer codes produced by a LookupTables
+    instance; ``life_areas`` holds a bitmask of the known areas of each record
+    over ``LookupTables.life_areas``, and ``life_area_mult`` their averaged
+    weight as calculate_utilities computes it.
+    """
+
+    price: np.ndarray
+    income_level: np.ndarray
+    life_areas: np.ndarray
+    life_area_mult: np.ndarray
+    necessity: np.ndarray
+    time_use: np.ndarray
+    use_probability: np.ndarray
+    life_span: np.ndarray
+    category: np.ndarray
+
+
+class BatchUtilityMetrics(TypedDict):
+    """Columnar counterpart of UtilityMetrics, one array per metric."""
+
+    use_factor: np.ndarray
+    u_buy_useful: np.ndarray
+    u_buy_not_useful: np.ndarray
+    u_not_buy_useful: np.ndarray
+    u_not_buy_not_useful: np.ndarray
+
+
+@dataclass(frozen=True)
+class LookupTables:
+    """Integer-coded lookup tables compiled from a WeightProfile.
+
+    Every categorical table has one extra trailing slot holding the value
+    ``calculate_utilities`` falls back to for unknown keys, so unknown
+    values encode to ``len(keys)``.
+    """
+
+    income_levels: tuple[str, ...]
+    categories: tuple[str, ...]
+    necessities: tuple[str, ...]
+    use_probabilities: tuple[str, ...]
+    life_areas: tuple[str, ...]
+    life_area_weights: Mapping[str, float]
+    income_weights: np.ndarray  # shape (n + 1, 4): buy/not_buy x useful/not
+    category_mult: np.ndarray
+    necessity_mult: np.ndarray
+    use_probability: np.ndarray
+    life_area_mult: np.ndarray  # indexed by life area bitmask
+    weeks_per_year: float
+    months_per_year: float
+    zero_price_use_factor: float
+    version: str  # WeightProfile.version
+
+    def encode(self, field: str, values: Sequence[str] | np.ndarray) -> np.ndarray:
+        """Encode a column of categorical strings to integer codes."""
+        keys = self._keys(field)
+        uniques, inverse = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+        mapping = np.array(
+            [keys.index(u) if u in keys else len(keys) for u in uniques.tolist()],
+            dtype=np.intp,
+        )
+        return mapping[inverse.reshape(-1)]
+
+    def encode_life_areas(self, life_areas: Iterable[str]) -> int:
+        """Encode one list of life areas as a bitmask."""
+        mask = 0
+        for area in life_areas:
+            try:
+                mask |= 1 << self.life_areas.index(area)
+            except ValueError:
+                raise ValueError(f"Unknown life area: {area!r}") from None
+        return mask
+
+    def encode_life_area_lists(
+        self, lists: Sequence[Iterable[str]]
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Bitmask and averaged weight of every list of life areas.
+
+        The weight is averaged like calculate_utilities does: a repeated area
+        counts every time and an unknown one weighs 1.0. Bitmasks only have
+        the known areas. Each distinct list is encoded once.
+        """
+        masks = np.empty(len(lists), dtype=np.intp)
+        mults = np.empty(len(lists), dtype=np.float64)
+        bits = {area: 1 << bit for bit, area in enumerate(self.life_areas)}
+        weights = self.life_area_weights
+        encoded: dict[tuple[str, ...], tuple[int, float]] = {}
+        for i, areas in enumerate(lists):
+            key = tuple(areas)
+            entry = encoded.get(key)
+            if entry is None:
+                mask = 0
+                for area in key:
+                    mask |= bits.get(area, 0)
+                mult = 1.0
+                if key:
+                    mult = sum(weights.get(area, 1.0) for area in key) / len(key)
+                entry = encoded[key] = (mask, mult)
+            masks[i], mults[i] = entry
+        return masks, mults
+
+    def _keys(self, field: str) -> tuple[str, ...]:
+        return {
+            "income_level": self.income_levels,
+            "category": self.categories,
+            "necessity": self.necessities,
+            "use_probability": self.use_probabilities,
+        }[field]
+
+
+def build_lookup_tables(profile: WeightProfile | None = None) -> LookupTables:
+    """Build lookup tables from ``profile``, by default the current values in
+    the constants module."""
+    if profile is None:
+        profile = builtin_profile()
+    income_levels = tuple(profile.income_weights)
+    income_weights = np.array(
+        [
+            [*weights["buy"], *weights["not_buy"]]
+            for weights in (
+                *profile.income_weights.values(),
+                profile.default_income_weights,
+            )
+        ],
+        dtype=np.float64,
+    )
+
+    life_areas = tuple(profile.life_area_weights)
+    life_area_mult = np.ones(1 << len(life_areas), dtype=np.float64)
+    for mask in range(1, len(life_area_mult)):
+        weights = [
+            profile.life_area_weights[area]
+            for bit, area in enumerate(life_areas)
+            if mask & (1 << bit)
+        ]
+        life_area_mult[mask] = sum(weights) / len(weights)
+
+    return LookupTables(
+        income_levels=income_levels,
+        categories=tuple(profile.category_multipliers),
+        necessities=tuple(profile.necessity_scores),
+        use_probabilities=tuple(profile.use_probability_values),
+        life_areas=life_areas,
+        life_area_weights=profile.life_area_weights,
+        income_weights=income_weights,
+        category_mult=_with_default(profile.category_multipliers, 1.0),
+        necessity_mult=_with_default(profile.necessity_scores, 0.8),
+        use_probability=_with_default(profile.use_probability_values, 1),
+        life_area_mult=life_area_mult,
+        weeks_per_year=profile.weeks_per_year,
+        months_per_year=profile.months_per_year,
+        zero_price_use_factor=profile.default_use_factor_zero_price,
+        version=profile.version,
+    )
+
+
+def _with_default(table: Mapping[str, float], default: float) -> np.ndarray:
+    return np.array([*table.values(), default], dtype=np.float64)
+
+
+def encode_columns(
+    columns: Mapping[str, Sequence], tables: LookupTables | None = None
+) -> PurchaseColumns:
+    """Encode raw columnar purchase data (strings and numbers) once.
+
+    ``life_areas`` may be given either as a sequence of area lists or as an
+    integer array of already-encoded bitmasks.
+    """
+    if tables is None:
+        tables = build_lookup_tables()
+
+    life_areas = columns["life_areas"]
+    if isinstance(life_areas, np.ndarray) and life_areas.dtype.kind in "iu":
+        life_area_masks = life_areas.astype(np.intp, copy=False)
+        life_area_mult = tables.life_area_mult[life_area_masks]
+    else:
+        life_area_masks, life_area_mult = tables.encode_life_area_lists(life_areas)
+
+    return {
+        "price": np.asarray(columns["price"], dtype=np.float64),
+        "income_level": tables.encode("income_level", columns["income_level"]),
+        "life_areas": life_area_masks,
+        "life_area_mult": life_area_mult,
+        "necessity": tables.encode("necessity", columns["necessity"]),
+        "time_use": np.asarray(columns["time_use"], dtype=np.float64),
+        "use_probability": tables.encode("use_probability", columns["use_probability"]),
+        "life_span": np.asarray(columns["life_span"], dtype=np.float64),
+        "category": tables.encode("category", columns["category"]),
+    }
+
+
+def encode_purchases(
+    records: Iterable[PurchaseData], tables: LookupTables | None = None
+) -> PurchaseColumns:
+    """Transpose PurchaseData dicts into encoded columns."""
+    records = list(records)
+    fields = (
+        "price",
+        "income_level",
+        "life_areas",
+        "necessity",
+        "time_use",
+        "use_probability",
+        "life_span",
+        "category",
+    )
+    return encode_columns(
+        {field: [record[field] for record in records] for field in fields}, tables
+    )
+
+
+def calculate_utilities_batch(
+    columns: PurchaseColumns, tables: LookupTables | None = None
+) -> BatchUtilityMetrics:
+    """Vectorized equivalent of calculate_utilities over encoded columns.
+
+    ``tables`` must be the same LookupTables used to encode ``columns``.
+    """
+    if tables is None:
+        tables = build_lookup_tables()
+
+    price = columns["price"]
+    if np.any(price == 0):
+        raise ZeroDivisionError("float division by zero")
+
+    prob = tables.use_probability[columns["use_probability"]]
+
+    time_use_year = columns["time_use"] * tables.weeks_per_year
+    life_span_years = columns["life_span"] / tables.months_per_year
+    total_time_use = time_use_year * life_span_years * prob
+
+    benefit = (
+        total_time_use
+        * tables.category_mult[columns["category"]]
+        * tables.necessity_mult[columns["necessity"]]
+        * columns["life_area_mult"]
+    )
+
+    use_factor = np.where(
+        price > 0,
+        total_time_use / price,
+        tables.zero_price_use_factor,
+    )
+    benefit_factor = benefit / price
+
+    weights = tables.income_weights[columns["income_level"]]
+    return {
+        "use_factor": use_factor,
+        "u_buy_useful": benefit_factor * weights[:, 0],
+        "u_buy_not_useful": benefit_factor * weights[:, 1],
+        "u_not_buy_useful": benefit_factor * weights[:, 2],
+        "u_not_buy_not_useful": benefit_factor * weights[:, 3],
+    }
+
+
+@timed("calculator.calculate_breakeven_probability_batch")
+def calculate_breakeven_probability_batch(
+    results: BatchUtilityMetrics, p_useful_if_not_buy: float | np.ndarray
+) -> np.ndarray:
+    """Vectorized equivalent of calculate_breakeven_probability."""
+    eu_not_buy = calculate_expected_utility_not_buy(p_useful_if_not_buy, results)
+
+    numerator = eu_not_buy - results["u_buy_not_useful"]
+    denominator = results["u_buy_useful"] - results["u_buy_not_useful"]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        breakeven = np.clip(numerator / denominator, 0.0, 1.0)
+    return np.where(
+        denominator == 0, constants.DEFAULT_BREAKEVEN_PROBABILITY, breakeven
+    )
@@ -0,0 +1,139 @@
+"""
+Opt-in memoizing cache for calculate_utilities.
+
+Results are keyed on a canonical form of the fields that affect them:
+``item_name`` is ignored and ``life_areas`` is order-insensitive. Entries are
+evicted least-recently-used beyond ``maxsize``, optionally expire after
+``ttl`` seconds, and the whole cache is dropped after set_constant or
+reload_constants.
+
+A hit costs about as much as calculate_utilities itself, so the cache pays
+off in front of an expensive calculation, e.g. calculate_discounted_utilities
+with fixed terms, where a hit is about a hundred times faster.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from .compiled import constants_version
+from .utility_calculator import PurchaseData, UtilityMetrics, calculate_utilities
+
+DEFAULT_MAXSIZE = 4096
+
+
+@dataclass
+class CacheStats:
+    """Counters of a UtilityCache."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+    size: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def canonical_key(purchase_data: PurchaseData) -> tuple:
+    """Cache key of the fields calculate_utilities depends on.
+
+    Life areas are sorted but duplicates are kept, since a repeated area
+    changes the averaged life-area weight.
+    """
+    life_areas = purchase_data["life_areas"]
+    return (
+        purchase_data["price"],
+        purchase_data["income_level"],
+        tuple(sorted(life_areas)) if len(life_areas) > 1 else tuple(life_areas),
+        purchase_data["necessity"],
+        purchase_data["time_use"],
+        purchase_data["use_probability"],
+        purchase_data["life_span"],
+        purchase_data["category"],
+    )
+
+
+class UtilityCache:
+    """Bounded LRU/TTL cache in front of a utility calculation."""
+
+    def __init__(
+        self,
+        maxsize: int = DEFAULT_MAXSIZE,
+        ttl: float | None = None,
+        calculate: Callable[[PurchaseData], UtilityMetrics] = calculate_utilities,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if maxsize < 1:
+            raise ValueError("Cache size must be at least 1")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._calculate = calculate
+        self._clock = clock
+        self._entries: OrderedDict[tuple, tuple[float, UtilityMetrics]] = OrderedDict()
+        self._constants_version = constants_version()
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+
+    def get(self, purchase_data: PurchaseData) -> UtilityMetrics:
+        """Return cached utilities for ``purchase_data``, computing on a miss."""
+        key = canonical_key(purchase_data)
+        with self._lock:
+            if self._constants_version != constants_version():
+                self._invalidate()
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, result = entry
+                # Without a TTL entries never expire; skip reading the clock
+                if self.ttl is None or expires >= self._clock():
+                    self._entries.move_to_end(key)
+                    self._stats.hits += 1
+                    return dict(result)
+                del self._entries[key]
+                self._stats.expirations += 1
+            self._stats.misses += 1
+            version = self._constants_version
+
+        result = self._calculate(purchase_data)
+        expires = float("inf") if self.ttl is None else self._clock() + self.ttl
+
+        with self._lock:
+            # The constants changed while computing; the result may be stale
+            if version != constants_version():
+                return dict(result)
+            self._entries[key] = (expires, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._stats.evictions += 1
+        return dict(result)
+
+    __call__ = get
+
+    def clear(self) -> None:
+        """Drop every entry, counting it as an invalidation."""
+        with self._lock:
+            self._invalidate()
+
+    @property
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._stats.hits,
+                misses=self._stats.misses,
+                evictions=self._stats.evictions,
+                expirations=self._stats.expirations,
+                invalidations=self._stats.invalidations,
+                size=len(self._entries),
+            )
+
+    def _invalidate(self) -> None:
+        self._entries.clear()
+        self._constants_version = constants_version()
+        self._stats.invalidations += 1
@@ -0,0 +1,278 @@
+"""
+Compiled scoring table for the utility calculator.
+
+There are only a couple of hundred combinations of the categorical purchase
+fields (income level, category, necessity and use probability). For each
+combination the table stores the use probability and the four utility
+coefficients with those multipliers and the income weights already folded
+in, so scoring a record is one table index plus a few multiplies:
+
+    hours = time_use * WEEKS_PER_YEAR * life_span / MONTHS_PER_YEAR
+    use_factor = hours * row[0] / price
+    u_*        = hours * life_area_mult * row[1..4] / price
+
+The life area multiplier is applied per record, since a list of life areas
+may repeat an area or name an unknown one.
+
+get_scoring_table returns the table of the active weight profile. By
+default that is the constants module, and the table is rebuilt on the next
+call after set_constant or reload_constants. activate_profile compiles another WeightProfile
+and swaps it in with a single reference assignment, so scoring never waits
+for a swap and every call that holds a table keeps using it consistently.
+
+Override a weight with ``set_constant("CATEGORY_MULTIPLIERS", "qol", 1.5)``.
+It changes the table in place and marks compiled results stale in one step;
+checking the constants for changes on every call would cost more than
+scoring a record. Code that edits a table in place itself must call
+reload_constants afterwards. calculate_utilities holds the objects it
+imported at load time, so rebinding a name (``constants.WEEKS_PER_YEAR = 50``)
+reaches the tables built from the constants module but not the scalar
+engine, and the two would disagree.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from . import constants
+from .batch import (
+    BatchUtilityMetrics,
+    LookupTables,
+    PurchaseColumns,
+    build_lookup_tables,
+)
+from .profiles import WeightProfile
+from .utility_calculator import PurchaseData, UtilityMetrics
+
+
+@dataclass(frozen=True)
+class ScoringTable:
+    """Per-combination coefficients compiled from LookupTables."""
+
+    lookup: LookupTables
+    constants_version: int  # constants_version() when the table was built
+    coefficients: np.ndarray  # shape (combinations, 5)
+    strides: tuple[int, int, int, int]
+    rows: list[tuple[float, float, float, float, float]]
+    offsets: dict[tuple[str, str, str, str], int]
+
+    @property
+    def version(self) -> str:
+        """Version of the weight profile the table was compiled from."""
+        return self.lookup.version
+
+    def combination_index(self, columns: PurchaseColumns) -> np.ndarray:
+        """Flat table index of every encoded record."""
+        income, category, necessity, use_probability = self.strides
+        return (
+            columns["income_level"] * income
+            + columns["category"] * category
+            + columns["necessity"] * necessity
+            + columns["use_probability"] * use_probability
+        )
+
+    def score(self, purchase_data: PurchaseData) -> UtilityMetrics:
+        """Score one PurchaseData record through the table."""
+        key = (
+            purchase_data["income_level"],
+            purchase_data["category"],
+            purchase_data["necessity"],
+            purchase_data["use_probability"],
+        )
+        offset = self.offsets.get(key)
+        if offset is None:
+            offset = self._offset_with_defaults(*key)
+
+        prob, buy_useful, buy_not_useful, not_buy_useful, not_buy_not_useful = (
+            self.rows[offset]
+        )
+
+        price = purchase_data["price"]
+        lookup = self.lookup
+        life_areas = purchase_data["life_areas"]
+        life_area_mult = 1.0
+        if life_areas:
+            weights = lookup.life_area_weights
+            total = sum(weights.get(area, 1.0) for area in life_areas)
+            life_area_mult = total / len(life_areas)
+        hours = (
+            purchase_data["time_use"]
+            * lookup.weeks_per_year
+            * purchase_data["life_span"]
+            / lookup.months_per_year
+        )
+        scale = hours / price
+        benefit_scale = scale * life_area_mult
+        return {
+            "use_factor": (scale * prob if price > 0 else lookup.zero_price_use_factor),
+            "u_buy_useful": benefit_scale * buy_useful,
+            "u_buy_not_useful": benefit_scale * buy_not_useful,
+            "u_not_buy_useful": benefit_scale * not_buy_useful,
+            "u_not_buy_not_useful": benefit_scale * not_buy_not_useful,
+        }
+
+    def _offset_with_defaults(
+        self, income_level: str, category: str, necessity: str, use_probability: str
+    ) -> int:
+        codes = (
+            _code(self.lookup.income_levels, income_level),
+            _code(self.lookup.categories, category),
+            _code(self.lookup.necessities, necessity),
+            _code(self.lookup.use_probabilities, use_probability),
+        )
+        return sum(code * stride for code, stride in zip(codes, self.strides))
+
+
+def _code(keys: tuple[str, ...], value: str) -> int:
+    return keys.index(value) if value in keys else len(keys)
+
+
+_constants_version = 0
+
+
+def constants_version() -> int:
+    """Number of times the constants were marked stale so far."""
+    return _constants_version
+
+
+def reload_constants() -> None:
+    """Mark everything built from the constants module as stale.
+
+    Call after changing a constant in place; the table of the constants
+    module is rebuilt on the next get_scoring_table call.
+    """
+    global _constants_version
+    _constants_version += 1
+
+
+def set_constant(table: str, key: str, value) -> None:
+    """Set ``constants.<table>[key]`` to ``value`` and reload the constants.
+
+    ``table`` names one of the dict tables of the constants module, e.g.
+    ``set_constant("LIFE_AREA_WEIGHTS", "career", 1.5)``.
+    """
+    values = getattr(constants, table, None)
+    if not table.isupper() or not isinstance(values, dict):
+        raise ValueError(f"Unknown constants table: {table}")
+    values[key] = value
+    reload_constants()
+
+
+def build_scoring_table(
+    lookup: LookupTables | None = None, profile: WeightProfile | None = None
+) -> ScoringTable:
+    """Compile the per-combination coefficient table.
+
+    Without ``lookup`` the table is built from ``profile``, by default the
+    constants module.
+    """
+    version = _constants_version
+    if lookup is None:
+        lookup = build_lookup_tables(profile)
+
+    # Axis order: income, category, necessity, use probability
+    prob = lookup.use_probability
+    multiplier = (
+        lookup.category_mult[:, None, None]
+        * lookup.necessity_mult[None, :, None]
+        * prob[None, None, :]
+    )
+    shape = (len(lookup.income_weights), *multiplier.shape)
+    coefficients = np.empty((*shape, 5), dtype=np.float64)
+    coefficients[..., 0] = np.broadcast_to(prob[None, None, None, :], shape)
+    coefficients[..., 1:] = (
+        multiplier[None, ..., None] * lookup.income_weights[:, None, None, None, :]
+    )
+    coefficients = coefficients.reshape(-1, 5)
+
+    strides = tuple(int(np.prod(shape[axis + 1 :])) for axis in range(4))
+    offsets = {
+        (income_level, category, necessity, use_probability): (
+            i * strides[0] + c * strides[1] + n * strides[2] + u * strides[3]
+        )
+        for i, income_level in enumerate(lookup.income_levels)
+        for c, category in enumerate(lookup.categories)
+        for n, necessity in enumerate(lookup.necessities)
+        for u, use_probability in enumerate(lookup.use_probabilities)
+    }
+
+    return ScoringTable(
+        lookup=lookup,
+        constants_version=version,
+        coefficients=coefficients,
+        strides=strides,
+        rows=[tuple(row) for row in coefficients.tolist()],
+        offsets=offsets,
+    )
+
+
+_table: ScoringTable | None = None
+# Table of an activated profile; None follows the constants module
+_active: ScoringTable | None = None
+
+
+def get_scoring_table() -> ScoringTable:
+    """Return the table of the active profile.
+
+    Without an activated profile the table follows the constants module and
+    is rebuilt after set_constant or reload_constants.
+    """
+    global _table
+    active = _active
+    if active is not None:
+        return active
+    if _table is None or _table.constants_version != _constants_version:
+        _table = build_scoring_table()
+    return _table
+
+
+def activate_profile(profile: WeightProfile | None) -> ScoringTable:
+    """Compile ``profile`` and make it the active one.
+
+    The table is compiled before the swap, so concurrent scoring keeps using
+    the previous table until it fetches a new one. ``None`` returns to the
+    constants module.
+    """
+    global _active
+    _active = None if profile is None else build_scoring_table(profile=profile)
+    return get_scoring_table()
+
+
+def calculate_utilities_compiled(
+    columns: PurchaseColumns, table: ScoringTable | None = None
+) -> BatchUtilityMetrics:
+    """Score encoded columns through the compiled table.
+
+    ``columns`` must be encoded with ``table.lookup``.
+    """
+    if table is None:
+        table = get_scoring_table()
+
+    price = columns["price"]
+    if np.any(price == 0):
+        raise ZeroDivisionError("float division by zero")
+
+    lookup = table.lookup
+    hours = (
+        columns["time_use"]
+        * lookup.weeks_per_year
+        * columns["life_span"]
+        / lookup.months_per_year
+    )
+    scale = hours / price
+    rows = table.coefficients[table.combination_index(columns)]
+    scaled = (scale * columns["life_area_mult"])[:, None] * rows[:, 1:]
+    return {
+        "use_factor": np.where(
+            price > 0, scale * rows[:, 0], lookup.zero_price_use_factor
+        ),
+        "u_buy_useful": scaled[:, 0],
+        "u_buy_not_useful": scaled[:, 1],
+        "u_not_buy_useful": scaled[:, 2],
+        "u_not_buy_not_useful": scaled[:, 3],
+    }
+
+
+def score_purchase(purchase_data: PurchaseData) -> UtilityMetrics:
+    """Table-driven equivalent of calculate_utilities for one record."""
+    return get_scoring_table().score(purchase_data)
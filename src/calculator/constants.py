@@ -62,3 +62,7 @@ DEFAULT_INCOME_WEIGHTS = {
 # Default values
 DEFAULT_USE_FACTOR_ZERO_PRICE = 0.1  # Use factor when price is 0
 DEFAULT_BREAKEVEN_PROBABILITY = 0.5  # Neutral case for breakeven probability
+
+# Probabilities a purchase is useful, when none are given
+DEFAULT_P_USEFUL_IF_BUY = 0.5
+DEFAULT_P_USEFUL_IF_NOT_BUY = 0.1
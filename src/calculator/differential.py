@@ -0,0 +1,283 @@
+"""
+Differential testing of the fast calculator paths against the scalar one.
+
+calculate_utilities is the reference. Every alternate engine (the batch
+and compiled calculators, the table-driven scalar path, the cache, a
+compiled built-in profile and packed records) scores the same random
+purchases, and every output column must match the reference within
+RELATIVE_TOLERANCE. The batch breakeven, which the probability sweeps
+also use, is compared the same way, and every breakeven must lie in [0, 1].
+
+Purchases are drawn from a seeded generator over the ranges the forms
+accept, with a share of boundary values and of unknown choices, which the
+engines score with their defaults, and a share of life area lists that
+repeat an area or name an unknown one. Run millions of cases with:
+
+    python -m src.calculator.differential --cases 1000000
+"""
+
+import argparse
+import sys
+from collections.abc import Callable
+from typing import TypedDict
+
+import numpy as np
+
+from . import constants
+from .batch import (
+    UTILITY_COLUMNS,
+    BatchUtilityMetrics,
+    build_lookup_tables,
+    calculate_breakeven_probability_batch,
+    calculate_utilities_batch,
+    encode_purchases,
+)
+from .cache import UtilityCache
+from .compiled import calculate_utilities_compiled, get_scoring_table, score_purchase
+from .profiles import builtin_profile
+from .records import pack_purchases, purchase_columns
+from .utility_calculator import (
+    PurchaseData,
+    calculate_breakeven_probability,
+    calculate_utilities,
+)
+
+RELATIVE_TOLERANCE = 1e-9
+DEFAULT_CASES = 1_000_000
+DEFAULT_CHUNK_SIZE = 50_000
+
+# Valid input ranges, matching the form validation
+MIN_PRICE = 0.01
+MAX_PRICE = 1_000_000.0
+MAX_TIME_USE = 168.0
+MAX_LIFE_SPAN = 600
+
+BOUNDARY_SHARE = 0.05  # share of each numeric field drawn at a bound
+UNKNOWN_SHARE = 0.02  # share of each choice replaced by an unknown key
+IRREGULAR_SHARE = 0.04  # share of life area lists with a repeated or unknown area
+
+Engine = Callable[[list[PurchaseData]], BatchUtilityMetrics]
+
+
+def _batch(purchases: list[PurchaseData]) -> BatchUtilityMetrics:
+    tables = build_lookup_tables()
+    return calculate_utilities_batch(encode_purchases(purchases, tables), tables)
+
+
+def _compiled(purchases: list[PurchaseData]) -> BatchUtilityMetrics:
+    table = get_scoring_table()
+    return calculate_utilities_compiled(
+        encode_purchases(purchases, table.lookup), table
+    )
+
+
+def _per_record(score: Callable[[PurchaseData], dict]) -> Engine:
+    def engine(purchases: list[PurchaseData]) -> BatchUtilityMetrics:
+        results = [score(purchase) for purchase in purchases]
+        return {
+            name: np.array([result[name] for result in results])
+            for name in UTILITY_COLUMNS
+        }
+
+    return engine
+
+
+def _profile(purchases: list[PurchaseData]) -> BatchUtilityMetrics:
+    tables = build_lookup_tables(builtin_profile())
+    return calculate_utilities_batch(encode_purchases(purchases, tables), tables)
+
+
+def _records(purchases: list[PurchaseData]) -> BatchUtilityMetrics:
+    tables = build_lookup_tables()
+    return calculate_utilities_batch(
+        purchase_columns(pack_purchases(purchases, tables)), tables
+    )
+
+
+ENGINES: dict[str, Callable[[], Engine]] = {
+    "batch": lambda: _batch,
+    "compiled": lambda: _compiled,
+    "score_purchase": lambda: _per_record(score_purchase),
+    "cache": lambda: _per_record(UtilityCache(maxsize=1 << 16)),
+    "profile": lambda: _profile,
+    "records": lambda: _records,
+}
+
+
+class DifferentialReport(TypedDict):
+    """Largest relative error of each engine and column over all cases."""
+
+    cases: int
+    seed: int
+    max_relative_error: dict[str, dict[str, float]]
+    breakeven_max_relative_error: float
+    failures: list[str]
+
+
+def random_purchases(rng: np.random.Generator, count: int) -> list[PurchaseData]:
+    """Random purchases within the ranges the forms accept."""
+    price = np.exp(rng.uniform(np.log(MIN_PRICE), np.log(MAX_PRICE), count))
+    price = _with_bounds(rng, price.round(2), MIN_PRICE, MAX_PRICE)
+    time_use = _with_bounds(rng, rng.uniform(0, MAX_TIME_USE, count), 0, MAX_TIME_USE)
+    life_span = _with_bounds(
+        rng, rng.integers(1, MAX_LIFE_SPAN, count, endpoint=True), 1, MAX_LIFE_SPAN
+    )
+
+    life_areas = _life_areas(rng, count)
+    choices = {
+        field: _choices(rng, table, count)
+        for field, table in (
+            ("income_level", constants.INCOME_WEIGHTS),
+            ("necessity", constants.NECESSITY_SCORES),
+            ("use_probability", constants.USE_PROBABILITY_VALUES),
+            ("category", constants.CATEGORY_MULTIPLIERS),
+        )
+    }
+    return [
+        {
+            "item_name": f"Item {i}",
+            "price": float(price[i]),
+            "income_level": choices["income_level"][i],
+            "life_areas": list(life_areas[i]),
+            "necessity": choices["necessity"][i],
+            "time_use": float(time_use[i]),
+            "use_probability": choices["use_probability"][i],
+            "life_span": int(life_span[i]),
+            "category": choices["category"][i],
+        }
+        for i in range(count)
+    ]
+
+
+def _life_areas(rng: np.random.Generator, count: int) -> list[list[str]]:
+    """Shuffled subsets of the life areas, some with a repeated or unknown area."""
+    areas = list(constants.LIFE_AREA_WEIGHTS)
+    subsets = [
+        [area for bit, area in enumerate(areas) if mask >> bit & 1]
+        for mask in range(1 << len(areas))
+    ]
+    for subset in subsets:
+        rng.shuffle(subset)
+    lists = [subsets[mask] for mask in rng.integers(0, len(subsets), count)]
+
+    draw = rng.random(count)
+    position = rng.random(count)
+    for i in np.flatnonzero(draw < IRREGULAR_SHARE):
+        irregular = lists[i] = list(lists[i])
+        # Half repeat an area already in the list, the rest add an unknown one
+        if irregular and draw[i] < IRREGULAR_SHARE / 2:
+            extra = irregular[int(position[i] * len(irregular))]
+        else:
+            extra = "unknown"
+        irregular.insert(int(position[i] * (len(irregular) + 1)), extra)
+    return lists
+
+
+def _with_bounds(
+    rng: np.random.Generator, values: np.ndarray, low: float, high: float
+) -> np.ndarray:
+    draw = rng.random(len(values))
+    values = np.where(draw < BOUNDARY_SHARE, low, values)
+    return np.where(draw > 1 - BOUNDARY_SHARE, high, values)
+
+
+def _choices(rng: np.random.Generator, table, count: int) -> list[str]:
+    keys = [*table, "unknown"]
+    weights = np.full(len(keys), (1 - UNKNOWN_SHARE) / len(table))
+    weights[-1] = UNKNOWN_SHARE
+    return rng.choice(keys, count, p=weights).tolist()
+
+
+def relative_error(actual: np.ndarray, expected: np.ndarray) -> np.ndarray:
+    """|actual - expected| scaled by |expected|, or absolute below 1."""
+    return np.abs(actual - expected) / np.maximum(np.abs(expected), 1.0)
+
+
+def run_differential(
+    cases: int = DEFAULT_CASES,
+    seed: int = 0,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    engines: dict[str, Callable[[], Engine]] = ENGINES,
+) -> DifferentialReport:
+    """Compare ``engines`` against calculate_utilities on ``cases`` purchases."""
+    rng = np.random.default_rng(seed)
+    instances = {name: make() for name, make in engines.items()}
+    errors = {name: dict.fromkeys(UTILITY_COLUMNS, 0.0) for name in instances}
+    breakeven_error = 0.0
+    failures = []
+
+    for start in range(0, cases, chunk_size):
+        purchases = random_purchases(rng, min(chunk_size, cases - start))
+        p_not_buy = rng.random(len(purchases))
+        reference = [calculate_utilities(purchase) for purchase in purchases]
+        expected = {
+            name: np.array([result[name] for result in reference])
+            for name in UTILITY_COLUMNS
+        }
+
+        for engine, score in instances.items():
+            actual = score(purchases)
+            for name in UTILITY_COLUMNS:
+                error = relative_error(actual[name], expected[name])
+                worst = int(np.argmax(error)) if len(error) else 0
+                if len(error) and not error[worst] <= RELATIVE_TOLERANCE:
+                    failures.append(
+                        f"{engine}.{name}: {actual[name][worst]!r} != "
+                        f"{expected[name][worst]!r} for {purchases[worst]!r}"
+                    )
+                errors[engine][name] = max(errors[engine][name], _max(error))
+
+        breakeven = np.array(
+            [
+                calculate_breakeven_probability(result, p)
+                for result, p in zip(reference, p_not_buy)
+            ]
+        )
+        batch = calculate_breakeven_probability_batch(expected, p_not_buy)
+        for engine, actual in (("scalar", breakeven), ("batch", batch)):
+            if not np.all((actual >= 0) & (actual <= 1)):
+                failures.append(f"{engine} breakeven outside [0, 1]")
+        error = relative_error(batch, breakeven)
+        if _max(error) > RELATIVE_TOLERANCE:
+            failures.append("batch breakeven differs from the scalar one")
+        breakeven_error = max(breakeven_error, _max(error))
+
+    return {
+        "cases": cases,
+        "seed": seed,
+        "max_relative_error": errors,
+        "breakeven_max_relative_error": breakeven_error,
+        "failures": failures,
+    }
+
+
+def _max(values: np.ndarray) -> float:
+    return float(values.max()) if len(values) else 0.0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Compare every calculator engine against calculate_utilities."
+    )
+    parser.add_argument("--cases", type=int, default=DEFAULT_CASES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument(
+        "--engine", action="append", choices=sorted(ENGINES), dest="engines"
+    )
+    args = parser.parse_args(argv)
+
+    engines = {name: ENGINES[name] for name in args.engines or ENGINES}
+    report = run_differential(args.cases, args.seed, args.chunk_size, engines)
+    for engine, columns in report["max_relative_error"].items():
+        print(f"{engine:>16}  max relative error {max(columns.values()):.3g}")
+    error = report["breakeven_max_relative_error"]
+    print(f"{'breakeven':>16}  max relative error {error:.3g}")
+    for failure in report["failures"][:20]:
+        print(failure, file=sys.stderr)
+    print(f"{report['cases']} cases, {len(report['failures'])} failures")
+    return 1 if report["failures"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
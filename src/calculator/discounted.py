@@ -0,0 +1,220 @@
+"""
+Time-discounted cash-flow model over the life span of a purchase.
+
+calculate_utilities values every hour of use equally and only counts the
+price. Here month m = 1..life_span contributes its hours of use discounted
+by ``d ** m``, with ``d = (1 + annual_discount_rate) ** (-1 / 12)``, and the
+cost of a purchase is its net present cost: the price, plus the discounted
+subscription and maintenance paid every month, less the discounted resale
+value at the end of the life span after depreciating by
+``annual_depreciation`` a year.
+
+The utilities keep the form of calculate_utilities with hours replaced by
+discounted hours and price by net present cost, so without discounting,
+recurring costs or resale value they are the same. The NPV values each
+quality-weighted hour of use at ``value_per_hour`` dollars, and
+breakeven_month is the first month at which the discounted cash flow so far
+pays back the price, counting the resale value at the end of the life span.
+
+Every discounted sum over months 1..M is a prefix sum of one array of
+discount factors up to MAX_LIFE_SPAN, computed once per call, so a batch
+costs a few lookups per record instead of a pass over every month.
+"""
+
+from dataclasses import dataclass, fields
+from typing import TypedDict
+
+import numpy as np
+
+from .batch import (
+    UTILITY_COLUMNS,
+    LookupTables,
+    PurchaseColumns,
+    build_lookup_tables,
+    encode_purchases,
+)
+from .utility_calculator import PurchaseData
+
+MAX_LIFE_SPAN = 600  # months, as the form allows
+
+DEFAULT_ANNUAL_DISCOUNT_RATE = 0.05
+DEFAULT_ANNUAL_DEPRECIATION = 0.25
+DEFAULT_VALUE_PER_HOUR = 10.0  # dollars per quality-weighted hour of use
+
+
+@dataclass(frozen=True)
+class CashFlowTerms:
+    """Discounting, recurring costs and resale of a purchase.
+
+    The costs, depreciation and value per hour may be arrays with one value
+    per record of a batch; the discount rate is shared by the whole batch.
+    """
+
+    annual_discount_rate: float = DEFAULT_ANNUAL_DISCOUNT_RATE
+    monthly_subscription: float | np.ndarray = 0.0
+    monthly_maintenance: float | np.ndarray = 0.0
+    annual_depreciation: float | np.ndarray = DEFAULT_ANNUAL_DEPRECIATION
+    value_per_hour: float | np.ndarray = DEFAULT_VALUE_PER_HOUR
+
+    def __post_init__(self):
+        if not np.isscalar(self.annual_discount_rate):
+            raise ValueError("annual_discount_rate must be a single number")
+        if not self.annual_discount_rate > -1:
+            raise ValueError("annual_discount_rate must be greater than -1")
+        for field in fields(self)[1:]:
+            value = np.asarray(getattr(self, field.name), dtype=np.float64)
+            if not np.all(np.isfinite(value)) or np.any(value < 0):
+                raise ValueError(f"{field.name} must be a non-negative number")
+        if np.any(np.asarray(self.annual_depreciation) > 1):
+            raise ValueError("annual_depreciation cannot exceed 1")
+
+
+class DiscountedUtilityMetrics(TypedDict):
+    """UtilityMetrics of the discounted model, with its cash flow."""
+
+    use_factor: float
+    u_buy_useful: float
+    u_buy_not_useful: float
+    u_not_buy_useful: float
+    u_not_buy_not_useful: float
+    discounted_hours: float
+    net_present_cost: float
+    npv: float
+    breakeven_month: int | None  # None when the price is never paid back
+
+
+class BatchDiscountedMetrics(TypedDict):
+    """Columnar DiscountedUtilityMetrics; breakeven_month is NaN when never."""
+
+    use_factor: np.ndarray
+    u_buy_useful: np.ndarray
+    u_buy_not_useful: np.ndarray
+    u_not_buy_useful: np.ndarray
+    u_not_buy_not_useful: np.ndarray
+    discounted_hours: np.ndarray
+    net_present_cost: np.ndarray
+    npv: np.ndarray
+    breakeven_month: np.ndarray
+
+
+def discount_factors(annual_discount_rate: float) -> np.ndarray:
+    """Sum of the discount factors of months 1..M, indexed by M <= MAX_LIFE_SPAN."""
+    monthly = (1 + annual_discount_rate) ** (-1 / 12)
+    months = np.arange(1, MAX_LIFE_SPAN + 1, dtype=np.float64)
+    return np.concatenate(([0.0], np.cumsum(monthly**months)))
+
+
+def calculate_discounted_batch(
+    columns: PurchaseColumns,
+    terms: CashFlowTerms | None = None,
+    tables: LookupTables | None = None,
+) -> BatchDiscountedMetrics:
+    """Discounted utilities, NPV and breakeven month of encoded columns.
+
+    ``tables`` must be the same LookupTables used to encode ``columns``.
+    """
+    if terms is None:
+        terms = CashFlowTerms()
+    if tables is None:
+        tables = build_lookup_tables()
+
+    price = columns["price"]
+    if np.any(price == 0):
+        raise ZeroDivisionError("float division by zero")
+    life_span = columns["life_span"]
+    months = life_span.astype(np.intp)
+    if np.any(months != life_span) or np.any((months < 0) | (months > MAX_LIFE_SPAN)):
+        raise ValueError(f"Life span must be whole months up to {MAX_LIFE_SPAN}")
+
+    # Hours of use in each month, and weighted by the quality multipliers
+    hours = (
+        columns["time_use"]
+        * tables.weeks_per_year
+        / tables.months_per_year
+        * tables.use_probability[columns["use_probability"]]
+    )
+    quality = (
+        tables.category_mult[columns["category"]]
+        * tables.necessity_mult[columns["necessity"]]
+        * columns["life_area_mult"]
+    )
+
+    annuity = discount_factors(terms.annual_discount_rate)
+    horizon = annuity[months]
+    recurring = terms.monthly_subscription + terms.monthly_maintenance
+    # Resale at the end of the life span, discounted to today
+    resale = price * (
+        (1 - terms.annual_depreciation) / (1 + terms.annual_discount_rate)
+    ) ** (months / 12)
+    net_present_cost = price + recurring * horizon - resale
+    if np.any(net_present_cost <= 0):
+        raise ValueError(
+            "Net present cost must be greater than 0: the resale value left after "
+            "annual_depreciation and annual_discount_rate covers the price plus "
+            "monthly_subscription and monthly_maintenance"
+        )
+
+    discounted_hours = hours * horizon
+    benefit_factor = discounted_hours * quality / net_present_cost
+    weights = tables.income_weights[columns["income_level"]]
+
+    inflow = terms.value_per_hour * hours * quality - recurring
+    npv = inflow * horizon + resale - price
+    return {
+        "use_factor": discounted_hours / net_present_cost,
+        "u_buy_useful": benefit_factor * weights[:, 0],
+        "u_buy_not_useful": benefit_factor * weights[:, 1],
+        "u_not_buy_useful": benefit_factor * weights[:, 2],
+        "u_not_buy_not_useful": benefit_factor * weights[:, 3],
+        "discounted_hours": discounted_hours,
+        "net_present_cost": net_present_cost,
+        "npv": npv,
+        "breakeven_month": _breakeven_month(annuity, price, inflow, months, npv),
+    }
+
+
+def _breakeven_month(
+    annuity: np.ndarray,
+    price: np.ndarray,
+    inflow: np.ndarray,
+    months: np.ndarray,
+    npv: np.ndarray,
+) -> np.ndarray:
+    """First month whose discounted cash flow so far covers the price.
+
+    Before the last month the cash flow grows with ``annuity`` when the
+    monthly inflow is positive, so the month is a binary search in it; the
+    resale value can only complete the payback in the last month.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        needed = np.where(inflow > 0, price / inflow, np.inf)
+    month = np.searchsorted(annuity, needed).astype(np.float64)
+    return np.where(
+        month < months, month, np.where(npv >= 0, months.astype(np.float64), np.nan)
+    )
+
+
+def calculate_discounted_utilities(
+    purchase_data: PurchaseData,
+    terms: CashFlowTerms | None = None,
+    tables: LookupTables | None = None,
+) -> DiscountedUtilityMetrics:
+    """calculate_discounted_batch for one PurchaseData record."""
+    if tables is None:
+        tables = build_lookup_tables()
+    batch = calculate_discounted_batch(
+        encode_purchases([purchase_data], tables), terms, tables
+    )
+    month = batch["breakeven_month"][0]
+    return {
+        **{
+            name: float(batch[name][0])
+            for name in (
+                *UTILITY_COLUMNS,
+                "discounted_hours",
+                "net_present_cost",
+                "npv",
+            )
+        },
+        "breakeven_month": None if np.isnan(month) else int(month),
+    }
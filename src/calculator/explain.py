@@ -0,0 +1,202 @@
+"""
+Explain mode: every intermediate term behind the utilities.
+
+explain_utilities and explain_batch repeat the steps of calculate_utilities
+and calculate_utilities_batch, keeping each term instead of discarding it.
+The arithmetic is the same and in the same order, so the utilities they
+return are identical. They are separate functions rather than a flag on
+the scoring path, so scoring without a trace does no extra work.
+"""
+
+import numpy as np
+
+from .batch import (
+    BatchUtilityMetrics,
+    LookupTables,
+    PurchaseColumns,
+    build_lookup_tables,
+)
+from .constants import (
+    CATEGORY_MULTIPLIERS,
+    DEFAULT_INCOME_WEIGHTS,
+    DEFAULT_USE_FACTOR_ZERO_PRICE,
+    INCOME_WEIGHTS,
+    LIFE_AREA_WEIGHTS,
+    MONTHS_PER_YEAR,
+    NECESSITY_SCORES,
+    USE_PROBABILITY_VALUES,
+    WEEKS_PER_YEAR,
+)
+from .utility_calculator import PurchaseData, UtilityMetrics
+
+# Numeric terms of a trace, in the order they are computed
+TRACE_COLUMNS = (
+    "prob",
+    "time_use_year",
+    "life_span_years",
+    "total_time_use",
+    "category_mult",
+    "necessity_mult",
+    "life_area_mult",
+    "benefit",
+    "benefit_factor",
+    "weight_buy_useful",
+    "weight_buy_not_useful",
+    "weight_not_buy_useful",
+    "weight_not_buy_not_useful",
+)
+
+
+class UtilityTrace(UtilityMetrics):
+    """UtilityMetrics with the terms they were computed from."""
+
+    prob: float  # value of use_probability
+    time_use_year: float  # hours a year
+    life_span_years: float
+    total_time_use: float  # expected hours over the life span
+    category_mult: float
+    necessity_mult: float
+    life_area_weights: list[tuple[str, float]]  # (area, weight), repeats kept
+    life_area_mult: float  # mean of life_area_weights, 1 without areas
+    benefit: float  # total_time_use times the three multipliers
+    benefit_factor: float  # benefit per dollar
+    weight_buy_useful: float  # income weights applied to benefit_factor
+    weight_buy_not_useful: float
+    weight_not_buy_useful: float
+    weight_not_buy_not_useful: float
+    defaults: list[str]  # inputs not in the constants, scored with a default
+
+
+class BatchUtilityTrace(BatchUtilityMetrics):
+    """Columnar UtilityTrace of the numeric terms, one array per term."""
+
+    prob: np.ndarray
+    time_use_year: np.ndarray
+    life_span_years: np.ndarray
+    total_time_use: np.ndarray
+    category_mult: np.ndarray
+    necessity_mult: np.ndarray
+    life_area_mult: np.ndarray
+    benefit: np.ndarray
+    benefit_factor: np.ndarray
+    weight_buy_useful: np.ndarray
+    weight_buy_not_useful: np.ndarray
+    weight_not_buy_useful: np.ndarray
+    weight_not_buy_not_useful: np.ndarray
+
+
+def explain_utilities(purchase_data: PurchaseData) -> UtilityTrace:
+    """calculate_utilities with every intermediate term."""
+    price = purchase_data["price"]
+    income_level = purchase_data["income_level"]
+    life_areas = purchase_data["life_areas"]
+    necessity = purchase_data["necessity"]
+    use_probability = purchase_data["use_probability"]
+    category = purchase_data["category"]
+
+    prob = USE_PROBABILITY_VALUES.get(use_probability, 1)
+    time_use_year = purchase_data["time_use"] * WEEKS_PER_YEAR
+    life_span_years = purchase_data["life_span"] / MONTHS_PER_YEAR
+    total_time_use = time_use_year * life_span_years * prob
+
+    category_mult = CATEGORY_MULTIPLIERS.get(category, 1.0)
+    necessity_mult = NECESSITY_SCORES.get(necessity, 0.8)
+    area_weights = [LIFE_AREA_WEIGHTS.get(area, 1.0) for area in life_areas]
+    life_area_mult = 1.0
+    if area_weights:
+        life_area_mult = sum(area_weights) / len(area_weights)
+
+    benefit = total_time_use * category_mult * necessity_mult * life_area_mult
+
+    income_weights = INCOME_WEIGHTS.get(income_level, DEFAULT_INCOME_WEIGHTS)
+    use_factor = total_time_use / price if price > 0 else DEFAULT_USE_FACTOR_ZERO_PRICE
+    benefit_factor = benefit / price
+    buy_useful, buy_not_useful = income_weights["buy"]
+    not_buy_useful, not_buy_not_useful = income_weights["not_buy"]
+
+    defaults = [
+        name
+        for name, value, table in (
+            ("use_probability", use_probability, USE_PROBABILITY_VALUES),
+            ("category", category, CATEGORY_MULTIPLIERS),
+            ("necessity", necessity, NECESSITY_SCORES),
+            ("income_level", income_level, INCOME_WEIGHTS),
+        )
+        if value not in table
+    ]
+    if any(area not in LIFE_AREA_WEIGHTS for area in life_areas):
+        defaults.append("life_areas")
+
+    return {
+        "use_factor": use_factor,
+        "u_buy_useful": benefit_factor * buy_useful,
+        "u_buy_not_useful": benefit_factor * buy_not_useful,
+        "u_not_buy_useful": benefit_factor * not_buy_useful,
+        "u_not_buy_not_useful": benefit_factor * not_buy_not_useful,
+        "prob": prob,
+        "time_use_year": time_use_year,
+        "life_span_years": life_span_years,
+        "total_time_use": total_time_use,
+        "category_mult": category_mult,
+        "necessity_mult": necessity_mult,
+        "life_area_weights": list(zip(life_areas, area_weights)),
+        "life_area_mult": life_area_mult,
+        "benefit": benefit,
+        "benefit_factor": benefit_factor,
+        "weight_buy_useful": buy_useful,
+        "weight_buy_not_useful": buy_not_useful,
+        "weight_not_buy_useful": not_buy_useful,
+        "weight_not_buy_not_useful": not_buy_not_useful,
+        "defaults": defaults,
+    }
+
+
+def explain_batch(
+    columns: PurchaseColumns, tables: LookupTables | None = None
+) -> BatchUtilityTrace:
+    """calculate_utilities_batch with every intermediate term.
+
+    ``tables`` must be the same LookupTables used to encode ``columns``.
+    """
+    if tables is None:
+        tables = build_lookup_tables()
+
+    price = columns["price"]
+    if np.any(price == 0):
+        raise ZeroDivisionError("float division by zero")
+
+    prob = tables.use_probability[columns["use_probability"]]
+    time_use_year = columns["time_use"] * tables.weeks_per_year
+    life_span_years = columns["life_span"] / tables.months_per_year
+    total_time_use = time_use_year * life_span_years * prob
+
+    category_mult = tables.category_mult[columns["category"]]
+    necessity_mult = tables.necessity_mult[columns["necessity"]]
+    life_area_mult = columns["life_area_mult"]
+    benefit = total_time_use * category_mult * necessity_mult * life_area_mult
+
+    use_factor = np.where(
+        price > 0, total_time_use / price, tables.zero_price_use_factor
+    )
+    benefit_factor = benefit / price
+    weights = tables.income_weights[columns["income_level"]]
+    return {
+        "use_factor": use_factor,
+        "u_buy_useful": benefit_factor * weights[:, 0],
+        "u_buy_not_useful": benefit_factor * weights[:, 1],
+        "u_not_buy_useful": benefit_factor * weights[:, 2],
+        "u_not_buy_not_useful": benefit_factor * weights[:, 3],
+        "prob": prob,
+        "time_use_year": time_use_year,
+        "life_span_years": life_span_years,
+        "total_time_use": total_time_use,
+        "category_mult": category_mult,
+        "necessity_mult": necessity_mult,
+        "life_area_mult": life_area_mult,
+        "benefit": benefit,
+        "benefit_factor": benefit_factor,
+        "weight_buy_useful": weights[:, 0],
+        "weight_buy_not_useful": weights[:, 1],
+        "weight_not_buy_useful": weights[:, 2],
+        "weight_not_buy_not_useful": weights[:, 3],
+    }
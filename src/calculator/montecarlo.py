@@ -0,0 +1,228 @@
+"""
+Monte Carlo uncertainty analysis for a single purchase decision.
+
+``time_use``, ``life_span`` and ``use_probability`` are treated as
+distributions instead of point estimates. Samples are drawn in vectorized
+blocks from a seedable NumPy generator.
+
+The probabilities of the item being useful (p_useful_if_buy and
+p_useful_if_not_buy) may be distributions as well. Each utility metric is a
+fixed multiple of the total hours of use, so its statistics follow exactly
+from the sampled hours; only the two expected utilities are stored per
+sample.
+"""
+
+from dataclasses import dataclass
+from typing import Protocol, TypedDict, runtime_checkable
+
+import numpy as np
+
+from .batch import encode_purchases
+from .compiled import get_scoring_table
+from .constants import DEFAULT_P_USEFUL_IF_BUY, DEFAULT_P_USEFUL_IF_NOT_BUY
+from .utility_calculator import PurchaseData
+
+DEFAULT_SAMPLES = 1_000_000
+DEFAULT_BLOCK_SIZE = 1 << 17
+DEFAULT_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+# Valid input ranges, matching the form validation
+MAX_TIME_USE = 168.0  # hours in a week
+MAX_LIFE_SPAN = 600.0  # months
+
+
+@runtime_checkable
+class Distribution(Protocol):
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray: ...
+
+
+@dataclass(frozen=True)
+class Fixed:
+    """A point estimate."""
+
+    value: float
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        return np.full(size, self.value, dtype=np.float64)
+
+
+@dataclass(frozen=True)
+class Uniform:
+    low: float
+    high: float
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        return rng.uniform(self.low, self.high, size)
+
+
+@dataclass(frozen=True)
+class Normal:
+    mean: float
+    std: float
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        return rng.normal(self.mean, self.std, size)
+
+
+@dataclass(frozen=True)
+class Triangular:
+    low: float
+    mode: float
+    high: float
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        return rng.triangular(self.low, self.mode, self.high, size)
+
+
+@dataclass(frozen=True)
+class Beta:
+    """Beta distribution, the natural choice for a probability."""
+
+    alpha: float
+    beta: float
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        return rng.beta(self.alpha, self.beta, size)
+
+
+class MetricSummary(TypedDict):
+    mean: float
+    std: float
+    quantiles: list[float]
+
+
+class MonteCarloReport(TypedDict):
+    """Summary statistics of a Monte Carlo run."""
+
+    samples: int
+    seed: int | None
+    quantile_levels: list[float]
+    metrics: dict[str, MetricSummary]  # UtilityMetrics keys, eu_buy, eu_not_buy
+    p_buy_wins: float
+
+
+def simulate_decision(
+    purchase_data: PurchaseData,
+    time_use: Distribution | None = None,
+    life_span: Distribution | None = None,
+    use_probability: Distribution | None = None,
+    p_useful_if_buy: float | Distribution = DEFAULT_P_USEFUL_IF_BUY,
+    p_useful_if_not_buy: float | Distribution = DEFAULT_P_USEFUL_IF_NOT_BUY,
+    samples: int = DEFAULT_SAMPLES,
+    seed: int | None = None,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    quantiles: tuple[float, ...] = DEFAULT_QUANTILES,
+) -> MonteCarloReport:
+    """Run a Monte Carlo simulation of one purchase decision.
+
+    Fields without a distribution keep the point estimate from
+    ``purchase_data``. Samples are clipped to the ranges the forms accept.
+    The same seed and block size always reproduce the same report.
+    """
+    if samples < 1:
+        raise ValueError("Samples must be at least 1")
+    price = purchase_data["price"]
+    if price == 0:
+        raise ZeroDivisionError("float division by zero")
+
+    table = get_scoring_table()
+    lookup = table.lookup
+    columns = encode_purchases([purchase_data], lookup)
+
+    if time_use is None:
+        time_use = Fixed(purchase_data["time_use"])
+    if life_span is None:
+        life_span = Fixed(purchase_data["life_span"])
+    if use_probability is None:
+        use_probability = Fixed(
+            float(lookup.use_probability[columns["use_probability"][0]])
+        )
+
+    # Everything except total hours of use is fixed for this decision
+    quality = float(
+        lookup.category_mult[columns["category"][0]]
+        * lookup.necessity_mult[columns["necessity"][0]]
+        * columns["life_area_mult"][0]
+    )
+    buy_useful, buy_not_useful, not_buy_useful, not_buy_not_useful = (
+        lookup.income_weights[columns["income_level"][0]].tolist()
+    )
+    if not isinstance(p_useful_if_buy, Distribution):
+        p_useful_if_buy = Fixed(p_useful_if_buy)
+    if not isinstance(p_useful_if_not_buy, Distribution):
+        p_useful_if_not_buy = Fixed(p_useful_if_not_buy)
+
+    benefit_per_hour = quality / price
+    coefficients = {
+        "use_factor": 1 / price if price > 0 else 0.0,
+        "u_buy_useful": benefit_per_hour * buy_useful,
+        "u_buy_not_useful": benefit_per_hour * buy_not_useful,
+        "u_not_buy_useful": benefit_per_hour * not_buy_useful,
+        "u_not_buy_not_useful": benefit_per_hour * not_buy_not_useful,
+    }
+
+    rng = np.random.default_rng(seed)
+    total_time_use = np.empty(samples, dtype=np.float64)
+    eu_buy = np.empty(samples, dtype=np.float64)
+    eu_not_buy = np.empty(samples, dtype=np.float64)
+    hours_per_month = lookup.weeks_per_year / lookup.months_per_year
+    for start in range(0, samples, block_size):
+        stop = min(start + block_size, samples)
+        size = stop - start
+        hours = total_time_use[start:stop]
+        np.multiply(
+            np.clip(time_use.sample(rng, size), 0.0, MAX_TIME_USE),
+            np.clip(life_span.sample(rng, size), 0.0, MAX_LIFE_SPAN),
+            out=hours,
+        )
+        hours *= hours_per_month
+        hours *= np.clip(use_probability.sample(rng, size), 0.0, 1.0)
+
+        benefit_factor = hours * benefit_per_hour
+        p_buy = np.clip(p_useful_if_buy.sample(rng, size), 0.0, 1.0)
+        p_not_buy = np.clip(p_useful_if_not_buy.sample(rng, size), 0.0, 1.0)
+        eu_buy[start:stop] = benefit_factor * (
+            p_buy * buy_useful + (1 - p_buy) * buy_not_useful
+        )
+        eu_not_buy[start:stop] = benefit_factor * (
+            p_not_buy * not_buy_useful + (1 - p_not_buy) * not_buy_not_useful
+        )
+
+    levels = np.asarray(quantiles, dtype=np.float64)
+    mean = float(total_time_use.mean())
+    std = float(total_time_use.std())
+    low_to_high = np.quantile(total_time_use, levels)
+    high_to_low = np.quantile(total_time_use, 1 - levels)
+
+    metrics: dict[str, MetricSummary] = {}
+    for name, coefficient in coefficients.items():
+        # Quantiles of a negative multiple come from the opposite tail
+        metrics[name] = {
+            "mean": coefficient * mean,
+            "std": abs(coefficient) * std,
+            "quantiles": (
+                coefficient * (low_to_high if coefficient >= 0 else high_to_low)
+            ).tolist(),
+        }
+    if price <= 0:
+        metrics["use_factor"] = {
+            "mean": lookup.zero_price_use_factor,
+            "std": 0.0,
+            "quantiles": [lookup.zero_price_use_factor] * len(levels),
+        }
+    for name, values in (("eu_buy", eu_buy), ("eu_not_buy", eu_not_buy)):
+        metrics[name] = {
+            "mean": float(values.mean()),
+            "std": float(values.std()),
+            "quantiles": np.quantile(values, levels).tolist(),
+        }
+
+    p_buy_wins = np.count_nonzero(eu_buy > eu_not_buy) / samples
+
+    return {
+        "samples": samples,
+        "seed": seed,
+        "quantile_levels": levels.tolist(),
+        "metrics": metrics,
+        "p_buy_wins": float(p_buy_wins),
+    }
@@ -0,0 +1,181 @@
+"""
+Versioned weight profiles.
+
+A WeightProfile holds every table and constant the calculator uses. The
+built-in profile mirrors the constants module; other profiles are loaded
+from TOML or JSON files, for example:
+
+    version = "2026-10-a"
+    name = "Conservative"
+
+    [life_area_weights]
+    career = 1.2
+    personal = 1.0
+    health = 1.5
+
+    [income_weights.low]
+    buy = [2, -10]
+    not_buy = [-1, 0]
+
+Sections left out of a file keep their built-in values, and so do income
+levels left out of ``income_weights``; a level that is given replaces both
+of its outcomes. Profiles are compiled into lookup tables by
+build_lookup_tables and build_scoring_table.
+"""
+
+import json
+import tomllib
+from collections.abc import Mapping
+from dataclasses import dataclass, fields
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any
+
+from . import constants
+
+BUILTIN_VERSION = "builtin"
+
+# Life areas are stored as a bitmask with one table entry per subset
+MAX_LIFE_AREAS = 8
+
+_OUTCOMES = ("buy", "not_buy")
+
+
+@dataclass(frozen=True)
+class WeightProfile:
+    """Immutable set of weights and constants, identified by ``version``."""
+
+    version: str
+    necessity_scores: Mapping[str, float]
+    category_multipliers: Mapping[str, float]
+    life_area_weights: Mapping[str, float]
+    use_probability_values: Mapping[str, float]
+    income_weights: Mapping[str, Mapping[str, tuple[float, float]]]
+    default_income_weights: Mapping[str, tuple[float, float]]
+    weeks_per_year: float
+    months_per_year: float
+    default_use_factor_zero_price: float
+    name: str = ""
+
+
+_TABLES = (
+    "necessity_scores",
+    "category_multipliers",
+    "life_area_weights",
+    "use_probability_values",
+)
+_SCALARS = (
+    "weeks_per_year",
+    "months_per_year",
+    "default_use_factor_zero_price",
+)
+
+
+def builtin_profile() -> WeightProfile:
+    """Profile with the current values of the constants module."""
+    return parse_profile({"version": BUILTIN_VERSION, "name": "Built-in"})
+
+
+def _builtin_values() -> dict[str, Any]:
+    return {
+        "necessity_scores": constants.NECESSITY_SCORES,
+        "category_multipliers": constants.CATEGORY_MULTIPLIERS,
+        "life_area_weights": constants.LIFE_AREA_WEIGHTS,
+        "use_probability_values": constants.USE_PROBABILITY_VALUES,
+        "income_weights": constants.INCOME_WEIGHTS,
+        "default_income_weights": constants.DEFAULT_INCOME_WEIGHTS,
+        "weeks_per_year": constants.WEEKS_PER_YEAR,
+        "months_per_year": constants.MONTHS_PER_YEAR,
+        "default_use_factor_zero_price": constants.DEFAULT_USE_FACTOR_ZERO_PRICE,
+    }
+
+
+def parse_profile(data: Mapping[str, Any]) -> WeightProfile:
+    """Validate a decoded profile document, filling gaps with built-in values."""
+    known = {field.name for field in fields(WeightProfile)}
+    unknown = set(data) - known
+    if unknown:
+        raise ValueError(f"Unknown profile keys: {', '.join(sorted(unknown))}")
+    version = data.get("version")
+    if not isinstance(version, str) or not version:
+        raise ValueError("Profile version must be a non-empty string")
+    name = data.get("name", "")
+    if not isinstance(name, str):
+        raise ValueError("Profile name must be a string")
+
+    values = {**_builtin_values(), **data}
+    tables = {key: _table(key, values[key]) for key in _TABLES}
+    if not tables["life_area_weights"]:
+        raise ValueError("life_area_weights needs at least one life area")
+    if len(tables["life_area_weights"]) > MAX_LIFE_AREAS:
+        raise ValueError(f"At most {MAX_LIFE_AREAS} life areas are supported")
+
+    income_weights = data.get("income_weights", {})
+    if not isinstance(income_weights, Mapping):
+        raise ValueError("income_weights must be a table of income levels")
+    # Income levels left out keep their built-in weights
+    income_weights = {**constants.INCOME_WEIGHTS, **income_weights}
+    scalars = {key: _number(key, values[key]) for key in _SCALARS}
+    if scalars["months_per_year"] == 0:
+        raise ValueError("months_per_year must not be 0")
+
+    return WeightProfile(
+        version=version,
+        name=name,
+        **tables,
+        income_weights=MappingProxyType(
+            {
+                str(level): _outcome_weights(f"income_weights.{level}", weights)
+                for level, weights in income_weights.items()
+            }
+        ),
+        default_income_weights=_outcome_weights(
+            "default_income_weights", values["default_income_weights"]
+        ),
+        **scalars,
+    )
+
+
+def load_profile(path: str | Path) -> WeightProfile:
+    """Load a profile from a .toml or .json file."""
+    path = Path(path)
+    try:
+        if path.suffix.lower() == ".json":
+            data = json.loads(path.read_text(encoding="utf-8"))
+        else:
+            with open(path, "rb") as file:
+                data = tomllib.load(file)
+    except (tomllib.TOMLDecodeError, json.JSONDecodeError) as error:
+        raise ValueError(f"{path}: {error}") from None
+    if not isinstance(data, Mapping):
+        raise ValueError(f"{path}: a profile must be a table of settings")
+    try:
+        return parse_profile(data)
+    except ValueError as error:
+        raise ValueError(f"{path}: {error}") from None
+
+
+def _number(key: str, value: Any) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{key} must be a number")
+    return value
+
+
+def _table(key: str, table: Any) -> Mapping[str, float]:
+    if not isinstance(table, Mapping):
+        raise ValueError(f"{key} must be a table of numbers")
+    return MappingProxyType(
+        {str(name): _number(f"{key}.{name}", value) for name, value in table.items()}
+    )
+
+
+def _outcome_weights(key: str, weights: Any) -> Mapping[str, tuple[float, float]]:
+    if not isinstance(weights, Mapping) or set(weights) != set(_OUTCOMES):
+        raise ValueError(f"{key} needs exactly 'buy' and 'not_buy' weights")
+    pairs = {}
+    for outcome in _OUTCOMES:
+        pair = weights[outcome]
+        if not isinstance(pair, (list, tuple)) or len(pair) != 2:
+            raise ValueError(f"{key}.{outcome} must be [useful, not_useful]")
+        pairs[outcome] = tuple(_number(f"{key}.{outcome}", value) for value in pair)
+    return MappingProxyType(pairs)
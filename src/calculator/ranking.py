@@ -0,0 +1,231 @@
+"""
+Comparison of many candidate purchases.
+
+rank_options scores every candidate with the compiled table and the
+expected-utility functions and returns the best k without sorting the rest.
+select_within_budget picks the subset with the largest total gain
+(E[U(Buy)] - E[U(Don't Buy)]) whose prices fit a budget, as a 0/1 knapsack:
+exactly by dynamic programming over the budget in ``resolution`` steps, or
+greedily by gain per unit of price with an upper bound on the optimum.
+"""
+
+from collections.abc import Sequence
+from typing import TypedDict
+
+import numpy as np
+
+from .batch import encode_purchases
+from .compiled import ScoringTable, calculate_utilities_compiled, get_scoring_table
+from .constants import DEFAULT_P_USEFUL_IF_BUY, DEFAULT_P_USEFUL_IF_NOT_BUY
+from .utility_calculator import (
+    PurchaseData,
+    calculate_expected_utility_buy,
+    calculate_expected_utility_not_buy,
+)
+
+RANK_KEYS = ("eu_buy", "gain")
+SELECTION_METHODS = ("auto", "dp", "greedy")
+
+# Largest items x budget steps table the exact solver will allocate (bytes)
+DP_MAX_CELLS = 20_000_000
+
+
+class OptionScores(TypedDict):
+    """Per-candidate prices and expected utilities, in input order."""
+
+    price: np.ndarray
+    eu_buy: np.ndarray
+    eu_not_buy: np.ndarray
+    gain: np.ndarray
+
+
+class RankedOptions(OptionScores):
+    """The best candidates, best first; ``index`` is their input position."""
+
+    index: np.ndarray
+
+
+class BudgetSelection(TypedDict):
+    """Candidates chosen within a budget, by input position."""
+
+    index: np.ndarray
+    total_price: float
+    total_gain: float
+    upper_bound: float  # no selection within the budget gains more
+    method: str
+
+
+def score_options(
+    purchases: Sequence[PurchaseData],
+    p_useful_if_buy: float | np.ndarray = DEFAULT_P_USEFUL_IF_BUY,
+    p_useful_if_not_buy: float | np.ndarray = DEFAULT_P_USEFUL_IF_NOT_BUY,
+    table: ScoringTable | None = None,
+) -> OptionScores:
+    """Expected utilities of buying each candidate.
+
+    Either probability may be one value for every candidate or one per
+    candidate. ``table`` defaults to the active scoring table.
+    """
+    if table is None:
+        table = get_scoring_table()
+    columns = encode_purchases(purchases, table.lookup)
+    results = calculate_utilities_compiled(columns, table)
+    eu_buy = calculate_expected_utility_buy(np.asarray(p_useful_if_buy), results)
+    eu_not_buy = calculate_expected_utility_not_buy(
+        np.asarray(p_useful_if_not_buy), results
+    )
+    shape = columns["price"].shape
+    eu_buy = np.broadcast_to(eu_buy, shape)
+    eu_not_buy = np.broadcast_to(eu_not_buy, shape)
+    return {
+        "price": columns["price"],
+        "eu_buy": eu_buy,
+        "eu_not_buy": eu_not_buy,
+        "gain": eu_buy - eu_not_buy,
+    }
+
+
+def top_k(values: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the ``k`` largest values, largest first.
+
+    Partitions before sorting, so only the selected values are sorted. Ties
+    keep input order.
+    """
+    values = np.asarray(values)
+    k = min(max(k, 0), values.shape[0])
+    if k == 0:
+        return np.empty(0, dtype=np.intp)
+    if k < values.shape[0]:
+        threshold = np.partition(values, values.shape[0] - k)[values.shape[0] - k]
+        # Everything above the k-th largest value, then ties in input order
+        candidates = np.flatnonzero(values >= threshold)
+    else:
+        candidates = np.arange(k)
+    order = np.argsort(-values[candidates], kind="stable")
+    return candidates[order[:k]]
+
+
+def rank_options(
+    purchases: Sequence[PurchaseData],
+    k: int = 10,
+    p_useful_if_buy: float | np.ndarray = DEFAULT_P_USEFUL_IF_BUY,
+    p_useful_if_not_buy: float | np.ndarray = DEFAULT_P_USEFUL_IF_NOT_BUY,
+    by: str = "eu_buy",
+    table: ScoringTable | None = None,
+) -> RankedOptions:
+    """The ``k`` candidates with the highest ``by`` (eu_buy or gain)."""
+    if by not in RANK_KEYS:
+        raise ValueError(f"Cannot rank by {by!r}, expected one of {RANK_KEYS}")
+    scores = score_options(purchases, p_useful_if_buy, p_useful_if_not_buy, table)
+    index = top_k(scores[by], k)
+    return {"index": index, **{name: value[index] for name, value in scores.items()}}
+
+
+def select_within_budget(
+    price: np.ndarray,
+    gain: np.ndarray,
+    budget: float,
+    method: str = "auto",
+    resolution: float = 1.0,
+) -> BudgetSelection:
+    """Choose the candidates with the most total gain whose prices fit ``budget``.
+
+    Only candidates with a positive gain are worth buying. ``dp`` is exact
+    for prices rounded up to ``resolution``; ``greedy`` takes candidates by
+    gain per unit of price and falls back to the single best candidate when
+    that gains more, so it reaches at least half the optimum. ``auto`` uses
+    ``dp`` when its table fits in DP_MAX_CELLS.
+    """
+    if method not in SELECTION_METHODS:
+        raise ValueError(
+            f"Unsupported method {method!r}, expected one of {SELECTION_METHODS}"
+        )
+    if budget < 0:
+        raise ValueError("Budget must not be negative")
+    if resolution <= 0:
+        raise ValueError("Resolution must be greater than 0")
+    price = np.asarray(price, dtype=np.float64)
+    gain = np.asarray(gain, dtype=np.float64)
+
+    eligible = np.flatnonzero((gain > 0) & (price <= budget))
+    # Best gain per unit of price first; ties keep input order
+    eligible = eligible[np.argsort(-gain[eligible] / price[eligible], kind="stable")]
+    steps = int(np.floor(budget / resolution + 1e-9))
+    cells = eligible.shape[0] * (steps + 1)
+    if method == "dp" and cells > DP_MAX_CELLS:
+        raise ValueError(
+            f"{eligible.shape[0]} candidates over {steps} budget steps is too "
+            "large for dp; use a coarser resolution or the greedy method"
+        )
+    if method == "auto":
+        method = "dp" if cells <= DP_MAX_CELLS else "greedy"
+
+    if method == "dp":
+        chosen = _knapsack_dp(price[eligible], gain[eligible], steps, resolution)
+    else:
+        chosen = _knapsack_greedy(price[eligible], gain[eligible], budget)
+    index = np.sort(eligible[chosen])
+    return {
+        "index": index,
+        "total_price": float(price[index].sum()),
+        "total_gain": float(gain[index].sum()),
+        "upper_bound": _fractional_bound(price[eligible], gain[eligible], budget),
+        "method": method,
+    }
+
+
+def _knapsack_dp(
+    price: np.ndarray, gain: np.ndarray, steps: int, resolution: float
+) -> np.ndarray:
+    """Exact 0/1 knapsack over ``steps`` budget steps; returns chosen positions."""
+    weights = np.maximum(np.ceil(price / resolution - 1e-9), 1).astype(np.intp)
+    best = np.zeros(steps + 1)
+    taken = np.zeros((price.shape[0], steps + 1), dtype=bool)
+    for item, (weight, value) in enumerate(zip(weights, gain)):
+        if weight > steps:
+            continue
+        with_item = best[:-weight] + value
+        better = with_item > best[weight:]
+        best[weight:] = np.where(better, with_item, best[weight:])
+        taken[item, weight:] = better
+
+    chosen = []
+    remaining = steps
+    for item in range(price.shape[0] - 1, -1, -1):
+        if taken[item, remaining]:
+            chosen.append(item)
+            remaining -= weights[item]
+    return np.array(chosen[::-1], dtype=np.intp)
+
+
+def _knapsack_greedy(price: np.ndarray, gain: np.ndarray, budget: float) -> np.ndarray:
+    """Greedy fill of candidates sorted by gain per unit of price."""
+    if price.shape[0] == 0:
+        return np.empty(0, dtype=np.intp)
+    # The longest prefix that fits, then any later candidate that still fits
+    prefix = int(np.searchsorted(np.cumsum(price), budget, side="right"))
+    chosen = list(range(prefix))
+    remaining = budget - float(price[:prefix].sum())
+    for item in range(prefix, price.shape[0]):
+        if price[item] <= remaining:
+            chosen.append(item)
+            remaining -= price[item]
+
+    best_single = int(np.argmax(gain))
+    if gain[best_single] > gain[chosen].sum():
+        return np.array([best_single], dtype=np.intp)
+    return np.array(chosen, dtype=np.intp)
+
+
+def _fractional_bound(price: np.ndarray, gain: np.ndarray, budget: float) -> float:
+    """Gain of the fractional knapsack, an upper bound on any 0/1 selection.
+
+    ``price`` and ``gain`` must be sorted by gain per unit of price.
+    """
+    cumulative = np.cumsum(price)
+    prefix = int(np.searchsorted(cumulative, budget, side="right"))
+    bound = float(gain[:prefix].sum())
+    if prefix < price.shape[0]:
+        spent = float(cumulative[prefix - 1]) if prefix else 0.0
+        bound += float(gain[prefix]) * (budget - spent) / float(price[prefix])
+    return bound
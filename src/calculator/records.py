@@ -0,0 +1,190 @@
+"""
+Compact representations of purchase data and utility metrics.
+
+PurchaseRecord and UtilityRecord are ``__slots__`` dataclasses that support
+``record["field"]`` lookups, so every calculator function that takes a
+PurchaseData or UtilityMetrics dict accepts them unchanged. For bulk storage
+pack_purchases and pack_utilities build NumPy structured arrays with
+categorical fields stored as one-byte codes.
+"""
+
+from collections.abc import Iterable
+from dataclasses import dataclass, fields
+from typing import Any
+
+import numpy as np
+
+from .batch import (
+    UTILITY_COLUMNS,
+    BatchUtilityMetrics,
+    LookupTables,
+    PurchaseColumns,
+    build_lookup_tables,
+    encode_purchases,
+)
+from .utility_calculator import PurchaseData, UtilityMetrics
+
+
+class _Subscriptable:
+    """Dict-style field access for the record dataclasses."""
+
+    __slots__ = ()
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def to_dict(self) -> dict:
+        return {field.name: getattr(self, field.name) for field in fields(self)}
+
+
+@dataclass(slots=True, frozen=True)
+class PurchaseRecord(_Subscriptable):
+    """Compact, immutable PurchaseData."""
+
+    item_name: str
+    price: float
+    income_level: str
+    life_areas: tuple[str, ...]
+    necessity: str
+    time_use: float
+    use_probability: str
+    life_span: int
+    category: str
+
+    @classmethod
+    def from_dict(cls, purchase_data: PurchaseData) -> "PurchaseRecord":
+        return cls(
+            item_name=purchase_data["item_name"],
+            price=purchase_data["price"],
+            income_level=purchase_data["income_level"],
+            life_areas=tuple(purchase_data["life_areas"]),
+            necessity=purchase_data["necessity"],
+            time_use=purchase_data["time_use"],
+            use_probability=purchase_data["use_probability"],
+            life_span=purchase_data["life_span"],
+            category=purchase_data["category"],
+        )
+
+
+@dataclass(slots=True, frozen=True)
+class UtilityRecord(_Subscriptable):
+    """Compact, immutable UtilityMetrics."""
+
+    use_factor: float
+    u_buy_useful: float
+    u_buy_not_useful: float
+    u_not_buy_useful: float
+    u_not_buy_not_useful: float
+
+    @classmethod
+    def from_dict(cls, results: UtilityMetrics) -> "UtilityRecord":
+        return cls(*(results[name] for name in UTILITY_COLUMNS))
+
+
+# One-byte codes index LookupTables; see LookupTables.encode. life_area_mult
+# keeps the weight of repeated and unknown life areas, which the bitmask drops
+PURCHASE_DTYPE = np.dtype(
+    [
+        ("item_name", object),
+        ("price", np.float64),
+        ("income_level", np.uint8),
+        ("life_areas", np.uint8),
+        ("life_area_mult", np.float64),
+        ("necessity", np.uint8),
+        ("time_use", np.float64),
+        ("use_probability", np.uint8),
+        ("life_span", np.uint16),
+        ("category", np.uint8),
+    ]
+)
+
+UTILITY_DTYPE = np.dtype([(name, np.float64) for name in UTILITY_COLUMNS])
+
+
+def pack_purchases(
+    records: Iterable[PurchaseData | PurchaseRecord],
+    tables: LookupTables | None = None,
+) -> np.ndarray:
+    """Store purchase records in a PURCHASE_DTYPE structured array.
+
+    Categorical codes are only meaningful with the ``tables`` used here.
+    Raises ValueError if a life span or code does not fit its field, rather
+    than storing a wrapped value.
+    """
+    records = list(records)
+    columns = encode_purchases(records, tables)
+    packed = np.empty(len(records), dtype=PURCHASE_DTYPE)
+    packed["item_name"] = [record["item_name"] for record in records]
+    for name in PURCHASE_DTYPE.names[1:]:
+        dtype = PURCHASE_DTYPE[name]
+        if dtype.kind == "u":
+            _check_fits(name, columns[name], np.iinfo(dtype).max)
+        packed[name] = columns[name]
+    return packed
+
+
+def _check_fits(name: str, column: np.ndarray, limit: int) -> None:
+    invalid = (column < 0) | (column > limit) | (column != np.floor(column))
+    if np.any(invalid):
+        index = int(np.argmax(invalid))
+        raise ValueError(
+            f"Cannot pack {name} {column[index]} of record {index}: "
+            f"must be a whole number from 0 to {limit}"
+        )
+
+
+def purchase_columns(packed: np.ndarray) -> PurchaseColumns:
+    """Encoded columns of a PURCHASE_DTYPE array for the batch calculators."""
+    return {
+        "price": packed["price"],
+        "income_level": packed["income_level"].astype(np.intp),
+        "life_areas": packed["life_areas"].astype(np.intp),
+        "life_area_mult": packed["life_area_mult"],
+        "necessity": packed["necessity"].astype(np.intp),
+        "time_use": packed["time_use"],
+        "use_probability": packed["use_probability"].astype(np.intp),
+        "life_span": packed["life_span"].astype(np.float64),
+        "category": packed["category"].astype(np.intp),
+    }
+
+
+def unpack_purchase(
+    packed: np.ndarray, index: int, tables: LookupTables | None = None
+) -> PurchaseRecord:
+    """Decode one row of a PURCHASE_DTYPE array back into a PurchaseRecord.
+
+    Life areas come back as the set of known ones, in table order.
+    """
+    if tables is None:
+        tables = build_lookup_tables()
+    row = packed[index]
+    mask = int(row["life_areas"])
+    return PurchaseRecord(
+        item_name=row["item_name"],
+        price=float(row["price"]),
+        income_level=_decode(tables.income_levels, row["income_level"]),
+        life_areas=tuple(
+            area for bit, area in enumerate(tables.life_areas) if mask & (1 << bit)
+        ),
+        necessity=_decode(tables.necessities, row["necessity"]),
+        time_use=float(row["time_use"]),
+        use_probability=_decode(tables.use_probabilities, row["use_probability"]),
+        life_span=int(row["life_span"]),
+        category=_decode(tables.categories, row["category"]),
+    )
+
+
+def _decode(keys: tuple[str, ...], code: int) -> str:
+    # The trailing default slot has no name of its own
+    return keys[code] if code < len(keys) else ""
+
+
+def pack_utilities(results: BatchUtilityMetrics) -> np.ndarray:
+    """Store batch results in a UTILITY_DTYPE structured array."""
+    packed = np.empty(len(results["use_factor"]), dtype=UTILITY_DTYPE)
+    for name in UTILITY_COLUMNS:
+        packed[name] = results[name]
+    return packed
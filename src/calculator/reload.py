@@ -0,0 +1,100 @@
+"""
+Hot reloading of a weight profile file.
+
+ProfileWatcher polls the file's modification time and size from a daemon
+thread. When they change the profile is loaded, compiled and activated;
+a file that fails to load leaves the previous profile active.
+"""
+
+import os
+import threading
+from collections.abc import Callable
+from pathlib import Path
+
+from .compiled import ScoringTable, activate_profile
+from .profiles import load_profile
+
+DEFAULT_INTERVAL = 1.0  # seconds
+
+# Signature of a file that could not be read
+_MISSING = (-1, -1)
+
+
+class ProfileWatcher:
+    """Keeps the active profile in sync with a profile file."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        interval: float = DEFAULT_INTERVAL,
+        on_reload: Callable[[ScoringTable], None] | None = None,
+        on_error: Callable[[Exception], None] | None = None,
+    ):
+        self.path = Path(path)
+        self.interval = interval
+        self.on_reload = on_reload
+        self.on_error = on_error
+        self._signature: tuple[int, int] | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def load(self) -> ScoringTable:
+        """Load and activate the file now, raising if it is invalid."""
+        return self._load(self._stat())
+
+    def check(self) -> bool:
+        """Reload the file if it changed since the last load.
+
+        Errors go to ``on_error`` instead of being raised, once per change.
+        """
+        try:
+            signature = self._stat()
+        except OSError as error:
+            if self._signature != _MISSING:
+                self._signature = _MISSING
+                self._report(error)
+            return False
+        if signature == self._signature:
+            return False
+        try:
+            self._load(signature)
+        except (OSError, ValueError) as error:
+            self._signature = signature
+            self._report(error)
+            return False
+        return True
+
+    def start(self) -> None:
+        """Poll for changes every ``interval`` seconds in a daemon thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="profile-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def _load(self, signature: tuple[int, int]) -> ScoringTable:
+        table = activate_profile(load_profile(self.path))
+        self._signature = signature
+        if self.on_reload is not None:
+            self.on_reload(table)
+        return table
+
+    def _report(self, error: Exception) -> None:
+        if self.on_error is not None:
+            self.on_error(error)
+
+    def _stat(self) -> tuple[int, int]:
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
@@ -0,0 +1,251 @@
+"""
+Sensitivity of a decision to its inputs.
+
+Every utility is the benefit factor ``c * time_use * life_span / price``
+times an income weight, where ``c`` depends only on the categorical fields,
+and the expected utilities are linear in the probabilities. The partial
+derivatives therefore have closed forms in the utilities of the purchase
+and of the same purchase with unit time_use, life_span and price.
+
+The tornado sweep varies one field at a time: the numeric fields by
+``swing`` either side, the probabilities by ``probability_swing`` and the
+categorical fields over every level. sensitivity_scenarios scores all of
+these variants in one batch call; the report for any pair of probabilities
+is then computed from those utilities without calling the calculator again.
+"""
+
+from typing import TypedDict
+
+import numpy as np
+
+from .batch import (
+    BatchUtilityMetrics,
+    LookupTables,
+    build_lookup_tables,
+    calculate_utilities_batch,
+    encode_purchases,
+)
+from .utility_calculator import (
+    PurchaseData,
+    calculate_expected_utility_buy,
+    calculate_expected_utility_not_buy,
+)
+
+NUMERIC_FIELDS = ("price", "time_use", "life_span")
+PROBABILITY_FIELDS = ("p_useful_if_buy", "p_useful_if_not_buy")
+CATEGORICAL_FIELDS = ("income_level", "necessity", "use_probability", "category")
+
+DEFAULT_SWING = 0.2  # relative change of the numeric fields
+DEFAULT_PROBABILITY_SWING = 0.1  # absolute change of the probabilities
+
+# Categorical field -> LookupTables attribute listing its levels
+_LEVELS = {
+    "income_level": "income_levels",
+    "necessity": "necessities",
+    "use_probability": "use_probabilities",
+    "category": "categories",
+}
+
+
+class SensitivityScenarios(TypedDict):
+    """Utilities of a purchase and its one-at-a-time variants.
+
+    Row 0 is the purchase itself and row 1 the purchase with unit time_use,
+    life_span and price; ``fields[i]`` and ``values[i]`` name what row ``i``
+    changed.
+    """
+
+    purchase: PurchaseData
+    fields: list[str]
+    values: list[float | str]
+    results: BatchUtilityMetrics
+
+
+class Derivatives(TypedDict):
+    """Partial derivatives with respect to each numeric field and probability."""
+
+    eu_buy: dict[str, float]
+    eu_not_buy: dict[str, float]
+    gain: dict[str, float]  # of E[U(Buy)] - E[U(Don't Buy)]
+
+
+class TornadoBar(TypedDict):
+    field: str
+    low_value: float | str  # value of the field giving the lower gain
+    high_value: float | str
+    low_gain: float
+    high_gain: float
+    flips: bool  # the recommendation changes within the range
+
+
+class SensitivityReport(TypedDict):
+    gain: float
+    derivatives: Derivatives
+    # Value of each field at which the recommendation flips, None if none does
+    flip_at: dict[str, float | None]
+    tornado: list[TornadoBar]  # widest swing first
+
+
+def sensitivity_scenarios(
+    purchase: PurchaseData,
+    swing: float = DEFAULT_SWING,
+    tables: LookupTables | None = None,
+) -> SensitivityScenarios:
+    """Score ``purchase`` and every variant the report needs in one batch call."""
+    if tables is None:
+        tables = build_lookup_tables()
+    variants = [purchase, {**purchase, "time_use": 1, "life_span": 1, "price": 1}]
+    fields = ["", ""]
+    values: list[float | str] = ["", ""]
+    for field in NUMERIC_FIELDS:
+        for factor in (1 - swing, 1 + swing):
+            variants.append({**purchase, field: purchase[field] * factor})
+            fields.append(field)
+            values.append(purchase[field] * factor)
+    for field in CATEGORICAL_FIELDS:
+        for level in getattr(tables, _LEVELS[field]):
+            variants.append({**purchase, field: level})
+            fields.append(field)
+            values.append(level)
+
+    results = calculate_utilities_batch(encode_purchases(variants, tables), tables)
+    return {
+        "purchase": purchase,
+        "fields": fields,
+        "values": values,
+        "results": results,
+    }
+
+
+def sensitivity_report(
+    scenarios: SensitivityScenarios,
+    p_useful_if_buy: float,
+    p_useful_if_not_buy: float,
+    probability_swing: float = DEFAULT_PROBABILITY_SWING,
+) -> SensitivityReport:
+    """Derivatives, flip points and tornado sweep at the given probabilities."""
+    results = scenarios["results"]
+    eu_buy = calculate_expected_utility_buy(p_useful_if_buy, results)
+    eu_not_buy = calculate_expected_utility_not_buy(p_useful_if_not_buy, results)
+    gain = eu_buy - eu_not_buy
+    base = {name: float(values[0]) for name, values in results.items()}
+    derivatives = _derivatives(
+        scenarios["purchase"], base, float(eu_buy[1]), float(eu_not_buy[1])
+    )
+    probabilities = dict(
+        zip(PROBABILITY_FIELDS, (p_useful_if_buy, p_useful_if_not_buy))
+    )
+
+    return {
+        "gain": float(gain[0]),
+        "derivatives": derivatives,
+        "flip_at": _flip_points(float(gain[0]), derivatives["gain"], probabilities),
+        "tornado": _tornado(
+            scenarios, gain, derivatives["gain"], probabilities, probability_swing
+        ),
+    }
+
+
+def _derivatives(
+    purchase: PurchaseData,
+    base: dict[str, float],
+    unit_eu_buy: float,
+    unit_eu_not_buy: float,
+) -> Derivatives:
+    """Closed-form derivatives; ``unit_*`` are the expected utilities at unit
+    time_use, life_span and price."""
+    time_use = purchase["time_use"]
+    life_span = purchase["life_span"]
+    price = purchase["price"]
+    # d(time_use * life_span / price) per field
+    scale = {
+        "price": -time_use * life_span / price**2,
+        "time_use": life_span / price,
+        "life_span": time_use / price,
+    }
+    d_eu_buy = {field: unit_eu_buy * scale[field] for field in NUMERIC_FIELDS}
+    d_eu_not_buy = {field: unit_eu_not_buy * scale[field] for field in NUMERIC_FIELDS}
+    d_eu_buy["p_useful_if_buy"] = base["u_buy_useful"] - base["u_buy_not_useful"]
+    d_eu_buy["p_useful_if_not_buy"] = 0.0
+    d_eu_not_buy["p_useful_if_buy"] = 0.0
+    d_eu_not_buy["p_useful_if_not_buy"] = (
+        base["u_not_buy_useful"] - base["u_not_buy_not_useful"]
+    )
+    return {
+        "eu_buy": d_eu_buy,
+        "eu_not_buy": d_eu_not_buy,
+        "gain": {field: d_eu_buy[field] - d_eu_not_buy[field] for field in d_eu_buy},
+    }
+
+
+def _flip_points(
+    gain: float, slopes: dict[str, float], probabilities: dict[str, float]
+) -> dict[str, float | None]:
+    """Probabilities at which the gain crosses zero.
+
+    The gain scales with time_use * life_span / price, so those fields never
+    change its sign.
+    """
+    flip_at: dict[str, float | None] = dict.fromkeys(NUMERIC_FIELDS)
+    for field, value in probabilities.items():
+        flip_at[field] = _root(value, gain, slopes[field])
+    return flip_at
+
+
+def _root(value: float, gain: float, slope: float) -> float | None:
+    """Where a line through (value, gain) with ``slope`` crosses zero in [0, 1]."""
+    if slope == 0:
+        return None
+    root = value - gain / slope
+    return root if 0 <= root <= 1 else None
+
+
+def _tornado(
+    scenarios: SensitivityScenarios,
+    gain: np.ndarray,
+    slopes: dict[str, float],
+    probabilities: dict[str, float],
+    probability_swing: float,
+) -> list[TornadoBar]:
+    fields = np.array(scenarios["fields"])
+    values = scenarios["values"]
+    bars = []
+    for field in (*NUMERIC_FIELDS, *CATEGORICAL_FIELDS):
+        rows = np.flatnonzero(fields == field)
+        low, high = rows[np.argmin(gain[rows])], rows[np.argmax(gain[rows])]
+        bars.append(
+            _bar(field, values[low], values[high], gain[low], gain[high], gain[0])
+        )
+
+    # The gain is linear in the probabilities
+    for field, value in probabilities.items():
+        ends = (
+            max(0.0, value - probability_swing),
+            min(1.0, value + probability_swing),
+        )
+        gains = [gain[0] + slopes[field] * (end - value) for end in ends]
+        low, high = (0, 1) if gains[0] <= gains[1] else (1, 0)
+        bars.append(
+            _bar(field, ends[low], ends[high], gains[low], gains[high], gain[0])
+        )
+    bars.sort(key=lambda bar: bar["high_gain"] - bar["low_gain"], reverse=True)
+    return bars
+
+
+def _bar(
+    field: str,
+    low_value: float | str,
+    high_value: float | str,
+    low_gain: float,
+    high_gain: float,
+    gain: float,
+) -> TornadoBar:
+    buy = gain > 0
+    return {
+        "field": field,
+        "low_value": low_value,
+        "high_value": high_value,
+        "low_gain": float(low_gain),
+        "high_gain": float(high_gain),
+        "flips": bool((low_gain > 0) != buy or (high_gain > 0) != buy),
+    }
@@ -0,0 +1,85 @@
+"""
+Vectorized probability sweeps for sensitivity reports.
+
+Evaluates the expected utilities over whole grids of
+(p_useful_if_buy, p_useful_if_not_buy) and the breakeven curve in one call.
+"""
+
+from collections.abc import Mapping
+from typing import TypedDict
+
+import numpy as np
+
+from .batch import calculate_breakeven_probability_batch
+from .utility_calculator import (
+    calculate_expected_utility_buy,
+    calculate_expected_utility_not_buy,
+)
+
+DEFAULT_GRID_POINTS = 101
+
+_SCENARIOS = (
+    "u_buy_useful",
+    "u_buy_not_useful",
+    "u_not_buy_useful",
+    "u_not_buy_not_useful",
+)
+
+
+class ProbabilitySweep(TypedDict):
+    """Expected-utility surfaces over a probability grid.
+
+    For metrics of shape ``S`` (``()`` for one UtilityMetrics, ``(k,)`` for a
+    batch) and grids of ``m`` and ``n`` points, surfaces have shape
+    ``S + (m, n)`` indexed by (p_useful_if_buy, p_useful_if_not_buy), and the
+    breakeven curve has shape ``S + (n,)``.
+    """
+
+    p_useful_if_buy: np.ndarray
+    p_useful_if_not_buy: np.ndarray
+    eu_buy: np.ndarray
+    eu_not_buy: np.ndarray
+    buy_wins: np.ndarray
+    breakeven: np.ndarray
+
+
+def probability_grid(points: int = DEFAULT_GRID_POINTS) -> np.ndarray:
+    """Evenly spaced probabilities from 0 to 1 inclusive."""
+    return np.linspace(0.0, 1.0, points)
+
+
+def sweep_probabilities(
+    results: Mapping[str, float | np.ndarray],
+    p_useful_if_buy: np.ndarray | None = None,
+    p_useful_if_not_buy: np.ndarray | None = None,
+) -> ProbabilitySweep:
+    """Expected utilities and breakeven over a grid of both probabilities.
+
+    ``results`` is a UtilityMetrics or BatchUtilityMetrics; either grid
+    defaults to probability_grid().
+    """
+    p_buy = np.asarray(
+        probability_grid() if p_useful_if_buy is None else p_useful_if_buy,
+        dtype=np.float64,
+    )
+    p_not_buy = np.asarray(
+        probability_grid() if p_useful_if_not_buy is None else p_useful_if_not_buy,
+        dtype=np.float64,
+    )
+    metrics = {
+        name: np.asarray(results[name], dtype=np.float64)[..., None]
+        for name in _SCENARIOS
+    }
+
+    eu_buy = calculate_expected_utility_buy(p_buy, metrics)
+    eu_not_buy = calculate_expected_utility_not_buy(p_not_buy, metrics)
+    shape = (*eu_buy.shape, p_not_buy.shape[0])
+
+    return {
+        "p_useful_if_buy": p_buy,
+        "p_useful_if_not_buy": p_not_buy,
+        "eu_buy": np.broadcast_to(eu_buy[..., :, None], shape),
+        "eu_not_buy": np.broadcast_to(eu_not_buy[..., None, :], shape),
+        "buy_wins": eu_buy[..., :, None] > eu_not_buy[..., None, :],
+        "breakeven": calculate_breakeven_probability_batch(metrics, p_not_buy),
+    }
@@ -4,9 +4,114 @@ Unit tests for the utility calculator.
 Run with: python -m unittest src.calculator.test
 """
 
+import itertools
+import json
+import os
+import tempfile
+import tomllib
 import unittest
+from dataclasses import fields
+from pathlib import Path
+from typing import ClassVar
+from unittest import mock
 
-from . import calculate_utilities
+import numpy as np
+
+from . import (
+    CashFlowTerms,
+    ProfileWatcher,
+    PurchaseRecord,
+    UsageEstimator,
+    UtilityCache,
+    UtilityRecord,
+    WeightProfile,
+    activate_profile,
+    build_scoring_table,
+    builtin_profile,
+    calculate_breakeven_probability,
+    calculate_breakeven_probability_batch,
+    calculate_discounted_batch,
+    calculate_discounted_utilities,
+    calculate_expected_utility_buy,
+    calculate_expected_utility_not_buy,
+    calculate_utilities,
+    calculate_utilities_batch,
+    calculate_utilities_compiled,
+    constants,
+    differential,
+    encode_purchases,
+    explain_batch,
+    explain_utilities,
+    get_scoring_table,
+    load_profile,
+    pack_purchases,
+    parse_profile,
+    purchase_columns,
+    rank_options,
+    reload_constants,
+    score_purchase,
+    select_within_budget,
+    sensitivity,
+    sensitivity_report,
+    sensitivity_scenarios,
+    set_constant,
+    simulate_decision,
+    summarize_decision,
+    sweep_probabilities,
+    top_k,
+    unpack_purchase,
+)
+from .batch import UTILITY_COLUMNS, build_lookup_tables
+from .explain import TRACE_COLUMNS
+from .montecarlo import Beta, Normal, Triangular
+from .sensitivity import NUMERIC_FIELDS
+
+SAMPLE_PURCHASES = [
+    {
+        "item_name": "Work Laptop",
+        "price": 1000.0,
+        "income_level": "medium",
+        "life_areas": ["career"],
+        "necessity": "essential",
+        "time_use": 20.0,
+        "use_probability": "high",
+        "life_span": 36,
+        "category": "efficiency",
+    },
+    {
+        "item_name": "Gaming Console",
+        "price": 500.0,
+        "income_level": "medium",
+        "life_areas": ["personal"],
+        "necessity": "nice_to_have",
+        "time_use": 10.0,
+        "use_probability": "medium",
+        "life_span": 60,
+        "category": "entertainment",
+    },
+    {
+        "item_name": "Fitness Tracker",
+        "price": 200.0,
+        "income_level": "low",
+        "life_areas": ["health", "personal"],
+        "necessity": "nice_to_have",
+        "time_use": 2.0,
+        "use_probability": "high",
+        "life_span": 24,
+        "category": "qol",
+    },
+    {
+        "item_name": "Mystery Box",
+        "price": 75.5,
+        "income_level": "unknown",
+        "life_areas": [],
+        "necessity": "unknown",
+        "time_use": 0.5,
+        "use_probability": "unknown",
+        "life_span": 7,
+        "category": "unknown",
+    },
+]
 
 
 class TestUtilityCalculator(unittest.TestCase):
@@ -102,5 +207,887 @@ class TestUtilityCalculator(unittest.TestCase):
         self.assertAlmostEqual(result["use_factor"], expected_use_factor, places=2)
 
 
+class TestBatchCalculator(unittest.TestCase):
+    """Test cases for the vectorized batch engine."""
+
+    def test_batch_matches_scalar(self):
+        """Test that every batch column matches calculate_utilities."""
+        tables = build_lookup_tables()
+        columns = encode_purchases(SAMPLE_PURCHASES, tables)
+        batch = calculate_utilities_batch(columns, tables)
+
+        for i, purchase in enumerate(SAMPLE_PURCHASES):
+            expected = calculate_utilities(purchase)
+            for name in UTILITY_COLUMNS:
+                self.assertAlmostEqual(batch[name][i], expected[name], places=9)
+
+    def test_irregular_life_areas_match_scalar(self):
+        """Test that repeated and unknown life areas score as calculate_utilities."""
+        purchases = [
+            dict(SAMPLE_PURCHASES[0], life_areas=areas)
+            for areas in (
+                ["career", "career", "personal"],
+                ["hobbies"],
+                ["health", "hobbies", "health"],
+            )
+        ]
+        tables = build_lookup_tables()
+        table = get_scoring_table()
+        engines = {
+            "batch": calculate_utilities_batch(
+                encode_purchases(purchases, tables), tables
+            ),
+            "compiled": calculate_utilities_compiled(
+                encode_purchases(purchases, table.lookup), table
+            ),
+            "records": calculate_utilities_batch(
+                purchase_columns(pack_purchases(purchases, tables)), tables
+            ),
+        }
+        for i, purchase in enumerate(purchases):
+            expected = calculate_utilities(purchase)
+            for name, metrics in engines.items():
+                with self.subTest(engine=name, life_areas=purchase["life_areas"]):
+                    for column in UTILITY_COLUMNS:
+                        self.assertAlmostEqual(
+                            metrics[column][i], expected[column], places=9
+                        )
+            for column in UTILITY_COLUMNS:
+                self.assertAlmostEqual(
+                    score_purchase(purchase)[column], expected[column], places=9
+                )
+
+    def test_empty_batch(self):
+        """Test that an empty batch yields empty columns."""
+        batch = calculate_utilities_batch(encode_purchases([]))
+        for name in UTILITY_COLUMNS:
+            self.assertEqual(batch[name].shape, (0,))
+
+
+class TestCompiledScoringTable(unittest.TestCase):
+    """Test cases for the compiled per-combination scoring table."""
+
+    def assertMatchesScalar(self, metrics, purchase):
+        expected = calculate_utilities(purchase)
+        for name in UTILITY_COLUMNS:
+            self.assertAlmostEqual(metrics[name], expected[name], places=9)
+
+    def test_compiled_matches_scalar(self):
+        """Test that both table-driven paths match calculate_utilities."""
+        table = get_scoring_table()
+        batch = calculate_utilities_compiled(
+            encode_purchases(SAMPLE_PURCHASES, table.lookup), table
+        )
+        for i, purchase in enumerate(SAMPLE_PURCHASES):
+            self.assertMatchesScalar(score_purchase(purchase), purchase)
+            self.assertMatchesScalar({k: v[i] for k, v in batch.items()}, purchase)
+
+    def test_table_rebuilds_when_constants_change(self):
+        """Test that reloading changed constants rebuilds the table."""
+        table = get_scoring_table()
+        original = constants.CATEGORY_MULTIPLIERS["qol"]
+        constants.CATEGORY_MULTIPLIERS["qol"] = 3.0
+        try:
+            self.assertIs(get_scoring_table(), table)
+            reload_constants()
+            self.assertIsNot(get_scoring_table(), table)
+            self.assertMatchesScalar(
+                score_purchase(SAMPLE_PURCHASES[2]), SAMPLE_PURCHASES[2]
+            )
+        finally:
+            constants.CATEGORY_MULTIPLIERS["qol"] = original
+            reload_constants()
+        self.assertIsNot(get_scoring_table(), table)
+        self.assertIs(get_scoring_table(), get_scoring_table())
+
+    def test_table_rebuilds_after_set_constant(self):
+        """Test that overriding a weight rebuilds the table without a reload."""
+        table = get_scoring_table()
+        purchase = SAMPLE_PURCHASES[0]
+        area = purchase["life_areas"][0]
+        original = constants.LIFE_AREA_WEIGHTS[area]
+        set_constant("LIFE_AREA_WEIGHTS", area, original * 2)
+        try:
+            self.assertIsNot(get_scoring_table(), table)
+            self.assertMatchesScalar(score_purchase(purchase), purchase)
+        finally:
+            set_constant("LIFE_AREA_WEIGHTS", area, original)
+        self.assertMatchesScalar(score_purchase(purchase), purchase)
+
+    def test_set_constant_rejects_unknown_tables(self):
+        """Test that only the dict tables of the constants module are settable."""
+        for table in ("WEEKS_PER_YEAR", "TIER_WEIGHTS", "constants", "__dict__"):
+            with (
+                self.subTest(table=table),
+                self.assertRaisesRegex(ValueError, "Unknown constants table"),
+            ):
+                set_constant(table, "key", 1.0)
+
+
+class TestWeightProfiles(unittest.TestCase):
+    """Test cases for versioned weight profiles and hot-swapping."""
+
+    PROFILE: ClassVar[dict] = {
+        "version": "test-1",
+        "category_multipliers": {"qol": 3.0},
+    }
+
+    def tearDown(self):
+        activate_profile(None)
+
+    def test_default_profile_file_matches_builtin(self):
+        """Test that profiles/default.toml mirrors the constants module."""
+        path = Path(__file__).resolve().parents[2] / "profiles" / "default.toml"
+        loaded = load_profile(path)
+        builtin = builtin_profile()
+        self.assertEqual(loaded.version, "default-1")
+        for field in fields(WeightProfile):
+            if field.name not in ("version", "name"):
+                self.assertEqual(
+                    getattr(loaded, field.name), getattr(builtin, field.name)
+                )
+
+    def test_profile_matches_scalar_with_same_constants(self):
+        """Test that a profile scores like the scalar path with its values."""
+        table = build_scoring_table(profile=parse_profile(self.PROFILE))
+        self.assertEqual(table.version, "test-1")
+        purchase = SAMPLE_PURCHASES[2]
+        metrics = calculate_utilities_compiled(
+            encode_purchases([purchase], table.lookup), table
+        )
+        original = constants.CATEGORY_MULTIPLIERS["qol"]
+        constants.CATEGORY_MULTIPLIERS["qol"] = 3.0
+        try:
+            expected = calculate_utilities(purchase)
+        finally:
+            constants.CATEGORY_MULTIPLIERS["qol"] = original
+        for name in UTILITY_COLUMNS:
+            self.assertAlmostEqual(metrics[name][0], expected[name], places=9)
+
+    def test_income_levels_left_out_keep_builtin_weights(self):
+        """Test that a profile giving one income level keeps the others."""
+        profile = parse_profile(
+            tomllib.loads(
+                """
+                version = "2026-10-a"
+                name = "Conservative"
+
+                [life_area_weights]
+                career = 1.2
+                personal = 1.0
+                health = 1.5
+
+                [income_weights.low]
+                buy = [2, -10]
+                not_buy = [-1, 0]
+                """
+            )
+        )
+        builtin = builtin_profile()
+        self.assertEqual(profile.income_weights["low"]["buy"], (2, -10))
+        self.assertEqual(set(profile.income_weights), set(builtin.income_weights))
+        for level in ("medium", "high"):
+            self.assertEqual(
+                profile.income_weights[level], builtin.income_weights[level]
+            )
+
+    def test_activate_profile_swaps_and_restores(self):
+        """Test that activation swaps the shared table and None restores it."""
+        builtin = get_scoring_table()
+        table = activate_profile(parse_profile(self.PROFILE))
+        self.assertIs(get_scoring_table(), table)
+        self.assertNotEqual(
+            score_purchase(SAMPLE_PURCHASES[2]),
+            calculate_utilities(SAMPLE_PURCHASES[2]),
+        )
+        activate_profile(None)
+        self.assertEqual(get_scoring_table().version, builtin.version)
+        self.assertMatchesScalar(SAMPLE_PURCHASES[2])
+
+    def assertMatchesScalar(self, purchase):
+        expected = calculate_utilities(purchase)
+        for name, value in score_purchase(purchase).items():
+            self.assertAlmostEqual(value, expected[name], places=9)
+
+    def test_invalid_profiles_rejected(self):
+        """Test that malformed profiles raise ValueError."""
+        for data in (
+            {"category_multipliers": {"qol": 3.0}},
+            {"version": "x", "colour": "red"},
+            {"version": "x", "life_area_weights": {"career": "high"}},
+            {"version": "x", "life_area_weights": {}},
+            {"version": "x", "income_weights": {"low": {"buy": [1, 2]}}},
+            {"version": "x", "months_per_year": 0},
+        ):
+            with self.subTest(data=data), self.assertRaises(ValueError):
+                parse_profile(data)
+
+    def test_watcher_reloads_and_keeps_last_good_profile(self):
+        """Test that the watcher swaps on change and survives a bad file."""
+        errors = []
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "profile.json")
+
+            def write(text, mtime):
+                with open(path, "w", encoding="utf-8") as file:
+                    file.write(text)
+                os.utime(path, (mtime, mtime))
+
+            write(json.dumps(self.PROFILE), 1_000)
+            watcher = ProfileWatcher(path, on_error=errors.append)
+            self.assertEqual(watcher.load().version, "test-1")
+            self.assertFalse(watcher.check())
+
+            write(json.dumps({"version": "test-2"}), 2_000)
+            self.assertTrue(watcher.check())
+            self.assertEqual(get_scoring_table().version, "test-2")
+
+            write("{not json", 3_000)
+            self.assertFalse(watcher.check())
+            self.assertFalse(watcher.check())
+            self.assertEqual(len(errors), 1)
+            self.assertIn("profile.json", str(errors[0]))
+            self.assertEqual(get_scoring_table().version, "test-2")
+
+
+class TestRanking(unittest.TestCase):
+    """Test cases for top-k ranking and budgeted selection."""
+
+    def test_rank_matches_scalar(self):
+        """Test that ranked options are scored and ordered like the scalar path."""
+        ranked = rank_options(SAMPLE_PURCHASES, k=3, p_useful_if_buy=0.7)
+        expected = sorted(
+            (
+                calculate_expected_utility_buy(0.7, calculate_utilities(purchase)),
+                i,
+            )
+            for i, purchase in enumerate(SAMPLE_PURCHASES)
+        )[::-1][:3]
+        self.assertEqual(ranked["index"].tolist(), [i for _, i in expected])
+        for value, (eu_buy, _) in zip(ranked["eu_buy"], expected):
+            self.assertAlmostEqual(value, eu_buy, places=9)
+        with self.assertRaises(ValueError):
+            rank_options(SAMPLE_PURCHASES, by="price")
+
+    def test_top_k_matches_full_sort(self):
+        """Test that the partial sort agrees with a stable full sort."""
+        values = np.random.default_rng(0).integers(0, 5, 50)
+        for k in (0, 1, 7, 50, 60):
+            self.assertEqual(
+                top_k(values, k).tolist(),
+                np.argsort(-values, kind="stable")[:k].tolist(),
+            )
+
+    def test_budget_selection_against_brute_force(self):
+        """Test that dp is optimal and greedy is feasible and within its bound."""
+        rng = np.random.default_rng(1)
+        for _ in range(100):
+            count = int(rng.integers(0, 9))
+            price = rng.integers(1, 50, count).astype(float)
+            gain = rng.normal(size=count) * 10
+            budget = float(rng.integers(0, 120))
+            best = max(
+                gain[list(subset)].sum()
+                for size in range(count + 1)
+                for subset in itertools.combinations(range(count), size)
+                if price[list(subset)].sum() <= budget
+            )
+            exact = select_within_budget(price, gain, budget, method="dp")
+            greedy = select_within_budget(price, gain, budget, method="greedy")
+            self.assertAlmostEqual(exact["total_gain"], best, places=9)
+            self.assertLessEqual(exact["total_price"], budget)
+            self.assertLessEqual(greedy["total_price"], budget)
+            self.assertGreaterEqual(greedy["total_gain"], best / 2 - 1e-9)
+            self.assertGreaterEqual(greedy["upper_bound"], best - 1e-9)
+
+    def test_auto_falls_back_to_greedy(self):
+        """Test that auto only uses dp when its table is small enough."""
+        price = np.full(10, 100.0)
+        gain = np.arange(1.0, 11.0)
+        self.assertEqual(select_within_budget(price, gain, 300)["method"], "dp")
+        self.assertEqual(
+            select_within_budget(price, gain, 300, resolution=1e-6)["method"],
+            "greedy",
+        )
+        with self.assertRaises(ValueError):
+            select_within_budget(price, gain, 300, method="dp", resolution=1e-6)
+        with self.assertRaises(ValueError):
+            select_within_budget(price, gain, -1)
+
+
+class TestSensitivity(unittest.TestCase):
+    """Test cases for analytic sensitivities and the tornado sweep."""
+
+    def gain(self, purchase, p_buy=0.5, p_not_buy=0.1):
+        results = calculate_utilities(purchase)
+        return calculate_expected_utility_buy(
+            p_buy, results
+        ) - calculate_expected_utility_not_buy(p_not_buy, results)
+
+    def test_derivatives_match_finite_differences(self):
+        """Test the closed-form derivatives against central differences."""
+        for purchase in SAMPLE_PURCHASES:
+            report = sensitivity_report(sensitivity_scenarios(purchase), 0.5, 0.1)
+            self.assertAlmostEqual(report["gain"], self.gain(purchase), places=9)
+            for field in NUMERIC_FIELDS:
+                step = purchase[field] * 1e-4
+                numeric = (
+                    self.gain({**purchase, field: purchase[field] + step})
+                    - self.gain({**purchase, field: purchase[field] - step})
+                ) / (2 * step)
+                self.assertAlmostEqual(
+                    report["derivatives"]["gain"][field], numeric, places=6
+                )
+            numeric = (self.gain(purchase, 0.6) - self.gain(purchase, 0.4)) / 0.2
+            self.assertAlmostEqual(
+                report["derivatives"]["gain"]["p_useful_if_buy"], numeric, places=6
+            )
+
+    def test_flip_points_and_tornado(self):
+        """Test flip points against breakeven and bars against the scalar path."""
+        purchase = SAMPLE_PURCHASES[0]
+        report = sensitivity_report(sensitivity_scenarios(purchase), 0.5, 0.1)
+        self.assertAlmostEqual(
+            report["flip_at"]["p_useful_if_buy"],
+            calculate_breakeven_probability(calculate_utilities(purchase), 0.1),
+        )
+        self.assertIsNone(report["flip_at"]["price"])
+
+        bars = {bar["field"]: bar for bar in report["tornado"]}
+        income = bars["income_level"]
+        self.assertAlmostEqual(
+            income["high_gain"],
+            self.gain({**purchase, "income_level": income["high_value"]}),
+        )
+        self.assertEqual(income["high_value"], "high")
+        self.assertTrue(income["flips"])
+        price = bars["price"]
+        self.assertEqual({price["low_value"], price["high_value"]}, {800.0, 1200.0})
+        for end in ("low", "high"):
+            self.assertAlmostEqual(
+                price[f"{end}_gain"],
+                self.gain({**purchase, "price": price[f"{end}_value"]}),
+            )
+        self.assertLess(price["low_gain"], price["high_gain"])
+        widths = [bar["high_gain"] - bar["low_gain"] for bar in report["tornado"]]
+        self.assertEqual(widths, sorted(widths, reverse=True))
+
+    def test_one_batch_call(self):
+        """Test that a full report scores all its variants in one batch call."""
+        with mock.patch.object(
+            sensitivity, "calculate_utilities_batch", wraps=calculate_utilities_batch
+        ) as batch:
+            scenarios = sensitivity_scenarios(SAMPLE_PURCHASES[1])
+            for p_buy in (0.1, 0.5, 0.9):
+                sensitivity_report(scenarios, p_buy, 0.1)
+        batch.assert_called_once()
+
+
+class TestProbabilitySweep(unittest.TestCase):
+    """Test cases for vectorized probability sweeps."""
+
+    def test_sweep_matches_scalar_functions(self):
+        """Test that surfaces and breakeven curve match the scalar functions."""
+        results = calculate_utilities(SAMPLE_PURCHASES[0])
+        sweep = sweep_probabilities(results)
+        self.assertEqual(sweep["eu_buy"].shape, (101, 101))
+        self.assertEqual(sweep["breakeven"].shape, (101,))
+
+        for i in (0, 37, 100):
+            p_buy = sweep["p_useful_if_buy"][i]
+            for j in (0, 50, 100):
+                p_not_buy = sweep["p_useful_if_not_buy"][j]
+                eu_buy = calculate_expected_utility_buy(p_buy, results)
+                eu_not_buy = calculate_expected_utility_not_buy(p_not_buy, results)
+                self.assertAlmostEqual(sweep["eu_buy"][i, j], eu_buy)
+                self.assertAlmostEqual(sweep["eu_not_buy"][i, j], eu_not_buy)
+                self.assertEqual(sweep["buy_wins"][i, j], eu_buy > eu_not_buy)
+                self.assertAlmostEqual(
+                    sweep["breakeven"][j],
+                    calculate_breakeven_probability(results, p_not_buy),
+                )
+
+    def test_summarize_decision(self):
+        """Test that the decision summary bundles the scalar results."""
+        results = calculate_utilities(SAMPLE_PURCHASES[1])
+        summary = summarize_decision(results, 0.7, 0.2)
+        self.assertEqual(
+            summary["eu_buy"], calculate_expected_utility_buy(0.7, results)
+        )
+        self.assertEqual(
+            summary["breakeven"], calculate_breakeven_probability(results, 0.2)
+        )
+
+
+class TestMonteCarlo(unittest.TestCase):
+    """Test cases for the Monte Carlo uncertainty engine."""
+
+    def test_point_estimates_reproduce_scalar(self):
+        """Test that without distributions every sample equals the scalar result."""
+        purchase = SAMPLE_PURCHASES[0]
+        report = simulate_decision(purchase, samples=1000, seed=0)
+        expected = calculate_utilities(purchase)
+        summary = summarize_decision(expected, 0.5, 0.1)
+        expected.update(eu_buy=summary["eu_buy"], eu_not_buy=summary["eu_not_buy"])
+
+        for name, value in expected.items():
+            self.assertAlmostEqual(report["metrics"][name]["mean"], value, places=9)
+            self.assertAlmostEqual(report["metrics"][name]["std"], 0.0, places=9)
+            for quantile in report["metrics"][name]["quantiles"]:
+                self.assertAlmostEqual(quantile, value, places=9)
+        self.assertEqual(report["p_buy_wins"], 0.0)
+
+    def test_seeded_runs_are_reproducible(self):
+        """Test that a seed reproduces the report and quantiles are ordered."""
+        distributions = {
+            "time_use": Normal(20, 5),
+            "life_span": Triangular(12, 36, 48),
+            "use_probability": Beta(9, 1),
+            "p_useful_if_buy": Beta(8, 2),
+        }
+        purchase = SAMPLE_PURCHASES[0]
+        first = simulate_decision(purchase, samples=20_000, seed=7, **distributions)
+        second = simulate_decision(purchase, samples=20_000, seed=7, **distributions)
+        self.assertEqual(first, second)
+        self.assertGreater(first["p_buy_wins"], 0.0)
+        self.assertLess(first["p_buy_wins"], 1.0)
+        for metric in first["metrics"].values():
+            self.assertEqual(metric["quantiles"], sorted(metric["quantiles"]))
+
+
+class TestUtilityCache(unittest.TestCase):
+    """Test cases for the memoizing utility cache."""
+
+    def test_key_ignores_item_name_and_area_order(self):
+        """Test that renamed items with reordered life areas hit the cache."""
+        cache = UtilityCache()
+        purchase = SAMPLE_PURCHASES[2]
+        first = cache(purchase)
+        renamed = dict(
+            purchase,
+            item_name="Another Tracker",
+            life_areas=list(reversed(purchase["life_areas"])),
+        )
+        self.assertEqual(cache(renamed), first)
+        stats = cache.stats
+        self.assertEqual((stats.hits, stats.misses, stats.size), (1, 1, 1))
+
+    def test_lru_eviction_and_ttl(self):
+        """Test that the cache stays bounded and entries expire."""
+        now = [0.0]
+        cache = UtilityCache(maxsize=2, ttl=10, clock=lambda: now[0])
+        for purchase in SAMPLE_PURCHASES[:3]:
+            cache(purchase)
+        self.assertEqual(cache.stats.evictions, 1)
+        self.assertEqual(cache.stats.size, 2)
+
+        now[0] = 11.0
+        self.assertEqual(
+            cache(SAMPLE_PURCHASES[2]), calculate_utilities(SAMPLE_PURCHASES[2])
+        )
+        self.assertEqual(cache.stats.expirations, 1)
+
+    def test_invalidated_when_constants_change(self):
+        """Test that reloading changed constants drops stale results."""
+        cache = UtilityCache()
+        purchase = SAMPLE_PURCHASES[0]
+        cache(purchase)
+        original = constants.NECESSITY_SCORES["essential"]
+        constants.NECESSITY_SCORES["essential"] = 0.5
+        try:
+            reload_constants()
+            self.assertEqual(cache(purchase), calculate_utilities(purchase))
+        finally:
+            constants.NECESSITY_SCORES["essential"] = original
+            reload_constants()
+        self.assertEqual(cache.stats.invalidations, 1)
+        self.assertEqual(cache.stats.hits, 0)
+
+    def test_result_computed_across_a_reload_is_not_stored(self):
+        """Test that a miss racing a constants change is not cached."""
+        purchase = SAMPLE_PURCHASES[0]
+
+        def calculate(purchase_data):
+            result = calculate_utilities(purchase_data)
+            reload_constants()  # as if another thread changed a weight
+            return result
+
+        cache = UtilityCache(calculate=calculate)
+        self.assertEqual(cache(purchase), calculate_utilities(purchase))
+        self.assertEqual(cache.stats.size, 0)
+
+
+class TestCompactRecords(unittest.TestCase):
+    """Test cases for slotted records and structured-array storage."""
+
+    def test_records_work_with_calculator_functions(self):
+        """Test that compact records are accepted wherever dicts are."""
+        purchase = SAMPLE_PURCHASES[2]
+        record = PurchaseRecord.from_dict(purchase)
+        self.assertFalse(hasattr(record, "__dict__"))
+        self.assertEqual(calculate_utilities(record), calculate_utilities(purchase))
+
+        results = UtilityRecord.from_dict(calculate_utilities(purchase))
+        self.assertEqual(
+            calculate_expected_utility_buy(0.3, results),
+            calculate_expected_utility_buy(0.3, results.to_dict()),
+        )
+        self.assertEqual(
+            calculate_breakeven_probability(results, 0.2),
+            calculate_breakeven_probability(results.to_dict(), 0.2),
+        )
+
+    def test_structured_array_round_trip(self):
+        """Test that packed purchases score and unpack like the originals."""
+        tables = build_lookup_tables()
+        packed = pack_purchases(SAMPLE_PURCHASES[:3], tables)
+        batch = calculate_utilities_batch(purchase_columns(packed), tables)
+        for i, purchase in enumerate(SAMPLE_PURCHASES[:3]):
+            record = unpack_purchase(packed, i, tables)
+            self.assertEqual(record.item_name, purchase["item_name"])
+            self.assertEqual(sorted(record.life_areas), sorted(purchase["life_areas"]))
+            expected = calculate_utilities(purchase)
+            for name in UTILITY_COLUMNS:
+                self.assertAlmostEqual(batch[name][i], expected[name], places=9)
+
+    def test_pack_rejects_values_that_do_not_fit(self):
+        """Test that out-of-range fields raise instead of wrapping."""
+        tables = build_lookup_tables()
+        for life_span in (70000, -1, 12.5):
+            with self.subTest(life_span=life_span):
+                purchases = [
+                    SAMPLE_PURCHASES[0],
+                    dict(SAMPLE_PURCHASES[1], life_span=life_span),
+                ]
+                with self.assertRaisesRegex(ValueError, "life_span .* record 1"):
+                    pack_purchases(purchases, tables)
+
+        # Codes are one byte, so a 300th category does not fit
+        profile = parse_profile(
+            {
+                "version": "many-categories",
+                "category_multipliers": {f"category{i}": 1.0 for i in range(300)},
+            }
+        )
+        purchase = dict(SAMPLE_PURCHASES[0], category="category299")
+        with self.assertRaisesRegex(ValueError, "category 299"):
+            pack_purchases([purchase], build_lookup_tables(profile))
+
+
+class TestDiscountedCashFlow(unittest.TestCase):
+    """Test cases for the monthly discounted cash-flow model."""
+
+    def reference(self, purchase, terms):
+        """Month-by-month loop over the cash flow of one purchase."""
+        factor = (1 + terms.annual_discount_rate) ** (-1 / 12)
+        life_areas = purchase["life_areas"]
+        life_area_mult = 1.0
+        if life_areas:
+            life_area_mult = sum(
+                constants.LIFE_AREA_WEIGHTS.get(area, 1.0) for area in life_areas
+            ) / len(life_areas)
+        quality = (
+            constants.CATEGORY_MULTIPLIERS.get(purchase["category"], 1.0)
+            * constants.NECESSITY_SCORES.get(purchase["necessity"], 0.8)
+            * life_area_mult
+        )
+        hours = (
+            purchase["time_use"]
+            * constants.WEEKS_PER_YEAR
+            / constants.MONTHS_PER_YEAR
+            * constants.USE_PROBABILITY_VALUES.get(purchase["use_probability"], 1)
+        )
+        recurring = terms.monthly_subscription + terms.monthly_maintenance
+        price = purchase["price"]
+        cash, discounted_hours, cost, breakeven = -price, 0.0, price, None
+        for month in range(1, purchase["life_span"] + 1):
+            discount = factor**month
+            discounted_hours += hours * discount
+            cost += recurring * discount
+            cash += (terms.value_per_hour * hours * quality - recurring) * discount
+            if month == purchase["life_span"]:
+                resale = price * (1 - terms.annual_depreciation) ** (month / 12)
+                cash += resale * discount
+                cost -= resale * discount
+            if breakeven is None and cash >= 0:
+                breakeven = month
+        return discounted_hours, cost, cash, breakeven
+
+    def test_matches_monthly_loop(self):
+        """Test the prefix-sum fast path against summing every month."""
+        rng = np.random.default_rng(3)
+        purchases = differential.random_purchases(rng, 200)
+        for i, purchase in enumerate(purchases):
+            terms = CashFlowTerms(
+                annual_discount_rate=float(rng.uniform(0, 0.2)),
+                monthly_subscription=float(rng.choice([0, 5, 50])),
+                monthly_maintenance=float(rng.choice([0, 2])),
+                annual_depreciation=float(rng.uniform(0, 1)),
+                value_per_hour=float(rng.choice([0, 0.01, 1, 25])),
+            )
+            with self.subTest(i=i):
+                hours, cost, npv, breakeven = self.reference(purchase, terms)
+                result = calculate_discounted_utilities(purchase, terms)
+                for name, expected in (
+                    ("discounted_hours", hours),
+                    ("net_present_cost", cost),
+                    ("npv", npv),
+                ):
+                    self.assertAlmostEqual(
+                        result[name], expected, delta=1e-9 * max(1, abs(expected))
+                    )
+                self.assertEqual(result["breakeven_month"], breakeven)
+
+    def test_reduces_to_calculate_utilities(self):
+        """Test that without discounting, costs or resale nothing changes."""
+        terms = CashFlowTerms(annual_discount_rate=0, annual_depreciation=1)
+        for purchase in SAMPLE_PURCHASES:
+            expected = calculate_utilities(purchase)
+            result = calculate_discounted_utilities(purchase, terms)
+            for name in UTILITY_COLUMNS:
+                self.assertAlmostEqual(result[name], expected[name], places=9)
+
+    def test_batch_with_per_record_terms(self):
+        """Test that per-record terms score like one record at a time."""
+        tables = build_lookup_tables()
+        subscription = np.array([0.0, 10.0, 1000.0, 3.0])
+        batch = calculate_discounted_batch(
+            encode_purchases(SAMPLE_PURCHASES, tables),
+            CashFlowTerms(monthly_subscription=subscription),
+            tables,
+        )
+        for i, purchase in enumerate(SAMPLE_PURCHASES):
+            result = calculate_discounted_utilities(
+                purchase, CashFlowTerms(monthly_subscription=subscription[i])
+            )
+            self.assertAlmostEqual(batch["npv"][i], result["npv"], places=6)
+            month = batch["breakeven_month"][i]
+            self.assertEqual(
+                None if np.isnan(month) else int(month), result["breakeven_month"]
+            )
+        # A 1000 a month subscription is never paid back
+        self.assertTrue(np.isnan(batch["breakeven_month"][2]))
+
+    def test_invalid_terms_and_life_span(self):
+        """Test that impossible terms and life spans are rejected."""
+        for terms in (
+            {"annual_discount_rate": -1},
+            {"monthly_subscription": -5},
+            {"annual_depreciation": 1.5},
+            {"value_per_hour": np.array([1.0, np.nan])},
+        ):
+            with self.subTest(terms=terms), self.assertRaises(ValueError):
+                CashFlowTerms(**terms)
+        with self.assertRaises(ValueError):
+            calculate_discounted_utilities(dict(SAMPLE_PURCHASES[0], life_span=601))
+        with self.assertRaises(ZeroDivisionError):
+            calculate_discounted_utilities(dict(SAMPLE_PURCHASES[0], price=0))
+
+    def test_resale_covering_cost_rejected(self):
+        """Test that terms leaving no net present cost raise ValueError."""
+        for terms in (
+            # Resold at full price, undiscounted
+            CashFlowTerms(annual_discount_rate=0, annual_depreciation=0),
+            # Negative discounting grows the resale value above the price
+            CashFlowTerms(annual_discount_rate=-0.5, annual_depreciation=0.1),
+        ):
+            with (
+                self.subTest(terms=terms),
+                self.assertRaisesRegex(ValueError, "annual_depreciation"),
+            ):
+                calculate_discounted_utilities(SAMPLE_PURCHASES[0], terms)
+
+
+class TestExplain(unittest.TestCase):
+    """Test cases for the traces of explain mode."""
+
+    def test_traces_match_scoring(self):
+        """Test that traced utilities equal the untraced ones exactly."""
+        purchases = differential.random_purchases(np.random.default_rng(4), 2_000)
+        tables = build_lookup_tables()
+        columns = encode_purchases(purchases, tables)
+        batch = calculate_utilities_batch(columns, tables)
+        traced = explain_batch(columns, tables)
+        for name in UTILITY_COLUMNS:
+            np.testing.assert_array_equal(traced[name], batch[name])
+        for i, purchase in enumerate(purchases):
+            trace = explain_utilities(purchase)
+            expected = calculate_utilities(purchase)
+            self.assertEqual({name: trace[name] for name in expected}, expected)
+            for name in TRACE_COLUMNS:
+                self.assertAlmostEqual(
+                    traced[name][i], trace[name], delta=1e-9 * max(1, abs(trace[name]))
+                )
+
+    def test_trace_terms(self):
+        """Test that the terms multiply out and defaults are reported."""
+        laptop, _, tracker, mystery = map(explain_utilities, SAMPLE_PURCHASES)
+        self.assertEqual(laptop["total_time_use"], 20.0 * 52 * 3 * 0.9)
+        self.assertEqual(
+            laptop["benefit"],
+            laptop["total_time_use"] * 1.2 * 1.0 * 1.3,
+        )
+        self.assertEqual(laptop["benefit_factor"], laptop["benefit"] / 1000.0)
+        self.assertEqual(
+            (laptop["weight_buy_useful"], laptop["weight_not_buy_useful"]), (2, -4)
+        )
+        self.assertEqual(laptop["defaults"], [])
+        self.assertEqual(
+            tracker["life_area_weights"], [("health", 1.4), ("personal", 1.0)]
+        )
+        self.assertAlmostEqual(tracker["life_area_mult"], 1.2)
+        repeated = explain_utilities(
+            dict(SAMPLE_PURCHASES[0], life_areas=["career", "career", "personal"])
+        )
+        self.assertEqual(
+            repeated["life_area_weights"],
+            [("career", 1.3), ("career", 1.3), ("personal", 1.0)],
+        )
+        self.assertAlmostEqual(repeated["life_area_mult"], 3.6 / 3)
+        self.assertEqual(
+            mystery["defaults"],
+            ["use_probability", "category", "necessity", "income_level"],
+        )
+        self.assertEqual(mystery["life_area_mult"], 1.0)
+        json.dumps(mystery)  # traces serialize as they are
+
+
+class TestDifferential(unittest.TestCase):
+    """Test cases comparing every fast path with calculate_utilities."""
+
+    # Raise with DGSUA_DIFFERENTIAL_CASES, or run python -m src.calculator.differential
+    CASES = int(os.environ.get("DGSUA_DIFFERENTIAL_CASES", "20000"))
+
+    def test_engines_match_scalar(self):
+        """Test that every engine and the batch breakeven match the reference."""
+        report = differential.run_differential(self.CASES, seed=1, chunk_size=5_000)
+        self.assertEqual(report["failures"], [])
+        self.assertEqual(set(report["max_relative_error"]), set(differential.ENGINES))
+
+    def test_random_purchases_stay_in_range(self):
+        """Test that generated purchases cover the bounds the forms allow."""
+        purchases = differential.random_purchases(np.random.default_rng(2), 5_000)
+        prices = [purchase["price"] for purchase in purchases]
+        time_use = [purchase["time_use"] for purchase in purchases]
+        life_span = [purchase["life_span"] for purchase in purchases]
+        self.assertEqual(min(prices), differential.MIN_PRICE)
+        self.assertEqual(max(prices), differential.MAX_PRICE)
+        self.assertEqual((min(time_use), max(time_use)), (0, 168))
+        self.assertEqual((min(life_span), max(life_span)), (1, 600))
+        self.assertTrue(all(isinstance(span, int) for span in life_span))
+        life_areas = [purchase["life_areas"] for purchase in purchases]
+        self.assertIn([], life_areas)
+        self.assertTrue(any("unknown" in areas for areas in life_areas))
+        self.assertTrue(any(len(set(areas)) < len(areas) for areas in life_areas))
+        self.assertIn("unknown", {purchase["category"] for purchase in purchases})
+
+    def test_zero_price_rejected_everywhere(self):
+        """Test that every engine raises on a zero price instead of scoring it."""
+        purchase = dict(SAMPLE_PURCHASES[0], price=0.0)
+        with self.assertRaises(ZeroDivisionError):
+            calculate_utilities(purchase)
+        for name, make in differential.ENGINES.items():
+            with self.subTest(engine=name), self.assertRaises(ZeroDivisionError):
+                make()([purchase])
+
+    def test_breakeven_clamped(self):
+        """Test that breakeven stays in [0, 1] when buying always wins or loses."""
+        for not_buy, expected in ((5.0, 1.0), (-5.0, 0.0)):
+            results = {
+                "u_buy_useful": 1.0,
+                "u_buy_not_useful": 0.0,
+                "u_not_buy_useful": not_buy,
+                "u_not_buy_not_useful": not_buy,
+            }
+            self.assertEqual(calculate_breakeven_probability(results, 0.5), expected)
+            batch = {name: np.array([value]) for name, value in results.items()}
+            self.assertEqual(
+                calculate_breakeven_probability_batch(batch, 0.5)[0], expected
+            )
+
+
+class TestUsageEstimator(unittest.TestCase):
+    """Test cases for the Beta-Binomial usage estimates."""
+
+    def test_posterior_counts_events(self):
+        """Test that the posterior mean is (prior + used) / (prior + events)."""
+        estimator = UsageEstimator(prior=(2.0, 3.0))
+        estimator.observe("efficiency", ["career", "health"], used=True, count=7)
+        estimator.observe("efficiency", ["health", "career"], used=False, count=2)
+        posterior = estimator.posterior("efficiency", ["health", "career"])
+        self.assertEqual(posterior["events"], 9)
+        self.assertEqual((posterior["alpha"], posterior["beta"]), (9.0, 5.0))
+        self.assertAlmostEqual(posterior["mean"], 9 / 14)
+        # Other segments keep the prior
+        posterior = estimator.posterior("efficiency", ["career"])
+        self.assertEqual(posterior["events"], 0)
+        self.assertAlmostEqual(posterior["mean"], 2 / 5)
+        with self.assertRaises(ValueError):
+            estimator.observe("efficiency", ["hobbies"], used=True)
+        with self.assertRaises(ValueError):
+            UsageEstimator(prior=(0.0, 1.0))
+
+    def test_batches_match_single_events(self):
+        """Test that observe_codes adds up like one observe per event."""
+        tables = build_lookup_tables()
+        rng = np.random.default_rng(5)
+        categories = rng.integers(0, len(tables.categories) + 1, 2_000)
+        masks = rng.integers(0, 1 << len(tables.life_areas), 2_000)
+        used = rng.random(2_000) < 0.3
+
+        batched, single = UsageEstimator(), UsageEstimator()
+        batched.observe_codes(categories[:1_000], masks[:1_000], used[:1_000])
+        batched.observe_codes(categories[1_000:], masks[1_000:], used[1_000:])
+        names = (*tables.categories, "unknown")
+        for category, mask, event in zip(categories, masks, used):
+            areas = [a for bit, a in enumerate(tables.life_areas) if mask >> bit & 1]
+            single.observe(names[category], areas, bool(event))
+        self.assertEqual(batched.to_dict(), single.to_dict())
+
+        columns = encode_purchases(SAMPLE_PURCHASES, batched.tables)
+        for purchase, p_useful in zip(
+            SAMPLE_PURCHASES, batched.p_useful_batch(columns)
+        ):
+            self.assertAlmostEqual(p_useful, batched.p_useful(purchase), places=12)
+
+    def test_save_and_load(self):
+        """Test that the state survives a round trip and bad files are rejected."""
+        estimator = UsageEstimator()
+        estimator.observe("qol", ["health", "personal"], used=True, count=3)
+        estimator.observe("unknown", [], used=False)
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "state" / "usage.json"
+            estimator.save(path)
+            loaded = UsageEstimator.load(path)
+            self.assertEqual(loaded.to_dict(), estimator.to_dict())
+            self.assertEqual(
+                set(loaded.to_dict()["segments"]), {"qol|personal;health", "unknown|"}
+            )
+
+            path.write_text("{", encoding="utf-8")
+            with self.assertRaises(ValueError):
+                UsageEstimator.load(path)
+            path.write_text(
+                json.dumps({"segments": {"qol|health": [5, 2]}}), encoding="utf-8"
+            )
+            with self.assertRaises(ValueError):
+                UsageEstimator.load(path)
+
+    def test_malformed_state_rejected(self):
+        """Test that documents of the wrong shape raise ValueError."""
+        for data in (
+            [],
+            {"prior": 1},
+            {"prior": [1, "2"]},
+            {"segments": []},
+            {"segments": {"qol|health": 5}},
+            {"segments": {"qol|health": [1, 2, 3]}},
+            {"segments": {"qol|health": [1.5, 2]}},
+            {"segments": {"qol|gardening": [1, 2]}},
+        ):
+            with self.subTest(data=data), self.assertRaises(ValueError):
+                UsageEstimator.from_dict(data)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,199 @@
+"""
+Online estimate of how likely purchases are to be used, from logged usage.
+
+Every segment (a category and a set of life areas) keeps a Beta posterior
+over the probability that a purchase in it gets used. A usage event is one
+Bernoulli trial, so updating is adding to the segment's used or unused
+count: two numbers of state per segment, whatever the number of events.
+Batches of events are added with one bincount over their segment indices.
+
+The posterior mean replaces the guessed P(useful|buy) once a segment has
+events; with none it is the prior mean, 0.5 by default, which is also the
+guess the results screen starts from.
+"""
+
+import json
+import os
+import tempfile
+from collections.abc import Iterable
+from pathlib import Path
+from typing import TypedDict
+
+import numpy as np
+
+from .batch import LookupTables, PurchaseColumns, build_lookup_tables
+from .utility_calculator import PurchaseData
+
+DEFAULT_PRIOR = (1.0, 1.0)  # Beta(1, 1): uniform before any events
+
+USAGE_PATH_ENV = "DGSUTILITYAGENCY_USAGE"
+
+# Separates the category from the life areas, and the areas, in saved keys
+_KEY_SEPARATOR = "|"
+_AREA_SEPARATOR = ";"
+
+
+def default_usage_path() -> Path:
+    """Estimator state location, overridable with DGSUTILITYAGENCY_USAGE."""
+    path = os.environ.get(USAGE_PATH_ENV)
+    if path:
+        return Path(path)
+    return Path.home() / ".dgsutilityagency" / "usage.json"
+
+
+class UsagePosterior(TypedDict):
+    mean: float
+    alpha: float  # prior plus used events
+    beta: float  # prior plus unused events
+    events: int
+
+
+class UsageEstimator:
+    """Beta-Binomial posteriors per category and life area set."""
+
+    def __init__(
+        self,
+        prior: tuple[float, float] = DEFAULT_PRIOR,
+        tables: LookupTables | None = None,
+    ):
+        if min(prior) <= 0:
+            raise ValueError("Prior counts must be greater than 0")
+        self.prior = prior
+        self.tables = tables or build_lookup_tables()
+        # One extra category for unknown ones, as in the lookup tables
+        segments = (len(self.tables.categories) + 1) << len(self.tables.life_areas)
+        self._used = np.zeros(segments, dtype=np.int64)
+        self._events = np.zeros(segments, dtype=np.int64)
+
+    def segment(self, category: str, life_areas: Iterable[str]) -> int:
+        """Index of the segment of ``category`` and ``life_areas``."""
+        code = int(self.tables.encode("category", [category])[0])
+        return self._index(code, self.tables.encode_life_areas(life_areas))
+
+    def _index(self, category, life_areas):
+        return (category << len(self.tables.life_areas)) + life_areas
+
+    def observe(
+        self, category: str, life_areas: Iterable[str], used: bool, count: int = 1
+    ) -> None:
+        """Add ``count`` usage events of one segment."""
+        index = self.segment(category, life_areas)
+        self._events[index] += count
+        if used:
+            self._used[index] += count
+
+    def observe_codes(
+        self, categories: np.ndarray, life_areas: np.ndarray, used: np.ndarray
+    ) -> None:
+        """Add a batch of events given as category codes and area bitmasks."""
+        self.observe_segments(self._index(categories, life_areas), used)
+
+    def observe_segments(self, index: np.ndarray, used: np.ndarray) -> None:
+        """Add a batch of events given as segment indices."""
+        size = len(self._events)
+        self._events += np.bincount(index, minlength=size)
+        self._used += np.bincount(index, weights=used, minlength=size).astype(np.int64)
+
+    def posterior(self, category: str, life_areas: Iterable[str]) -> UsagePosterior:
+        index = self.segment(category, life_areas)
+        alpha = self.prior[0] + self._used[index]
+        beta = self.prior[1] + self._events[index] - self._used[index]
+        return {
+            "mean": float(alpha / (alpha + beta)),
+            "alpha": float(alpha),
+            "beta": float(beta),
+            "events": int(self._events[index]),
+        }
+
+    def p_useful(self, purchase_data: PurchaseData) -> float:
+        """Posterior mean probability that ``purchase_data`` gets used."""
+        posterior = self.posterior(
+            purchase_data["category"], purchase_data["life_areas"]
+        )
+        return posterior["mean"]
+
+    def p_useful_batch(self, columns: PurchaseColumns) -> np.ndarray:
+        """p_useful for columns encoded with this estimator's tables."""
+        index = self._index(columns["category"], columns["life_areas"])
+        alpha = self.prior[0] + self._used[index]
+        return alpha / (sum(self.prior) + self._events[index])
+
+    def to_dict(self) -> dict:
+        """Prior and the counts of every segment with events."""
+        categories = (*self.tables.categories, "unknown")
+        areas = self.tables.life_areas
+        segments = {}
+        for index in np.flatnonzero(self._events).tolist():
+            category, mask = divmod(index, 1 << len(areas))
+            key = _KEY_SEPARATOR.join(
+                (
+                    categories[category],
+                    _AREA_SEPARATOR.join(
+                        area for bit, area in enumerate(areas) if mask >> bit & 1
+                    ),
+                )
+            )
+            segments[key] = [int(self._used[index]), int(self._events[index])]
+        return {"prior": list(self.prior), "segments": segments}
+
+    @classmethod
+    def from_dict(
+        cls, data: dict, tables: LookupTables | None = None
+    ) -> "UsageEstimator":
+        """Estimator from a to_dict document; ValueError if it is malformed."""
+        if not isinstance(data, dict):
+            raise ValueError("Usage state must be an object with prior and segments")
+        prior = data.get("prior", DEFAULT_PRIOR)
+        if not _is_pair(prior, (int, float)):
+            raise ValueError("prior must be two numbers [alpha, beta]")
+        segments = data.get("segments", {})
+        if not isinstance(segments, dict):
+            raise ValueError("segments must map segment keys to [used, events]")
+        estimator = cls(tuple(prior), tables)
+        for key, counts in segments.items():
+            if not _is_pair(counts, int):
+                raise ValueError(f"Segment {key!r}: counts must be [used, events]")
+            used, events = counts
+            category, _, areas = key.partition(_KEY_SEPARATOR)
+            if not 0 <= used <= events:
+                raise ValueError(f"Segment {key!r}: used must be between 0 and events")
+            index = estimator.segment(
+                category, [a for a in areas.split(_AREA_SEPARATOR) if a]
+            )
+            estimator._used[index] += used
+            estimator._events[index] += events
+        return estimator
+
+    def save(self, path: str | Path) -> None:
+        """Write the state to ``path`` through a temporary file."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(
+            dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(descriptor, "w", encoding="utf-8") as file:
+                json.dump(self.to_dict(), file, indent=2)
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+    @classmethod
+    def load(
+        cls, path: str | Path, tables: LookupTables | None = None
+    ) -> "UsageEstimator":
+        try:
+            data = json.loads(Path(path).read_text(encoding="utf-8"))
+        except json.JSONDecodeError as error:
+            raise ValueError(f"{path}: {error}") from None
+        return cls.from_dict(data, tables)
+
+
+def _is_pair(value, types: type | tuple[type, ...]) -> bool:
+    """Whether ``value`` is a list of two ``types`` values, booleans excluded."""
+    return (
+        isinstance(value, (list, tuple))
+        and len(value) == 2
+        and all(isinstance(v, types) and not isinstance(v, bool) for v in value)
+    )
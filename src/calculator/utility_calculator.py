@@ -7,6 +7,8 @@ and calculates various utility metrics to help users make informed purchase deci
 
 from typing import TypedDict
 
+from src.instrumentation import timed
+
 from .constants import (
     CATEGORY_MULTIPLIERS,
     DEFAULT_BREAKEVEN_PROBABILITY,
@@ -45,6 +47,17 @@ class UtilityMetrics(TypedDict):
     u_not_buy_not_useful: float  # Utility: Don't buy and not useful
 
 
+class DecisionSummary(TypedDict):
+    """Expected utilities and breakeven for one pair of probabilities."""
+
+    p_useful_if_buy: float
+    p_useful_if_not_buy: float
+    eu_buy: float
+    eu_not_buy: float
+    breakeven: float  # P(useful|buy) at which buying starts to win
+
+
+@timed("calculator.calculate_utilities")
 def calculate_utilities(purchase_data: PurchaseData) -> UtilityMetrics:
     price = purchase_data["price"]
     income_level = purchase_data["income_level"]
@@ -100,6 +113,7 @@ def calculate_utilities(purchase_data: PurchaseData) -> UtilityMetrics:
     }
 
 
+@timed("calculator.calculate_expected_utility_buy")
 def calculate_expected_utility_buy(
     p_useful_if_buy: float, results: UtilityMetrics
 ) -> float:
@@ -109,6 +123,7 @@ def calculate_expected_utility_buy(
     )
 
 
+@timed("calculator.calculate_expected_utility_not_buy")
 def calculate_expected_utility_not_buy(
     p_useful_if_not_buy: float, results: UtilityMetrics
 ) -> float:
@@ -119,6 +134,7 @@ def calculate_expected_utility_not_buy(
     )
 
 
+@timed("calculator.calculate_breakeven_probability")
 def calculate_breakeven_probability(
     results: UtilityMetrics, p_useful_if_not_buy: float
 ) -> float:
@@ -132,3 +148,16 @@ def calculate_breakeven_probability(
 
     breakeven = numerator / denominator
     return max(0.0, min(1.0, breakeven))  # Clamp to [0, 1]
+
+
+def summarize_decision(
+    results: UtilityMetrics, p_useful_if_buy: float, p_useful_if_not_buy: float
+) -> DecisionSummary:
+    """Compute both expected utilities and the breakeven probability once."""
+    return {
+        "p_useful_if_buy": p_useful_if_buy,
+        "p_useful_if_not_buy": p_useful_if_not_buy,
+        "eu_buy": calculate_expected_utility_buy(p_useful_if_buy, results),
+        "eu_not_buy": calculate_expected_utility_not_buy(p_useful_if_not_buy, results),
+        "breakeven": calculate_breakeven_probability(results, p_useful_if_not_buy),
+    }
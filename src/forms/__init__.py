@@ -0,0 +1,38 @@
+"""
+Screens of the purchase decision flow.
+
+Screens are looked up by name and their modules imported on first
+navigation, so starting the app only loads the welcome screen instead of
+the whole flow and the calculator behind it.
+"""
+
+from importlib import import_module
+
+from textual.screen import Screen
+
+# Screen name -> (module, class)
+SCREENS: dict[str, tuple[str, str]] = {
+    "welcome": (".welcome", "WelcomeScreen"),
+    "life_areas": (".life_areas", "LifeAreasScreen"),
+    "time_and_category": (".time_and_category", "TimeAndCategoryScreen"),
+    "results": (".results", "ResultsScreen"),
+    "history": (".history", "HistoryScreen"),
+    "ranking": (".ranking", "RankingScreen"),
+    "bulk_edit": (".bulk_edit", "BulkEditScreen"),
+    "debug": (".debug", "DebugScreen"),
+}
+
+
+def load_screen(name: str) -> type[Screen]:
+    """Return the screen class registered as ``name``, importing it if needed."""
+    module, attribute = SCREENS[name]
+    return getattr(import_module(module, __name__), attribute)
+
+
+def prefetch_screens() -> None:
+    """Import every registered screen ahead of navigation."""
+    for name in SCREENS:
+        load_screen(name)
+
+
+__all__ = ["SCREENS", "load_screen", "prefetch_screens"]
@@ -0,0 +1,374 @@
+import sqlite3
+import time
+from collections.abc import Iterable, Mapping
+from typing import ClassVar, TypedDict
+
+import numpy as np
+from textual.app import ComposeResult
+from textual.containers import Container, Horizontal, Vertical
+from textual.screen import Screen
+from textual.widgets import Button, DataTable, Input, Static
+from textual.widgets.data_table import RowKey
+
+from src.calculator import (
+    BatchUtilityMetrics,
+    LookupTables,
+    build_lookup_tables,
+    calculate_breakeven_probability_batch,
+    calculate_expected_utility_buy,
+    calculate_expected_utility_not_buy,
+    calculate_utilities_batch,
+    encode_purchases,
+)
+from src.calculator.batch import UTILITY_COLUMNS
+from src.calculator.constants import (
+    DEFAULT_P_USEFUL_IF_BUY,
+    DEFAULT_P_USEFUL_IF_NOT_BUY,
+)
+from src.forms.schema import PURCHASE_FIELDS, validate
+
+FIELDS = (*PURCHASE_FIELDS, "p_useful_if_buy", "p_useful_if_not_buy")
+
+# Used for rows that leave out the probabilities
+DEFAULT_PROBABILITIES = {
+    "p_useful_if_buy": DEFAULT_P_USEFUL_IF_BUY,
+    "p_useful_if_not_buy": DEFAULT_P_USEFUL_IF_NOT_BUY,
+}
+
+# A valid row to start from, and the values scored for rows that are invalid
+DEFAULT_ROW = {
+    "item_name": "New item",
+    "price": 100.0,
+    "income_level": "medium",
+    "life_areas": [],
+    "necessity": "essential",
+    "time_use": 1.0,
+    "use_probability": "medium",
+    "life_span": 12,
+    "category": "efficiency",
+    **DEFAULT_PROBABILITIES,
+}
+
+
+class BulkScores(TypedDict):
+    """Per-row results; NaN for rows that do not validate."""
+
+    results: BatchUtilityMetrics
+    eu_buy: np.ndarray
+    eu_not_buy: np.ndarray
+    gain: np.ndarray
+    breakeven: np.ndarray
+
+
+def format_cell(field: str, value) -> str:
+    """Cell text for a parsed or raw value of ``field``."""
+    if field == "life_areas" and not isinstance(value, str):
+        return ";".join(value)
+    if isinstance(value, float):
+        return f"{value:g}"
+    return str(value)
+
+
+class BulkRows:
+    """Rows of cell text scored together through the batch calculator.
+
+    Every row is kept encoded, so editing one cell re-encodes only its row
+    before the whole table is scored in one vectorized call.
+    """
+
+    def __init__(
+        self, rows: Iterable[Mapping] = (), tables: LookupTables | None = None
+    ):
+        self.tables = tables if tables is not None else build_lookup_tables()
+        self.cells: list[dict[str, str]] = []
+        self.errors: list[str | None] = []
+        self._columns = encode_purchases([], self.tables)
+        self._p_buy = np.empty(0)
+        self._p_not_buy = np.empty(0)
+        self.extend(rows)
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    def extend(self, rows: Iterable[Mapping]) -> None:
+        parsed = []
+        for row in rows:
+            row = {**DEFAULT_PROBABILITIES, **row}
+            cells = {field: format_cell(field, row.get(field, "")) for field in FIELDS}
+            values, error = self._parse(cells)
+            self.cells.append(cells)
+            self.errors.append(error)
+            parsed.append(values)
+        encoded = encode_purchases(parsed, self.tables)
+        for name, column in encoded.items():
+            self._columns[name] = np.concatenate([self._columns[name], column])
+        self._p_buy = np.concatenate(
+            [self._p_buy, [values["p_useful_if_buy"] for values in parsed]]
+        )
+        self._p_not_buy = np.concatenate(
+            [self._p_not_buy, [values["p_useful_if_not_buy"] for values in parsed]]
+        )
+
+    def set_cell(self, index: int, field: str, text: str) -> str | None:
+        """Change one cell and re-encode its row; returns the row's error."""
+        self.cells[index][field] = text
+        values, error = self._parse(self.cells[index])
+        self.errors[index] = error
+        for name, column in encode_purchases([values], self.tables).items():
+            self._columns[name][index] = column[0]
+        self._p_buy[index] = values["p_useful_if_buy"]
+        self._p_not_buy[index] = values["p_useful_if_not_buy"]
+        return error
+
+    def delete(self, index: int) -> None:
+        del self.cells[index]
+        del self.errors[index]
+        for name, column in self._columns.items():
+            self._columns[name] = np.delete(column, index)
+        self._p_buy = np.delete(self._p_buy, index)
+        self._p_not_buy = np.delete(self._p_not_buy, index)
+
+    def purchase(self, index: int) -> dict:
+        """Parsed values of a valid row."""
+        values, errors = validate(self.cells[index], FIELDS)
+        if errors:
+            raise ValueError(next(iter(errors.values())))
+        return values
+
+    def score(self) -> BulkScores:
+        results = calculate_utilities_batch(self._columns, self.tables)
+        eu_buy = calculate_expected_utility_buy(self._p_buy, results)
+        eu_not_buy = calculate_expected_utility_not_buy(self._p_not_buy, results)
+        breakeven = calculate_breakeven_probability_batch(results, self._p_not_buy)
+        invalid = np.array([error is not None for error in self.errors], dtype=bool)
+        scores = {
+            "eu_buy": eu_buy,
+            "eu_not_buy": eu_not_buy,
+            "gain": eu_buy - eu_not_buy,
+            "breakeven": breakeven,
+        }
+        for values in scores.values():
+            values[invalid] = np.nan
+        return {"results": results, **scores}
+
+    def _parse(self, cells: Mapping[str, str]) -> tuple[dict, str | None]:
+        """Parsed values, with the defaults for an invalid row, and its error."""
+        values, errors = validate(cells, FIELDS)
+        if errors:
+            return DEFAULT_ROW, next(iter(errors.values()))
+        return values, None
+
+
+class BulkEditScreen(Screen):
+    """Screen editing many decisions in one table, scored as you type."""
+
+    # Field -> column label
+    COLUMNS: ClassVar[dict[str, str]] = {
+        "item_name": "Item",
+        "price": "Price",
+        "income_level": "Income",
+        "life_areas": "Life areas",
+        "necessity": "Necessity",
+        "time_use": "Hours/week",
+        "use_probability": "Use prob.",
+        "life_span": "Months",
+        "category": "Category",
+        "p_useful_if_buy": "P(useful|buy)",
+        "p_useful_if_not_buy": "P(useful|not buy)",
+    }
+    OUTPUTS: ClassVar[dict[str, str]] = {
+        "eu_buy": "E[U(Buy)]",
+        "eu_not_buy": "E[U(Don't Buy)]",
+        "gain": "Gain",
+        "breakeven": "Breakeven",
+        "recommendation": "Recommendation",
+    }
+
+    def __init__(self, rows: Iterable[Mapping] | None = None):
+        super().__init__()
+        self._initial_rows = rows
+        self.rows: BulkRows | None = None
+        self._keys: list[RowKey] = []
+        self._next_key = 0
+        self._shown: BulkScores | None = None
+        self._editing: tuple[RowKey, str] | None = None
+
+    def compose(self) -> ComposeResult:
+
+        with Vertical(id="content"), Container(classes="panel", id="bulk-panel"):
+            yield DataTable(id="bulk_table", cursor_type="cell", zebra_stripes=True)
+            yield Input(placeholder="Select a cell and press Enter", id="bulk_cell")
+            yield Static("", id="bulk_status", classes="hint")
+
+            with Horizontal(id="button-group"):
+                yield Button("← Back", variant="default", id="back")
+                yield Button("Add Row", variant="default", id="add_row")
+                yield Button("Delete Row", variant="default", id="delete_row")
+                yield Button("Save All", variant="primary", id="save_all")
+
+    def on_mount(self) -> None:
+        """Set border titles, columns and the first rows."""
+        self.query_one("#bulk-panel", Container).border_title = "Bulk Edit"
+        self.query_one("#bulk_cell", Input).border_title = "Cell"
+        table = self.query_one("#bulk_table", DataTable)
+        for key, label in (*self.COLUMNS.items(), *self.OUTPUTS.items()):
+            table.add_column(label, key=key)
+
+        rows = self._initial_rows
+        if rows is None:
+            _, errors = validate(self.app.purchase_data)
+            rows = [{**DEFAULT_ROW, **self.app.purchase_data}] if not errors else []
+        self.rows = BulkRows(rows or [DEFAULT_ROW])
+        scores = self.rows.score()
+        for index in range(len(self.rows)):
+            self._add_table_row(index, scores)
+        self._shown = scores
+        self._show_status()
+        table.focus()
+
+    def on_data_table_cell_selected(self, event: DataTable.CellSelected) -> None:
+        """Open the selected input cell in the editor."""
+        field = event.cell_key.column_key.value
+        if field not in self.COLUMNS:
+            return
+        self._editing = (event.cell_key.row_key, field)
+        editor = self.query_one("#bulk_cell", Input)
+        editor.border_title = self.COLUMNS[field]
+        editor.value = str(event.value)
+        editor.focus()
+
+    def on_input_submitted(self, event: Input.Submitted) -> None:
+        if event.input.id != "bulk_cell" or self._editing is None:
+            return
+        row_key, field = self._editing
+        self._editing = None
+        self.edit_cell(self._keys.index(row_key), field, event.value)
+        self.query_one("#bulk_table", DataTable).focus()
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        if event.button.id == "back":
+            self.app.pop_screen()
+        elif event.button.id == "add_row":
+            self.add_row()
+        elif event.button.id == "delete_row":
+            self.delete_row()
+        elif event.button.id == "save_all":
+            self._save_all()
+
+    def edit_cell(self, index: int, field: str, text: str) -> None:
+        """Set one cell and redraw the rows whose results changed."""
+        text = text.strip()
+        self.rows.set_cell(index, field, text)
+        table = self.query_one("#bulk_table", DataTable)
+        table.update_cell(self._keys[index], field, text)
+        self._refresh_scores(dirty={index})
+
+    def add_row(self) -> None:
+        """Append a copy of the selected row, or the default row."""
+        table = self.query_one("#bulk_table", DataTable)
+        if len(self.rows):
+            source = self.rows.cells[min(table.cursor_row, len(self.rows) - 1)]
+        else:
+            source = DEFAULT_ROW
+        self.rows.extend([source])
+        # The other rows are unchanged; only the new one is drawn
+        self._shown = self.rows.score()
+        self._add_table_row(len(self.rows) - 1, self._shown)
+        self._show_status()
+        table.move_cursor(row=len(self.rows) - 1)
+
+    def delete_row(self) -> None:
+        table = self.query_one("#bulk_table", DataTable)
+        if not len(self.rows):
+            return
+        index = min(table.cursor_row, len(self.rows) - 1)
+        self.rows.delete(index)
+        table.remove_row(self._keys.pop(index))
+        self._shown = self.rows.score()
+        self._show_status()
+
+    def _add_table_row(self, index: int, scores: BulkScores) -> None:
+        key = RowKey(str(self._next_key))
+        self._next_key += 1
+        self._keys.append(key)
+        cells = self.rows.cells[index]
+        outputs = self._format_outputs(index, scores)
+        self.query_one("#bulk_table", DataTable).add_row(
+            *(cells[field] for field in self.COLUMNS),
+            *(outputs[name] for name in self.OUTPUTS),
+            key=key.value,
+        )
+
+    def _refresh_scores(self, dirty: Iterable[int] = ()) -> None:
+        """Score every row, then redraw only the rows whose output changed."""
+        scores = self.rows.score()
+        shown = self._shown
+        if shown is None or shown["gain"].shape != scores["gain"].shape:
+            changed = set(range(len(self.rows)))
+        else:
+            differs = np.zeros(len(self.rows), dtype=bool)
+            for name in ("eu_buy", "eu_not_buy", "breakeven"):
+                new, old = scores[name], shown[name]
+                differs |= (new != old) & ~(np.isnan(new) & np.isnan(old))
+            changed = set(np.flatnonzero(differs).tolist()) | set(dirty)
+        self._shown = scores
+
+        table = self.query_one("#bulk_table", DataTable)
+        for index in sorted(changed):
+            outputs = self._format_outputs(index, scores)
+            for name, text in outputs.items():
+                table.update_cell(self._keys[index], name, text)
+        self._show_status()
+
+    def _format_outputs(self, index: int, scores: BulkScores) -> dict[str, str]:
+        error = self.rows.errors[index]
+        if error is not None:
+            return {**dict.fromkeys(self.OUTPUTS, "-"), "recommendation": error}
+        gain = scores["gain"][index]
+        return {
+            "eu_buy": f"{scores['eu_buy'][index]:.2f}",
+            "eu_not_buy": f"{scores['eu_not_buy'][index]:.2f}",
+            "gain": f"{gain:+.2f}",
+            "breakeven": f"{scores['breakeven'][index]:.1%}",
+            "recommendation": "BUY" if gain > 0 else "DON'T BUY",
+        }
+
+    def _show_status(self) -> None:
+        invalid = sum(error is not None for error in self.rows.errors)
+        status = f"{len(self.rows)} rows"
+        if invalid:
+            status += f", {invalid} with errors"
+        self.query_one("#bulk_status", Static).update(
+            f"{status}. Enter on a cell edits it; separate life areas with ';'."
+        )
+
+    def _save_all(self) -> None:
+        """Record every valid row in the decision history."""
+        scores = self.rows.score()
+        results = scores["results"]
+        created_at = time.time()
+        decisions = []
+        for index, error in enumerate(self.rows.errors):
+            if error is not None:
+                continue
+            values = self.rows.purchase(index)
+            purchase = {field: values[field] for field in PURCHASE_FIELDS}
+            decisions.append(
+                (
+                    purchase,
+                    {name: float(results[name][index]) for name in UTILITY_COLUMNS},
+                    values["p_useful_if_buy"],
+                    values["p_useful_if_not_buy"],
+                    created_at,
+                )
+            )
+        try:
+            self.app.history.record_many(decisions)
+        except (OSError, sqlite3.Error) as error:
+            self.app.notify(f"Could not save decisions: {error}", severity="error")
+            return
+        skipped = len(self.rows) - len(decisions)
+        message = f"Saved {len(decisions)} decisions"
+        if skipped:
+            message += f"; skipped {skipped} with errors"
+        self.app.notify(message)
@@ -0,0 +1,247 @@
+"""
+Chart of the expected utilities against P(useful|buy).
+
+E[U(Buy)] is a line over P(useful|buy) and E[U(Don't Buy)] a flat line at
+the current P(useful|not buy); they cross at the breakeven point. Both are
+drawn in braille dots, 2 x 4 per cell, over a y range that covers every
+P(useful|not buy), so changing a probability never rescales the chart.
+
+The E[U(Buy)] sweep and its dots are computed once per size and results.
+A probability change only re-renders the rows it touches: those of the old
+and new flat line and markers, and the axis row.
+"""
+
+from itertools import pairwise
+from typing import ClassVar
+
+import numpy as np
+from rich.segment import Segment
+from rich.style import Style
+from textual.geometry import Region, Size
+from textual.strip import Strip
+from textual.widget import Widget
+
+from src.calculator import (
+    calculate_breakeven_probability,
+    calculate_expected_utility_buy,
+    calculate_expected_utility_not_buy,
+    probability_grid,
+    sweep_probabilities,
+)
+from src.calculator.constants import (
+    DEFAULT_P_USEFUL_IF_BUY,
+    DEFAULT_P_USEFUL_IF_NOT_BUY,
+)
+from src.calculator.utility_calculator import UtilityMetrics
+
+# Bit of the braille dot at (x, y) of a cell, indexed [y, x]
+_DOT_BITS = np.array([[0x01, 0x08], [0x02, 0x10], [0x04, 0x20], [0x40, 0x80]])
+_BRAILLE = 0x2800
+
+# Cell layers, which pick the style of a run of cells
+_EMPTY, _BUY, _NOT_BUY, _BOTH = 0, 1, 2, 3
+_SCENARIOS = (
+    "u_buy_useful",
+    "u_buy_not_useful",
+    "u_not_buy_useful",
+    "u_not_buy_not_useful",
+)
+
+
+class SweepChart(Widget):
+    """E[U(Buy)] and E[U(Don't Buy)] over P(useful|buy), with the breakeven."""
+
+    DEFAULT_CSS = """
+    SweepChart {
+        height: 12;
+    }
+    """
+
+    GUTTER = 9  # cells for the y axis labels
+    LAYER_STYLES: ClassVar[dict[int, Style]] = {
+        _EMPTY: Style(),
+        _BUY: Style(color="green"),
+        _NOT_BUY: Style(color="red"),
+        _BOTH: Style(color="yellow"),
+    }
+    AXIS_STYLE = Style(dim=True)
+    BREAKEVEN = ("◆", Style(color="yellow", bold=True))
+    CURRENT = ("●", Style(color="cyan", bold=True))
+    LEGEND = (
+        "[green]━ Buy[/]  [red]━ Don't buy[/]  "
+        "[yellow]◆ breakeven[/]  [cyan]● P(useful|buy)[/]"
+    )
+
+    def __init__(
+        self,
+        results: UtilityMetrics,
+        p_useful_if_buy: float = DEFAULT_P_USEFUL_IF_BUY,
+        p_useful_if_not_buy: float = DEFAULT_P_USEFUL_IF_NOT_BUY,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.results = results
+        self.p_useful_if_buy = p_useful_if_buy
+        self.p_useful_if_not_buy = p_useful_if_not_buy
+        # Every expected utility lies between the lowest and highest utility
+        values = [results[name] for name in _SCENARIOS]
+        self._low, self._high = min(values), max(values)
+        if self._high == self._low:
+            self._low, self._high = self._low - 1, self._high + 1
+        self._layout: Size | None = None  # size the caches were built for
+        self._buy_cells = np.zeros((0, 0), dtype=np.uint8)
+        self._lines: dict[int, Strip] = {}
+        self._marks: dict = {}
+
+    def set_probabilities(
+        self, p_useful_if_buy: float, p_useful_if_not_buy: float
+    ) -> None:
+        """Move the flat line and markers, re-rendering only the rows touched."""
+        if (p_useful_if_buy, p_useful_if_not_buy) == (
+            self.p_useful_if_buy,
+            self.p_useful_if_not_buy,
+        ):
+            return
+        self.p_useful_if_buy = p_useful_if_buy
+        self.p_useful_if_not_buy = p_useful_if_not_buy
+        if self._layout is None:
+            return
+        before = self._dynamic_rows()
+        self._place()
+        rows = before | self._dynamic_rows()
+        for y in rows:
+            self._lines.pop(y, None)
+        width = self.size.width
+        self.refresh(*(Region(0, y, width, 1) for y in sorted(rows)))
+
+    def render_line(self, y: int) -> Strip:
+        if self._layout != self.size:
+            self._build()
+        line = self._lines.get(y)
+        if line is None:
+            line = self._lines[y] = self._render_row(y)
+        return line
+
+    @property
+    def _plot_size(self) -> tuple[int, int]:
+        """Rows and columns of braille cells, leaving the gutter and axis row."""
+        return max(self.size.height - 1, 1), max(self.size.width - self.GUTTER, 1)
+
+    def _build(self) -> None:
+        """Sweep E[U(Buy)] over one probability per dot column and draw it."""
+        self._layout = self.size
+        self._lines.clear()
+        rows, columns = self._plot_size
+        sweep = sweep_probabilities(self.results, probability_grid(2 * columns))
+        y = self._dot_y(sweep["eu_buy"][:, 0])
+        # Join each dot to the previous column's so steep lines stay unbroken
+        previous = np.concatenate((y[:1], y[:-1]))
+        low, high = np.minimum(y, previous), np.maximum(y, previous)
+        dots = np.zeros((4 * rows, 2 * columns), dtype=bool)
+        for x in range(2 * columns):
+            dots[low[x] : high[x] + 1, x] = True
+        self._buy_cells = (
+            (dots.reshape(rows, 4, columns, 2) * _DOT_BITS[None, :, None, :])
+            .sum(axis=(1, 3))
+            .astype(np.uint8)
+        )
+        self._place()
+
+    def _place(self) -> None:
+        """Cells of the flat line, the breakeven and the current probability."""
+        _, columns = self._plot_size
+        eu_not_buy = calculate_expected_utility_not_buy(
+            self.p_useful_if_not_buy, self.results
+        )
+        dot_y = int(self._dot_y(np.array([eu_not_buy]))[0])
+        breakeven = calculate_breakeven_probability(
+            self.results, self.p_useful_if_not_buy
+        )
+        eu_buy = calculate_expected_utility_buy(self.p_useful_if_buy, self.results)
+        self._marks = {
+            "not_buy_row": dot_y // 4,
+            "not_buy_bits": int(_DOT_BITS[dot_y % 4].sum()),
+            "breakeven_column": self._column(breakeven, columns),
+            # On the flat line only where the two lines cross inside the chart
+            "crosses": 0 < breakeven < 1,
+            "current_row": int(self._dot_y(np.array([eu_buy]))[0]) // 4,
+            "current_column": self._column(self.p_useful_if_buy, columns),
+        }
+
+    def _dynamic_rows(self) -> set[int]:
+        rows = self._plot_size[0]
+        return {self._marks["not_buy_row"], self._marks["current_row"], rows}
+
+    def _dot_y(self, values: np.ndarray) -> np.ndarray:
+        """Dot row of each value, 0 at the top."""
+        rows = self._plot_size[0]
+        scaled = (self._high - values) / (self._high - self._low) * (4 * rows - 1)
+        return np.clip(np.rint(scaled), 0, 4 * rows - 1).astype(np.intp)
+
+    @staticmethod
+    def _column(probability: float, columns: int) -> int:
+        return min(int(probability * (2 * columns - 1) + 0.5) // 2, columns - 1)
+
+    def _render_row(self, y: int) -> Strip:
+        rows, columns = self._plot_size
+        width = self.size.width
+        base = self.rich_style
+        if y > rows:
+            return Strip.blank(width, base)
+        if y == rows:
+            return self._render_axis(columns, base).adjust_cell_length(width, base)
+
+        marks = self._marks
+        buy = self._buy_cells[y]
+        not_buy = marks["not_buy_bits"] if y == marks["not_buy_row"] else 0
+        codes = buy | not_buy
+        layers = (buy > 0) * _BUY + (_NOT_BUY if not_buy else _EMPTY)
+        chars = np.where(codes > 0, codes.astype(np.int64) + _BRAILLE, ord(" "))
+        text = "".join(map(chr, chars.tolist()))
+
+        overlays = {}
+        if y == marks["current_row"]:
+            overlays[marks["current_column"]] = self.CURRENT
+        if y == marks["not_buy_row"] and marks["crosses"]:
+            overlays[marks["breakeven_column"]] = self.BREAKEVEN
+
+        if y == 0:
+            label = f"{self._high:>{self.GUTTER - 1}.2f} "
+        elif y == rows - 1:
+            label = f"{self._low:>{self.GUTTER - 1}.2f} "
+        else:
+            label = " " * self.GUTTER
+        segments = [Segment(label[-self.GUTTER :], base + self.AXIS_STYLE)]
+        # Runs of cells drawn with the same layers share one segment
+        bounds = [0, *(np.flatnonzero(np.diff(layers)) + 1).tolist(), columns]
+        for start, end in pairwise(bounds):
+            style = base + self.LAYER_STYLES[int(layers[start])]
+            cuts = [x for x in sorted(overlays) if start <= x < end]
+            for x in cuts:
+                if x > start:
+                    segments.append(Segment(text[start:x], style))
+                char, mark_style = overlays[x]
+                segments.append(Segment(char, base + mark_style))
+                start = x + 1
+            if start < end:
+                segments.append(Segment(text[start:end], style))
+        return Strip(segments, self.GUTTER + columns).adjust_cell_length(width, base)
+
+    def _render_axis(self, columns: int, base: Style) -> Strip:
+        """P(useful|buy) from 0 to 1, with the breakeven and current value."""
+        axis = ["─"] * columns
+        axis[0], axis[-1] = "0", "1"
+        marks = {
+            self._marks["breakeven_column"]: self.BREAKEVEN,
+            self._marks["current_column"]: self.CURRENT,
+        }
+        style = base + self.AXIS_STYLE
+        segments = [Segment(f"{'P(buy) ':>{self.GUTTER}}"[-self.GUTTER :], style)]
+        start = 0
+        for x in sorted(marks):
+            segments.append(Segment("".join(axis[start:x]), style))
+            char, mark_style = marks[x]
+            segments.append(Segment(char, base + mark_style))
+            start = x + 1
+        segments.append(Segment("".join(axis[start:]), style))
+        return Strip(segments, self.GUTTER + columns)
@@ -0,0 +1,81 @@
+from pathlib import Path
+from typing import ClassVar
+
+from textual.app import ComposeResult
+from textual.containers import Container, Horizontal, Vertical
+from textual.screen import Screen
+from textual.widgets import Button, DataTable, Static
+
+from src.instrumentation import METRICS
+
+
+class DebugScreen(Screen):
+    """Hidden screen showing live span timings and counters."""
+
+    REFRESH_INTERVAL = 1.0  # seconds
+
+    # Written to the working directory by the Export button
+    EXPORT_FILES: ClassVar[dict[str, str]] = {
+        "prometheus": "dgsua-metrics.prom",
+        "json": "dgsua-metrics.json",
+    }
+
+    COLUMNS = ("Span", "Calls", "Mean (ms)", "p50 (ms)", "p90 (ms)", "p99 (ms)")
+
+    def compose(self) -> ComposeResult:
+
+        with Vertical(id="content"), Container(classes="panel", id="debug-panel"):
+            yield DataTable(id="debug_spans", cursor_type="row", zebra_stripes=True)
+            yield Static("", id="debug_counters")
+            yield Static("", id="debug_status", classes="hint")
+
+            with Horizontal(id="button-group"):
+                yield Button("← Back", variant="default", id="back")
+                yield Button("Reset", variant="default", id="reset")
+                yield Button("Export", variant="primary", id="export")
+
+    def on_mount(self) -> None:
+        """Set the border title and start refreshing."""
+        self.query_one("#debug-panel", Container).border_title = "Instrumentation"
+        self.query_one("#debug_spans", DataTable).add_columns(*self.COLUMNS)
+        self.refresh_metrics()
+        self.set_interval(self.REFRESH_INTERVAL, self.refresh_metrics)
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        if event.button.id == "back":
+            self.app.pop_screen()
+        elif event.button.id == "reset":
+            METRICS.reset()
+            self.refresh_metrics()
+        elif event.button.id == "export":
+            for export_format, name in self.EXPORT_FILES.items():
+                Path(name).write_text(METRICS.export(export_format), encoding="utf-8")
+            self.app.notify(f"Wrote {', '.join(self.EXPORT_FILES.values())}")
+
+    def refresh_metrics(self) -> None:
+        snapshot = METRICS.snapshot()
+        table = self.query_one("#debug_spans", DataTable)
+        table.clear()
+        for name, histogram in snapshot["spans"].items():
+            count = histogram["count"]
+            table.add_row(
+                name,
+                str(count),
+                f"{histogram['sum'] / count:.4f}" if count else "-",
+                f"{histogram['p50']:.4f}",
+                f"{histogram['p90']:.4f}",
+                f"{histogram['p99']:.4f}",
+                key=name,
+            )
+
+        counters = ", ".join(
+            f"{name}: {value}" for name, value in snapshot["counters"].items()
+        )
+        self.query_one("#debug_counters", Static).update(
+            f"Counters: {counters}" if counters else "No counters yet."
+        )
+        self.query_one("#debug_status", Static).update(
+            "Recording; refreshed every second."
+            if snapshot["enabled"]
+            else "Instrumentation is off; start with --metrics or DGSUA_METRICS=1."
+        )
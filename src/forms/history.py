@@ -0,0 +1,109 @@
+from datetime import datetime
+
+from textual.app import ComposeResult
+from textual.containers import Container, Horizontal, Vertical
+from textual.screen import Screen
+from textual.widgets import Button, DataTable, Input, Static
+
+from src.history import Cursor, Decision
+
+
+class HistoryScreen(Screen):
+    """Screen paging through past decisions, newest first."""
+
+    PAGE_SIZE = 50
+    # Load the next page when the cursor gets this close to the last row
+    PREFETCH_ROWS = 10
+
+    COLUMNS = (
+        "When",
+        "Item",
+        "Price",
+        "Category",
+        "Income",
+        "P(useful|buy)",
+        "E[U(Buy)]",
+        "E[U(Don't Buy)]",
+        "Recommendation",
+    )
+
+    def __init__(self):
+        super().__init__()
+        self._next: Cursor | None = None
+        self._filters: dict[str, str] = {}
+
+    def compose(self) -> ComposeResult:
+
+        with Vertical(id="content"), Container(classes="panel", id="history-panel"):
+            yield Input(placeholder="Item name, Enter to filter", id="history_filter")
+            yield DataTable(id="history_table", cursor_type="row", zebra_stripes=True)
+            yield Static("", id="history_status", classes="hint")
+
+            with Horizontal(id="button-group"):
+                yield Button("← Back", variant="default", id="back")
+
+    def on_mount(self) -> None:
+        """Set border titles and load the first page."""
+        self.query_one("#history-panel", Container).border_title = "Decision History"
+        self.query_one("#history_filter", Input).border_title = "Filter"
+        table = self.query_one("#history_table", DataTable)
+        table.add_columns(*self.COLUMNS)
+        self._reload()
+        table.focus()
+
+    def on_input_submitted(self, event: Input.Submitted) -> None:
+        if event.input.id == "history_filter":
+            item_name = event.value.strip()
+            self._filters = {"item_name": item_name} if item_name else {}
+            self._reload()
+
+    def on_data_table_row_highlighted(self, event: DataTable.RowHighlighted) -> None:
+        if (
+            self._next is not None
+            and event.cursor_row >= event.data_table.row_count - self.PREFETCH_ROWS
+        ):
+            self._load_page()
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        if event.button.id == "back":
+            self.app.pop_screen()
+
+    def _reload(self) -> None:
+        self.query_one("#history_table", DataTable).clear()
+        self._next = None
+        self._load_page(first=True)
+
+    def _load_page(self, first: bool = False) -> None:
+        """Append the next page of decisions to the table."""
+        page = self.app.history.page(
+            after=None if first else self._next, limit=self.PAGE_SIZE, **self._filters
+        )
+        self._next = page.next
+        table = self.query_one("#history_table", DataTable)
+        for decision in page.decisions:
+            table.add_row(*self._cells(decision), key=str(decision["id"]))
+
+        loaded = table.row_count
+        if loaded == 0:
+            status = "No decisions recorded yet."
+        elif self._next is None:
+            status = f"Showing all {loaded} decisions."
+        else:
+            status = f"Showing {loaded} decisions, scroll down for more."
+        self.query_one("#history_status", Static).update(status)
+
+    def _cells(self, decision: Decision) -> tuple[str, ...]:
+        purchase = decision["purchase_data"]
+        eu_buy = decision["eu_buy"]
+        eu_not_buy = decision["eu_not_buy"]
+        return (
+            datetime.fromtimestamp(decision["created_at"]).strftime("%Y-%m-%d %H:%M"),
+            purchase["item_name"],
+            f"{purchase['price']:.2f}",
+            purchase["category"],
+            purchase["income_level"],
+            f"{decision['p_useful_if_buy']:.0%}",
+            f"{eu_buy:.2f}",
+            f"{eu_not_buy:.2f}",
+            "BUY" if eu_buy > eu_not_buy else "DON'T BUY",
+        )
@@ -3,10 +3,13 @@ from textual.containers import Container, Horizontal, Vertical
 from textual.screen import Screen
 from textual.widgets import Button, Checkbox, RadioButton, RadioSet
 
-from src.forms.time_and_category import TimeAndCategoryScreen
+from src.forms import load_screen
+from src.forms.schema import validate
 
 
 class LifeAreasScreen(Screen):
+    LIFE_AREAS = ("career", "personal", "health")
+
     def on_mount(self) -> None:
         """Set border title when screen is mounted"""
         self.query_one("#life-areas-panel", Container).border_title = (
@@ -16,6 +19,19 @@ class LifeAreasScreen(Screen):
             "What areas of life does this affect?"
         )
         self.query_one("#necessity", RadioSet).border_title = "Necessity Level"
+        self._prefill(self.app.purchase_data)
+
+    def _prefill(self, purchase_data: dict) -> None:
+        """Show values from a template or an earlier pass through the form."""
+        if "life_areas" in purchase_data:
+            for area in self.LIFE_AREAS:
+                self.query_one(f"#{area}", Checkbox).value = (
+                    area in purchase_data["life_areas"]
+                )
+        if "necessity" in purchase_data:
+            necessity = self.query_one("#necessity", RadioSet)
+            button = necessity.query_one(f"#{purchase_data['necessity']}", RadioButton)
+            button.value = True
 
     def compose(self) -> ComposeResult:
 
@@ -41,26 +57,21 @@ class LifeAreasScreen(Screen):
 
     def on_button_pressed(self, event: Button.Pressed) -> None:
         if event.button.id == "continue":
+            raw = {
+                "life_areas": [
+                    area
+                    for area in self.LIFE_AREAS
+                    if self.query_one(f"#{area}", Checkbox).value
+                ],
+                "necessity": self.query_one("#necessity", RadioSet).pressed_button.id,
+            }
+            values, errors = validate(raw, raw)
+            if errors:
+                self.app.notify(next(iter(errors.values())), severity="error")
+                return
+            self.app.purchase_data.update(values)
 
-            life_areas = []
-            career_checkbox = self.query_one("#career", Checkbox)
-            personal_checkbox = self.query_one("#personal", Checkbox)
-            health_checkbox = self.query_one("#health", Checkbox)
-
-            if career_checkbox.value:
-                life_areas.append("career")
-            if personal_checkbox.value:
-                life_areas.append("personal")
-            if health_checkbox.value:
-                life_areas.append("health")
-
-            necessity_radio = self.query_one("#necessity", RadioSet)
-            necessity = necessity_radio.pressed_button.id
-
-            self.app.purchase_data["life_areas"] = life_areas
-            self.app.purchase_data["necessity"] = necessity
-
-            self.app.push_screen(TimeAndCategoryScreen())
+            self.app.push_screen(load_screen("time_and_category")())
 
         elif event.button.id == "back":
             self.app.pop_screen()
@@ -0,0 +1,160 @@
+from pathlib import Path
+
+import numpy as np
+from textual.app import ComposeResult
+from textual.containers import Container, Horizontal, Vertical
+from textual.screen import Screen
+from textual.widgets import Button, DataTable, Input, Static
+
+from src.calculator import score_options, select_within_budget, top_k
+from src.calculator.constants import (
+    DEFAULT_P_USEFUL_IF_BUY,
+    DEFAULT_P_USEFUL_IF_NOT_BUY,
+)
+from src.scoring.stream import parse_record, read_records
+
+
+class RankingScreen(Screen):
+    """Screen ranking candidate purchases from a CSV or JSONL file."""
+
+    TOP_K = 100
+
+    COLUMNS = (
+        "Rank",
+        "Item",
+        "Price",
+        "E[U(Buy)]",
+        "E[U(Don't Buy)]",
+        "Gain",
+        "In Budget",
+    )
+
+    def compose(self) -> ComposeResult:
+
+        with Vertical(id="content"), Container(classes="panel", id="ranking-panel"):
+            with Horizontal(id="ranking-inputs"):
+                yield Input(placeholder="e.g., candidates.csv", id="ranking_path")
+                yield Input(placeholder="No budget", id="ranking_budget", type="number")
+            yield DataTable(id="ranking_table", cursor_type="row", zebra_stripes=True)
+            yield Static(
+                "Enter a file of candidates and press Enter to rank them.",
+                id="ranking_status",
+                classes="hint",
+            )
+
+            with Horizontal(id="button-group"):
+                yield Button("← Back", variant="default", id="back")
+                yield Button("Rank", variant="primary", id="rank")
+
+    def on_mount(self) -> None:
+        """Set border titles and table columns."""
+        self.query_one("#ranking-panel", Container).border_title = "Compare Options"
+        self.query_one("#ranking_path", Input).border_title = "Candidates file"
+        self.query_one("#ranking_budget", Input).border_title = "Budget (dollars)"
+        self.query_one("#ranking_table", DataTable).add_columns(*self.COLUMNS)
+        self.query_one("#ranking_path", Input).focus()
+
+    def on_input_submitted(self, event: Input.Submitted) -> None:
+        self._start_ranking()
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        if event.button.id == "back":
+            self.app.pop_screen()
+        elif event.button.id == "rank":
+            self._start_ranking()
+
+    def _start_ranking(self) -> None:
+        """Validate the inputs and rank the file on the calculator worker."""
+        path = self.query_one("#ranking_path", Input).value.strip()
+        budget_text = self.query_one("#ranking_budget", Input).value.strip()
+        if not path:
+            self.app.notify("A candidates file is required", severity="error")
+            return
+        budget = None
+        if budget_text:
+            try:
+                budget = float(budget_text)
+            except ValueError:
+                self.app.notify("Budget must be a valid number", severity="error")
+                return
+            if budget < 0:
+                self.app.notify("Budget must not be negative", severity="error")
+                return
+
+        self.query_one("#ranking_status", Static).update(f"Ranking {path}...")
+        self.run_worker(self._rank(path, budget), exclusive=True, group="ranking")
+
+    async def _rank(self, path: str, budget: float | None) -> None:
+        try:
+            result = await self.app.calculator.run(_rank_file, path, budget, self.TOP_K)
+        except (OSError, ValueError) as error:
+            self._show_error(str(error))
+            return
+        self._show(*result)
+
+    def _show_error(self, message: str) -> None:
+        self.app.notify(message, severity="error")
+        self.query_one("#ranking_status", Static).update("")
+
+    def _show(self, purchases, scores, ranked, selection) -> None:
+        table = self.query_one("#ranking_table", DataTable)
+        table.clear()
+        chosen = set() if selection is None else set(selection["index"].tolist())
+        for rank, index in enumerate(ranked.tolist(), start=1):
+            purchase = purchases[index]
+            table.add_row(
+                str(rank),
+                purchase["item_name"],
+                f"{purchase['price']:.2f}",
+                f"{scores['eu_buy'][index]:.2f}",
+                f"{scores['eu_not_buy'][index]:.2f}",
+                f"{scores['gain'][index]:.2f}",
+                "✓" if index in chosen else "",
+                key=str(index),
+            )
+
+        status = f"Top {table.row_count} of {len(purchases)} candidates."
+        if selection is not None:
+            bound = selection["upper_bound"]
+            gap = 1 - selection["total_gain"] / bound if bound > 0 else 0.0
+            status += (
+                f" Within budget: {len(selection['index'])} items for "
+                f"{selection['total_price']:.2f}, gain {selection['total_gain']:.2f}"
+                f" ({selection['method']}, within {gap:.1%} of the best possible)."
+            )
+        self.query_one("#ranking_status", Static).update(status)
+        table.focus()
+
+
+def _rank_file(path: str, budget: float | None, k: int) -> tuple:
+    """Score the candidates in ``path``, rank the top ``k`` and select within budget."""
+    purchases, p_buy, p_not_buy = _load_candidates(path)
+    scores = score_options(purchases, p_buy, p_not_buy)
+    selection = None
+    if budget is not None:
+        selection = select_within_budget(scores["price"], scores["gain"], budget)
+    return purchases, scores, top_k(scores["eu_buy"], k), selection
+
+
+def _load_candidates(path: str) -> tuple[list, np.ndarray, np.ndarray]:
+    """Purchases and their probabilities from a CSV or JSONL file."""
+    input_format = "csv" if Path(path).suffix.lower() == ".csv" else "jsonl"
+    purchases = []
+    p_buy = []
+    p_not_buy = []
+    with open(path, encoding="utf-8", newline="") as file:
+        for number, raw in enumerate(read_records(file, input_format), start=1):
+            try:
+                purchase, record_p_buy, record_p_not_buy = parse_record(raw)
+            except ValueError as error:
+                raise ValueError(f"Record {number}: {error}") from None
+            purchases.append(purchase)
+            p_buy.append(
+                DEFAULT_P_USEFUL_IF_BUY if record_p_buy is None else record_p_buy
+            )
+            p_not_buy.append(
+                DEFAULT_P_USEFUL_IF_NOT_BUY
+                if record_p_not_buy is None
+                else record_p_not_buy
+            )
+    return purchases, np.array(p_buy), np.array(p_not_buy)
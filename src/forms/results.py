@@ -1,29 +1,108 @@
+import sqlite3
+from typing import ClassVar
+
 from textual.app import ComposeResult
 from textual.containers import Container, Horizontal, Vertical
 from textual.reactive import reactive
 from textual.screen import Screen
+from textual.timer import Timer
 from textual.widgets import Button, Input, Static
 
 from src.calculator import (
-    calculate_breakeven_probability,
-    calculate_expected_utility_buy,
-    calculate_expected_utility_not_buy,
+    DecisionSummary,
+    SensitivityReport,
+    SensitivityScenarios,
+    UsagePosterior,
+    UtilityTrace,
     calculate_utilities,
+    explain_utilities,
+    sensitivity_report,
+    sensitivity_scenarios,
+    summarize_decision,
+)
+from src.calculator.constants import (
+    DEFAULT_P_USEFUL_IF_BUY,
+    DEFAULT_P_USEFUL_IF_NOT_BUY,
 )
+from src.forms import load_screen
+from src.forms.chart import SweepChart
+from src.forms.schema import SCHEMA
 
 
 class ResultsScreen(Screen):
     """Screen displaying the utility calculation results."""
 
     # Reactive probabilities that update the UI when changed
-    p_useful_if_buy = reactive(0.5)
-    p_useful_if_not_buy = reactive(0.1)
+    p_useful_if_buy = reactive(DEFAULT_P_USEFUL_IF_BUY)
+    p_useful_if_not_buy = reactive(DEFAULT_P_USEFUL_IF_NOT_BUY)
+
+    # Input id -> probability attribute it sets
+    PROBABILITY_INPUTS: ClassVar[dict[str, str]] = {
+        "p_useful_buy": "p_useful_if_buy",
+        "p_useful_not_buy": "p_useful_if_not_buy",
+    }
+    OUTPUTS = (
+        "expected_utility_buy",
+        "expected_utility_not_buy",
+        "breakeven_analysis",
+        "recommendation",
+        "sensitivity_report",
+        "breakdown_report",
+    )
+
+    # Field -> label in the sensitivity report
+    FIELD_LABELS: ClassVar[dict[str, str]] = {
+        "price": "Price",
+        "time_use": "Time use",
+        "life_span": "Life span",
+        "p_useful_if_buy": "P(useful|buy)",
+        "p_useful_if_not_buy": "P(useful|not buy)",
+        "income_level": "Income level",
+        "necessity": "Necessity",
+        "use_probability": "Use probability",
+        "category": "Category",
+    }
+    # Tornado bars shown, widest first
+    TORNADO_ROWS = 5
+
+    # Seconds without input before the results are recomputed
+    DEBOUNCE_DELAY = 0.1
 
     def __init__(self, purchase_data: dict):
         super().__init__()
+        self.purchase_data = purchase_data
         self.results = calculate_utilities(purchase_data)
+        # Computed on the calculator worker once the screen is mounted
+        self.sensitivity: SensitivityScenarios | None = None
+        self._summary: DecisionSummary | None = None
+        self._pending: dict[str, str] = {}
+        self._debounce: Timer | None = None
+        self._outputs: dict[str, Static] = {}
+        self._chart: SweepChart | None = None
+        self._shown: dict[str, str] = {}
+        self._recorded = False
+        self._usage: UsagePosterior | None = None
+        # Computed the first time the breakdown is shown
+        self._trace: UtilityTrace | None = None
+
+    def _usage_posterior(self) -> UsagePosterior | None:
+        """Estimated P(useful|buy) of this purchase's segment, if it has events."""
+        estimator = self.app.usage
+        if estimator is None:
+            return None
+        posterior = estimator.posterior(
+            self.purchase_data["category"], self.purchase_data["life_areas"]
+        )
+        return posterior if posterior["events"] else None
 
     def compose(self) -> ComposeResult:
+        # Start P(useful|buy) from logged usage when there is any
+        self._usage = self._usage_posterior()
+        p_useful_buy = (
+            str(DEFAULT_P_USEFUL_IF_BUY)
+            if self._usage is None
+            else f"{self._usage['mean']:.2f}"
+        )
 
         with Vertical(id="content"):
             with Container(classes="panel", id="results-panel"):
@@ -43,14 +122,14 @@ class ResultsScreen(Screen):
 
                 yield Input(
                     placeholder="0.0-1.0",
-                    value="0.5",
+                    value=p_useful_buy,
                     id="p_useful_buy",
                     type="number",
                 )
 
                 yield Input(
                     placeholder="0.0-1.0",
-                    value="0.5",
+                    value=str(DEFAULT_P_USEFUL_IF_NOT_BUY),
                     id="p_useful_not_buy",
                     type="number",
                 )
@@ -59,87 +138,235 @@ class ResultsScreen(Screen):
                     yield Static("", id="expected_utility_buy")
                     yield Static("", id="expected_utility_not_buy")
                     yield Static("", id="breakeven_analysis")
-                    yield Static(self._get_recommendation(), id="recommendation")
+                    yield Static("", id="recommendation")
+
+                with Vertical(classes="section", id="chart-section"):
+                    yield SweepChart(self.results, id="chart")
+
+                with Vertical(classes="section", id="sensitivity"):
+                    yield Static("", id="sensitivity_report")
+
+                with Vertical(classes="section", id="breakdown"):
+                    yield Static("", id="breakdown_report")
 
                 with Horizontal(id="button-group"):
                     yield Button("← Start Over", variant="default", id="start_over")
+                    yield Button("Save Template", variant="default", id="save_template")
+                    yield Button("Explain", variant="default", id="explain")
 
     def on_mount(self) -> None:
         """Initialize the expected utility display when screen loads."""
-        item_name = self.app.purchase_data.get("item_name", "Unknown Item")
+        item_name = self.purchase_data.get("item_name", "Unknown Item")
         self.query_one("#results-panel", Container).border_title = (
             f"Analysis: {item_name}"
         )
         self.query_one("#scenarios", Vertical).border_title = "Scenario Values"
-        self.query_one("#p_useful_buy", Input).border_title = "P(useful|buy)"
+        p_useful_buy = self.query_one("#p_useful_buy", Input)
+        p_useful_buy.border_title = "P(useful|buy)"
+        if self._usage is not None:
+            p_useful_buy.border_subtitle = f"{self._usage['events']:,} usage events"
         self.query_one("#p_useful_not_buy", Input).border_title = "P(useful|not buy)"
         self.query_one("#analysis", Vertical).border_title = "Expected Utilities"
+        chart_section = self.query_one("#chart-section", Vertical)
+        chart_section.border_title = "E[U] vs P(useful|buy)"
+        chart_section.border_subtitle = SweepChart.LEGEND
+        self._chart = self.query_one("#chart", SweepChart)
+        self.query_one("#sensitivity", Vertical).border_title = "Sensitivity"
+        breakdown = self.query_one("#breakdown", Vertical)
+        breakdown.border_title = "Breakdown"
+        breakdown.display = False
+        self._outputs = {name: self.query_one(f"#{name}", Static) for name in self.OUTPUTS}
+        # Start from the values the inputs were composed with
+        self._pending = {
+            input_id: self.query_one(f"#{input_id}", Input).value
+            for input_id in self.PROBABILITY_INPUTS
+        }
+        self._apply_pending()
         self._update_expected_utilities()
+        self.run_worker(self._load_sensitivity(), exclusive=True, group="sensitivity")
+
+    async def _load_sensitivity(self) -> None:
+        self.sensitivity = await self.app.calculator.run(
+            sensitivity_scenarios, self.purchase_data
+        )
+        self._update_sensitivity()
+
+    def on_unmount(self) -> None:
+        """Record the decision with the probabilities the user settled on."""
+        if self._recorded:
+            return
+        self._recorded = True
+        if self._debounce is not None:
+            self._debounce.stop()
+            self._apply_pending()
+        try:
+            self.app.history.record(
+                self.purchase_data,
+                self.results,
+                self.p_useful_if_buy,
+                self.p_useful_if_not_buy,
+            )
+        except (OSError, sqlite3.Error) as error:
+            self.app.notify(f"Could not save decision: {error}", severity="error")
 
     def on_input_changed(self, event: Input.Changed) -> None:
-        """Handle changes to probability inputs."""
-        if event.input.id == "p_useful_buy":
-            if not event.value or len(event.value.strip()) == 0:
-                return
-            try:
-                value = float(event.value)
-                if 0 <= value <= 1:
-                    self.p_useful_if_buy = value
-                    self._update_expected_utilities()
-                else:
-                    self.app.notify("Probability must be between 0 and 1", severity="warning")
-            except ValueError:
-                self.app.notify("Probability must be a valid number", severity="warning")
-        elif event.input.id == "p_useful_not_buy":
-            if not event.value or len(event.value.strip()) == 0:
-                return
+        """Queue changes to probability inputs until typing settles."""
+        if event.input.id not in self.PROBABILITY_INPUTS:
+            return
+        self._pending[event.input.id] = event.value
+        if self._debounce is not None:
+            self._debounce.stop()
+        self._debounce = self.set_timer(self.DEBOUNCE_DELAY, self._apply_pending)
+
+    def _apply_pending(self) -> None:
+        """Validate the settled inputs and recompute the results once."""
+        pending, self._pending = self._pending, {}
+        self._debounce = None
+        changed = False
+        for input_id, text in pending.items():
+            if not text or len(text.strip()) == 0:
+                continue
+            name = self.PROBABILITY_INPUTS[input_id]
             try:
-                value = float(event.value)
-                if 0 <= value <= 1:
-                    self.p_useful_if_not_buy = value
-                    self._update_expected_utilities()
-                else:
-                    self.app.notify("Probability must be between 0 and 1", severity="warning")
-            except ValueError:
-                self.app.notify("Probability must be a valid number", severity="warning")
+                value = SCHEMA[name].parse(text)
+            except ValueError as error:
+                self.app.notify(str(error), severity="warning")
+                continue
+            if getattr(self, name) != value:
+                # The output widgets repaint themselves; skip repainting the screen
+                self.set_reactive(getattr(ResultsScreen, name), value)
+                changed = True
+        if changed:
+            self._update_expected_utilities()
+
+    def _summarize(self) -> DecisionSummary:
+        """Expected utilities and breakeven for the current inputs, computed once."""
+        summary = self._summary
+        if summary is None or (
+            summary["p_useful_if_buy"] != self.p_useful_if_buy
+            or summary["p_useful_if_not_buy"] != self.p_useful_if_not_buy
+        ):
+            summary = self._summary = summarize_decision(
+                self.results, self.p_useful_if_buy, self.p_useful_if_not_buy
+            )
+        return summary
 
     def _update_expected_utilities(self) -> None:
         """Update the expected utility displays."""
-        eu_buy = calculate_expected_utility_buy(self.p_useful_if_buy, self.results)
-        eu_not_buy = calculate_expected_utility_not_buy(
-            self.p_useful_if_not_buy, self.results
-        )
-        breakeven = calculate_breakeven_probability(
-            self.results, self.p_useful_if_not_buy
-        )
+        summary = self._summarize()
+        eu_buy = summary["eu_buy"]
+        eu_not_buy = summary["eu_not_buy"]
+        breakeven = summary["breakeven"]
 
-        eu_buy_widget = self.query_one("#expected_utility_buy", Static)
         if eu_buy > eu_not_buy:
-            eu_buy_widget.update(f"E[U(Buy)]: {eu_buy:.2f} ✓")
+            self._show("expected_utility_buy", f"E[U(Buy)]: {eu_buy:.2f} ✓")
         else:
-            eu_buy_widget.update(f"E[U(Buy)]: {eu_buy:.2f}")
+            self._show("expected_utility_buy", f"E[U(Buy)]: {eu_buy:.2f}")
 
-        eu_not_buy_widget = self.query_one("#expected_utility_not_buy", Static)
         if eu_not_buy > eu_buy:
-            eu_not_buy_widget.update(f"E[U(Don't Buy)]: {eu_not_buy:.2f} ✓")
+            self._show("expected_utility_not_buy", f"E[U(Don't Buy)]: {eu_not_buy:.2f} ✓")
         else:
-            eu_not_buy_widget.update(f"E[U(Don't Buy)]: {eu_not_buy:.2f}")
-
-        breakeven_widget = self.query_one("#breakeven_analysis", Static)
-        breakeven_widget.update(f"Breakeven: {breakeven:.1%}")
+            self._show("expected_utility_not_buy", f"E[U(Don't Buy)]: {eu_not_buy:.2f}")
 
-        recommendation_widget = self.query_one("#recommendation", Static)
-        recommendation_widget.update(self._get_recommendation())
+        self._show("breakeven_analysis", f"Breakeven: {breakeven:.1%}")
+        self._show("recommendation", self._get_recommendation(summary))
+        self._chart.set_probabilities(self.p_useful_if_buy, self.p_useful_if_not_buy)
+        self._update_sensitivity()
 
-    def _get_recommendation(self) -> str:
-        """Generate a recommendation based on the current expected utilities."""
-        eu_buy = calculate_expected_utility_buy(self.p_useful_if_buy, self.results)
-        eu_not_buy = calculate_expected_utility_not_buy(
-            self.p_useful_if_not_buy, self.results
+    def _update_sensitivity(self) -> None:
+        if self.sensitivity is None:
+            self._show("sensitivity_report", "Computing sensitivity...")
+            return
+        report = sensitivity_report(
+            self.sensitivity, self.p_useful_if_buy, self.p_useful_if_not_buy
         )
-        breakeven = calculate_breakeven_probability(
-            self.results, self.p_useful_if_not_buy
+        self._show("sensitivity_report", self._format_sensitivity(report))
+
+    def _show(self, name: str, text: str) -> None:
+        """Update an output widget, skipping it when its text is unchanged."""
+        if self._shown.get(name) != text:
+            self._shown[name] = text
+            self._outputs[name].update(text)
+
+    def _format_sensitivity(self, report: SensitivityReport) -> str:
+        """Flip points, gain derivatives and the widest tornado bars."""
+        flips = [
+            f"{self.FIELD_LABELS[field]} {value:.1%}"
+            for field, value in report["flip_at"].items()
+            if value is not None
+        ]
+        slopes = report["derivatives"]["gain"]
+        lines = [
+            "Flips at " + ", ".join(flips)
+            if flips
+            else "No probability flips the recommendation",
+            (
+                f"Gain per $ of price: {slopes['price']:+.4f}, "
+                f"per hour/week: {slopes['time_use']:+.3f}, "
+                f"per month of life span: {slopes['life_span']:+.3f}"
+            ),
+        ]
+        for bar in report["tornado"][: self.TORNADO_ROWS]:
+            lines.append(
+                f"{self.FIELD_LABELS[bar['field']]:<18} "
+                f"{self._format_value(bar['field'], bar['low_value'])} → "
+                f"{self._format_value(bar['field'], bar['high_value'])}: "
+                f"gain {bar['low_gain']:+.2f} … {bar['high_gain']:+.2f}"
+                + ("  flips" if bar["flips"] else "")
+            )
+        return "\n".join(lines)
+
+    def _toggle_breakdown(self) -> None:
+        """Show or hide every term the utilities were computed from."""
+        breakdown = self.query_one("#breakdown", Vertical)
+        if self._trace is None:
+            self._trace = explain_utilities(self.purchase_data)
+            self._show("breakdown_report", self._format_breakdown(self._trace))
+        breakdown.display = not breakdown.display
+
+    def _format_breakdown(self, trace: UtilityTrace) -> str:
+        """The terms of calculate_utilities, in the order they are applied."""
+        purchase = self.purchase_data
+        areas = ", ".join(
+            f"{area} {weight:g}" for area, weight in trace["life_area_weights"]
         )
+        lines = [
+            (
+                f"Hours of use: {trace['time_use_year']:g} h/year × "
+                f"{trace['life_span_years']:.3g} years × {trace['prob']:g} "
+                f"({purchase['use_probability']}) = {trace['total_time_use']:,.1f}"
+            ),
+            f"Multipliers: category {trace['category_mult']:g} × "
+            f"necessity {trace['necessity_mult']:g} × "
+            f"life areas {trace['life_area_mult']:.3g}"
+            + (f" (mean of {areas})" if areas else ""),
+            (
+                f"Benefit: {trace['benefit']:,.1f} weighted hours, "
+                f"{trace['benefit_factor']:.4f} per $"
+            ),
+            (
+                f"Income weights ({purchase['income_level']}): "
+                f"buy {trace['weight_buy_useful']:+g}/{trace['weight_buy_not_useful']:+g}, "
+                f"don't buy {trace['weight_not_buy_useful']:+g}/"
+                f"{trace['weight_not_buy_not_useful']:+g} (useful/not)"
+            ),
+        ]
+        if trace["defaults"]:
+            lines.append("Defaults used for: " + ", ".join(trace["defaults"]))
+        return "\n".join(lines)
+
+    def _format_value(self, field: str, value: float | str) -> str:
+        if isinstance(value, str):
+            return value
+        if field in ("p_useful_if_buy", "p_useful_if_not_buy"):
+            return f"{value:.0%}"
+        return f"{value:g}"
+
+    def _get_recommendation(self, summary: DecisionSummary) -> str:
+        """Generate a recommendation from already computed expected utilities."""
+        eu_buy = summary["eu_buy"]
+        eu_not_buy = summary["eu_not_buy"]
+        breakeven = summary["breakeven"]
 
         if eu_buy > eu_not_buy:
             confidence = eu_buy - eu_not_buy
@@ -155,6 +382,14 @@ class ResultsScreen(Screen):
             self.app.pop_screen()  # Pop time_and_category
             self.app.pop_screen()  # Pop life_areas
             self.app.pop_screen()  # Pop welcome
-            from .welcome import WelcomeScreen
-
-            self.app.push_screen(WelcomeScreen())
+            self.app.push_screen(load_screen("welcome")())
+        elif event.button.id == "save_template":
+            name = self.purchase_data["item_name"]
+            try:
+                self.app.templates.save(name, self.purchase_data)
+            except (OSError, ValueError) as error:
+                self.app.notify(f"Could not save template: {error}", severity="error")
+                return
+            self.app.notify(f"Saved template {name!r}")
+        elif event.button.id == "explain":
+            self._toggle_breakdown()
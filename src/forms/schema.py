@@ -0,0 +1,172 @@
+"""
+Validation shared by the form screens, templates and the bulk editor.
+
+Every field of a purchase, and the two probabilities, is described once in
+SCHEMA. validate() parses a mapping of raw values (text from an Input or
+values loaded from a file) in one pass and returns the parsed values with
+one error message per invalid field.
+
+Choices are read from the calculator constants on first use, so importing
+this module does not import the calculator.
+"""
+
+import math
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from importlib import import_module
+
+
+@dataclass(frozen=True)
+class TextField:
+    label: str
+    max_length: int
+
+    def parse(self, value) -> str:
+        text = str(value).strip()
+        if not text:
+            raise ValueError(f"{self.label} is required")
+        if len(text) > self.max_length:
+            raise ValueError(
+                f"{self.label} must be {self.max_length} characters or less"
+            )
+        return text
+
+
+@dataclass(frozen=True)
+class NumberField:
+    label: str
+    integer: bool = False
+    minimum: float = 0
+    minimum_inclusive: bool = False
+    maximum: float | None = None
+    maximum_text: str = ""  # how the maximum is described, e.g. with its unit
+    between: bool = False  # describe both bounds in any range error
+
+    def parse(self, value) -> float | int:
+        kind = "whole number" if self.integer else "number"
+        if isinstance(value, str):
+            value = value.strip()
+            if not value:
+                raise ValueError(f"{self.label} is required")
+        try:
+            number = int(value) if self.integer else float(value)
+        except (TypeError, ValueError, OverflowError):
+            raise ValueError(f"{self.label} must be a valid {kind}") from None
+        if not math.isfinite(number) or (
+            self.integer and not isinstance(value, str) and number != value
+        ):
+            raise ValueError(f"{self.label} must be a valid {kind}")
+
+        too_low = number < self.minimum or (
+            number == self.minimum and not self.minimum_inclusive
+        )
+        too_high = self.maximum is not None and number > self.maximum
+        if self.between and (too_low or too_high):
+            raise ValueError(
+                f"{self.label} must be between {self.minimum:g} and {self.maximum:g}"
+            )
+        if too_low:
+            if self.minimum_inclusive and self.minimum == 0:
+                raise ValueError(f"{self.label} cannot be negative")
+            raise ValueError(f"{self.label} must be greater than {self.minimum:g}")
+        if too_high:
+            limit = self.maximum_text or f"{self.maximum:g}"
+            raise ValueError(f"{self.label} cannot exceed {limit}")
+        return number
+
+
+def _choices(table: str) -> tuple[str, ...]:
+    """Keys of the calculator constant named ``table``."""
+    return tuple(getattr(import_module("src.calculator.constants"), table))
+
+
+@dataclass(frozen=True)
+class ChoiceField:
+    label: str
+    table: str  # calculator constant whose keys are the choices
+
+    @property
+    def choices(self) -> tuple[str, ...]:
+        return _choices(self.table)
+
+    def parse(self, value) -> str:
+        text = str(value).strip()
+        choices = self.choices
+        if text not in choices:
+            raise ValueError(f"{self.label} must be one of {', '.join(choices)}")
+        return text
+
+
+@dataclass(frozen=True)
+class ChoicesField:
+    """Any number of choices, as a list or a ``;``-separated string."""
+
+    label: str
+    table: str
+
+    @property
+    def choices(self) -> tuple[str, ...]:
+        return _choices(self.table)
+
+    def parse(self, value) -> list[str]:
+        if isinstance(value, str):
+            value = value.split(";")
+        choices = self.choices
+        selected = []
+        for item in value:
+            item = str(item).strip()
+            if not item or item in selected:
+                continue
+            if item not in choices:
+                raise ValueError(f"{self.label} must be among {', '.join(choices)}")
+            selected.append(item)
+        return selected
+
+
+Field = TextField | NumberField | ChoiceField | ChoicesField
+
+_PROBABILITY = NumberField(
+    "Probability", minimum=0, minimum_inclusive=True, maximum=1, between=True
+)
+
+SCHEMA: dict[str, Field] = {
+    "item_name": TextField("Item name", max_length=100),
+    "price": NumberField("Price"),
+    "income_level": ChoiceField("Income level", "INCOME_WEIGHTS"),
+    "life_areas": ChoicesField("Life areas", "LIFE_AREA_WEIGHTS"),
+    "necessity": ChoiceField("Necessity", "NECESSITY_SCORES"),
+    "time_use": NumberField(
+        "Hours per week",
+        minimum_inclusive=True,
+        maximum=168,
+        maximum_text="168 (hours in a week)",
+    ),
+    "use_probability": ChoiceField("Use probability", "USE_PROBABILITY_VALUES"),
+    "life_span": NumberField(
+        "Life span", integer=True, maximum=600, maximum_text="600 months (50 years)"
+    ),
+    "category": ChoiceField("Category", "CATEGORY_MULTIPLIERS"),
+    "p_useful_if_buy": _PROBABILITY,
+    "p_useful_if_not_buy": _PROBABILITY,
+}
+
+PURCHASE_FIELDS = tuple(name for name in SCHEMA if not name.startswith("p_useful"))
+
+
+def validate(
+    raw: Mapping[str, object], fields: Iterable[str] = PURCHASE_FIELDS
+) -> tuple[dict, dict[str, str]]:
+    """Parse ``fields`` of ``raw``; returns the valid values and the errors.
+
+    Errors map each invalid field to its message, in the order of ``fields``.
+    A missing field is reported as required.
+    """
+    values = {}
+    errors = {}
+    for name in fields:
+        field = SCHEMA[name]
+        try:
+            values[name] = field.parse(raw.get(name, ""))
+        except ValueError as error:
+            errors[name] = str(error)
+    return values, errors
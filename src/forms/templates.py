@@ -0,0 +1,82 @@
+"""
+Saved scenario templates that pre-fill the form screens.
+
+Templates are purchases saved under a name in one JSON file, validated
+with the shared schema when saved and when loaded. Writes go to a
+temporary file that replaces the old one, so a crash never leaves a
+half-written file behind.
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from .schema import PURCHASE_FIELDS, validate
+
+TEMPLATES_PATH_ENV = "DGSUTILITYAGENCY_TEMPLATES"
+
+
+def default_templates_path() -> Path:
+    """Templates file location, overridable with DGSUTILITYAGENCY_TEMPLATES."""
+    path = os.environ.get(TEMPLATES_PATH_ENV)
+    if path:
+        return Path(path)
+    return Path.home() / ".dgsutilityagency" / "templates.json"
+
+
+class TemplateStore:
+    """Named purchases in a JSON file, sorted by name."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+
+    def load(self) -> dict[str, dict]:
+        """Every template by name; empty when the file does not exist."""
+        try:
+            text = self.path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return {}
+        try:
+            stored = json.loads(text)
+        except json.JSONDecodeError as error:
+            raise ValueError(f"{self.path}: {error}") from None
+        if not isinstance(stored, dict):
+            raise ValueError(f"{self.path}: expected an object of templates")
+        return {name: _parse(name, raw) for name, raw in stored.items()}
+
+    def save(self, name: str, purchase: dict) -> None:
+        """Add or replace the template ``name``."""
+        name = name.strip()
+        if not name:
+            raise ValueError("Template name is required")
+        templates = self.load()
+        templates[name] = _parse(name, purchase)
+        self._write(templates)
+
+    def delete(self, name: str) -> None:
+        templates = self.load()
+        if templates.pop(name, None) is not None:
+            self._write(templates)
+
+    def _write(self, templates: dict[str, dict]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(
+            dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(descriptor, "w", encoding="utf-8") as file:
+                json.dump(dict(sorted(templates.items())), file, indent=2)
+            os.replace(temporary, self.path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+
+def _parse(name: str, raw) -> dict:
+    if not isinstance(raw, dict):
+        raise ValueError(f"Template {name!r}: expected an object")
+    purchase, errors = validate(raw, PURCHASE_FIELDS)
+    if errors:
+        raise ValueError(f"Template {name!r}: {next(iter(errors.values()))}")
+    return purchase
@@ -0,0 +1,608 @@
+import json
+import math
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from textual.screen import Screen
+from textual.widgets import (
+    Button,
+    Checkbox,
+    DataTable,
+    Input,
+    RadioSet,
+    Select,
+    Static,
+)
+
+from src.application.DGUtiliyAgency import DGUtilityAgency
+from src.application.worker import CalculatorWorker
+from src.calculator import (
+    UsageEstimator,
+    calculate_breakeven_probability,
+    calculate_expected_utility_buy,
+    calculate_expected_utility_not_buy,
+    calculate_utilities,
+    explain_utilities,
+)
+from src.forms import SCREENS, load_screen
+from src.forms.bulk_edit import BulkRows
+from src.forms.chart import SweepChart
+from src.forms.schema import validate
+from src.forms.templates import TemplateStore
+from src.instrumentation import METRICS
+
+PURCHASE = {
+    "item_name": "Laptop",
+    "price": 1000,
+    "income_level": "medium",
+    "life_areas": ["career"],
+    "necessity": "essential",
+    "time_use": 20,
+    "use_probability": "medium",
+    "life_span": 36,
+    "category": "efficiency",
+}
+
+
+class TestScreenRegistry(unittest.TestCase):
+    def test_every_screen_loads(self):
+        """Test that each registered name resolves to its screen class."""
+        for name in SCREENS:
+            screen = load_screen(name)
+            self.assertTrue(issubclass(screen, Screen))
+            self.assertEqual(screen.__name__, SCREENS[name][1])
+
+    def test_unknown_screen(self):
+        """Test that an unregistered name is rejected."""
+        with self.assertRaises(KeyError):
+            load_screen("settings")
+
+
+# Holds a fresh directory for every app, removed when the tests exit
+_STATE = tempfile.TemporaryDirectory()
+
+
+def isolated_app(**options) -> DGUtilityAgency:
+    """App with in-memory history and its own empty usage and template files.
+
+    Nothing is read from ~/.dgsutilityagency or the DGSUTILITYAGENCY_*
+    variables, so a developer's own state cannot change the results.
+    """
+    directory = tempfile.mkdtemp(dir=_STATE.name)
+    options.setdefault("usage_path", os.path.join(directory, "usage.json"))
+    options.setdefault("templates_path", os.path.join(directory, "templates.json"))
+    return DGUtilityAgency(prefetch=False, history_path=":memory:", **options)
+
+
+def write_text(path: str, text: str) -> None:
+    """Write a fixture file without blocking calls in the async tests."""
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(text)
+
+
+async def open_results(pilot):
+    """Push a ResultsScreen for PURCHASE once its sensitivity is computed."""
+    app = pilot.app
+    app.purchase_data = PURCHASE
+    screen = load_screen("results")(PURCHASE)
+    await app.push_screen(screen)
+    await screen.workers.wait_for_complete()
+    await pilot.pause()
+    return screen
+
+
+class TestResultsScreen(unittest.IsolatedAsyncioTestCase):
+    async def test_typing_recomputes_once(self):
+        """Test that a burst of edits is recomputed once it settles."""
+        app = isolated_app()
+        async with app.run_test() as pilot:
+            screen = await open_results(pilot)
+            recommendation = screen.query_one("#recommendation", Static)
+            before = str(recommendation.render())
+            probability = screen.query_one("#p_useful_buy", Input)
+            probability.value = ""
+
+            with mock.patch.object(
+                screen,
+                "_update_expected_utilities",
+                wraps=screen._update_expected_utilities,
+            ) as update:
+                for typed in ("0", "0.", "0.9", "0.95"):
+                    probability.value = typed
+                await pilot.pause(screen.DEBOUNCE_DELAY * 3)
+                update.assert_called_once()
+
+            self.assertEqual(screen.p_useful_if_buy, 0.95)
+            self.assertNotEqual(str(recommendation.render()), before)
+
+    async def test_starts_from_default_probabilities(self):
+        """Test that the inputs and first results use the default probabilities."""
+        app = isolated_app()
+        async with app.run_test() as pilot:
+            screen = await open_results(pilot)
+            self.assertEqual(screen.query_one("#p_useful_buy", Input).value, "0.5")
+            self.assertEqual(screen.query_one("#p_useful_not_buy", Input).value, "0.1")
+            self.assertEqual(
+                (screen.p_useful_if_buy, screen.p_useful_if_not_buy), (0.5, 0.1)
+            )
+
+            results = calculate_utilities(PURCHASE)
+            eu_not_buy = calculate_expected_utility_not_buy(0.1, results)
+            shown = screen.query_one("#expected_utility_not_buy", Static)
+            self.assertTrue(
+                str(shown.render()).startswith(f"E[U(Don't Buy)]: {eu_not_buy:.2f}")
+            )
+            breakeven = calculate_breakeven_probability(results, 0.1)
+            self.assertEqual(
+                str(screen.query_one("#breakeven_analysis", Static).render()),
+                f"Breakeven: {breakeven:.1%}",
+            )
+
+    async def test_invalid_input_notifies_once(self):
+        """Test that only the settled invalid value raises a warning."""
+        app = isolated_app()
+        async with app.run_test() as pilot:
+            screen = await open_results(pilot)
+            probability = screen.query_one("#p_useful_buy", Input)
+            probability.value = ""
+
+            with mock.patch.object(app, "notify") as notify:
+                for typed in ("1", "12", "1x"):
+                    probability.value = typed
+                await pilot.pause(screen.DEBOUNCE_DELAY * 3)
+                notify.assert_called_once_with(
+                    "Probability must be a valid number", severity="warning"
+                )
+            self.assertEqual(screen.p_useful_if_buy, 0.5)
+
+    async def test_sensitivity_follows_probabilities(self):
+        """Test that the sensitivity panel shows where the decision flips."""
+        app = isolated_app()
+        async with app.run_test(size=(140, 50)) as pilot:
+            screen = await open_results(pilot)
+            report = screen.query_one("#sensitivity_report", Static)
+            breakeven = calculate_breakeven_probability(
+                calculate_utilities(PURCHASE), 0.1
+            )
+            self.assertIn(f"P(useful|buy) {breakeven:.1%}", str(report.render()))
+
+            screen.query_one("#p_useful_not_buy", Input).value = "0.5"
+            await pilot.pause(screen.DEBOUNCE_DELAY * 3)
+            breakeven = calculate_breakeven_probability(
+                calculate_utilities(PURCHASE), 0.5
+            )
+            self.assertIn(f"P(useful|buy) {breakeven:.1%}", str(report.render()))
+
+    async def test_leaving_records_decision(self):
+        """Test that the settled decision is saved and shown in the history."""
+        app = isolated_app()
+        async with app.run_test(size=(140, 50)) as pilot:
+            screen = await open_results(pilot)
+            screen.query_one("#p_useful_buy", Input).value = "0.9"
+            await pilot.pause()
+            # Leaving before the debounce fires still saves the typed value
+            app.pop_screen()
+            await pilot.pause()
+
+            (decision,) = app.history.page().decisions
+            self.assertEqual(decision["purchase_data"], PURCHASE)
+            self.assertEqual(decision["p_useful_if_buy"], 0.9)
+
+            await pilot.click("#history")
+            await pilot.pause()
+            table = app.screen.query_one(DataTable)
+            self.assertEqual(table.row_count, 1)
+            self.assertEqual(table.get_row_at(0)[1], "Laptop")
+
+    async def test_breakdown_computed_on_demand(self):
+        """Test that the breakdown is only traced once it is first shown."""
+        app = isolated_app()
+        async with app.run_test(size=(140, 80)) as pilot:
+            with mock.patch(
+                "src.forms.results.explain_utilities",
+                wraps=explain_utilities,
+            ) as explain:
+                screen = await open_results(pilot)
+                breakdown = screen.query_one("#breakdown")
+                self.assertFalse(breakdown.display)
+                explain.assert_not_called()
+
+                # A click during the pressed effect is ignored; skip the effect
+                screen.query_one("#explain", Button).active_effect_duration = 0
+                for shown in (True, False, True):
+                    await pilot.click("#explain")
+                    await pilot.pause()
+                    self.assertEqual(breakdown.display, shown)
+                explain.assert_called_once_with(PURCHASE)
+            report = str(screen.query_one("#breakdown_report", Static).render())
+            self.assertIn("life areas 1.3 (mean of career 1.3)", report)
+            self.assertIn("buy +2/-3", report)
+
+    async def test_starts_from_usage_estimate(self):
+        """Test that P(useful|buy) starts at the posterior of the segment."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "usage.json")
+            estimator = UsageEstimator()
+            estimator.observe("efficiency", ["career"], used=True, count=7)
+            estimator.observe("efficiency", ["career"], used=False, count=1)
+            estimator.save(path)
+
+            app = isolated_app(usage_path=path)
+            async with app.run_test(size=(140, 50)) as pilot:
+                screen = await open_results(pilot)
+                probability = screen.query_one("#p_useful_buy", Input)
+                self.assertEqual(probability.value, "0.80")
+                self.assertEqual(probability.border_subtitle, "8 usage events")
+                self.assertEqual(screen.p_useful_if_buy, 0.8)
+
+        # Without events the screen keeps its usual starting guess
+        missing = os.path.join(directory, "missing.json")
+        app = isolated_app(usage_path=missing)
+        async with app.run_test(size=(140, 50)) as pilot:
+            screen = await open_results(pilot)
+            self.assertEqual(screen.query_one("#p_useful_buy", Input).value, "0.5")
+
+    async def test_malformed_usage_is_reported_once(self):
+        """Test that an unreadable usage file is read and reported only once."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "usage.json")
+            write_text(path, '{"segments": 3}')
+
+            app = isolated_app(usage_path=path)
+            async with app.run_test(size=(140, 50)) as pilot:
+                with (
+                    mock.patch.object(app, "notify") as notify,
+                    mock.patch.object(
+                        UsageEstimator, "load", wraps=UsageEstimator.load
+                    ) as load,
+                ):
+                    for _ in range(2):
+                        screen = await open_results(pilot)
+                        self.assertEqual(
+                            screen.query_one("#p_useful_buy", Input).value, "0.5"
+                        )
+                        app.pop_screen()
+                        await pilot.pause()
+                    self.assertIsNone(app.usage)
+        load.assert_called_once_with(path)
+        notify.assert_called_once()
+        self.assertIn("Could not read usage estimates", notify.call_args.args[0])
+
+
+class TestSweepChart(unittest.IsolatedAsyncioTestCase):
+    async def test_marks_breakeven_and_probability(self):
+        """Test that the axis marks the breakeven and the typed P(useful|buy)."""
+        app = isolated_app()
+        async with app.run_test(size=(140, 60)) as pilot:
+            screen = await open_results(pilot)
+            chart = screen.query_one(SweepChart)
+            screen.query_one("#p_useful_not_buy", Input).value = "0.1"
+            await pilot.pause(screen.DEBOUNCE_DELAY * 3)
+
+            columns = chart.size.width - chart.GUTTER
+            axis = chart.render_line(chart.size.height - 1).text[chart.GUTTER :]
+            breakeven = calculate_breakeven_probability(
+                calculate_utilities(PURCHASE), 0.1
+            )
+            self.assertEqual(axis.index("◆"), chart._column(breakeven, columns))
+            self.assertEqual(axis.index("●"), chart._column(0.5, columns))
+            # The flat line crosses the sweep at the breakeven
+            row = chart._marks["not_buy_row"]
+            self.assertEqual(
+                chart.render_line(row).text[chart.GUTTER :].index("◆"),
+                axis.index("◆"),
+            )
+
+    async def test_change_redraws_only_touched_rows(self):
+        """Test that a probability change re-renders a few rows, not the chart."""
+        app = isolated_app()
+        async with app.run_test(size=(140, 60)) as pilot:
+            screen = await open_results(pilot)
+            chart = screen.query_one(SweepChart)
+            before = [chart.render_line(y) for y in range(chart.size.height)]
+            old_row = chart._marks["not_buy_row"]
+
+            with mock.patch.object(
+                chart, "_render_row", wraps=chart._render_row
+            ) as render_row:
+                screen.query_one("#p_useful_not_buy", Input).value = "0.9"
+                await pilot.pause(screen.DEBOUNCE_DELAY * 3)
+            rendered = {call.args[0] for call in render_row.call_args_list}
+            axis = chart.size.height - 1
+            new_row = chart._marks["not_buy_row"]
+            self.assertNotEqual(old_row, new_row)
+            self.assertEqual(
+                rendered, {old_row, new_row, chart._marks["current_row"], axis}
+            )
+            after = [chart.render_line(y) for y in range(chart.size.height)]
+            for y in set(range(chart.size.height)) - rendered:
+                self.assertIs(after[y], before[y])
+
+
+class TestRankingScreen(unittest.IsolatedAsyncioTestCase):
+    async def test_ranks_file_within_budget(self):
+        """Test that candidates from a file are ranked and the budget marked."""
+        candidates = [
+            {
+                **PURCHASE,
+                "item_name": f"Laptop {i}",
+                "price": 500 + 250 * i,
+                "income_level": "high",
+            }
+            for i in range(4)
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "candidates.jsonl")
+            write_text(path, "".join(json.dumps(c) + "\n" for c in candidates))
+
+            app = isolated_app()
+            async with app.run_test(size=(140, 50)) as pilot:
+                await pilot.click("#compare")
+                await pilot.pause()
+                screen = app.screen
+                screen.query_one("#ranking_path", Input).value = path
+                screen.query_one("#ranking_budget", Input).value = "1500"
+                await pilot.click("#rank")
+                await screen.workers.wait_for_complete()
+                await pilot.pause()
+
+                table = screen.query_one("#ranking_table", DataTable)
+                rows = [table.get_row_at(i) for i in range(table.row_count)]
+        eu_buy = {
+            c["item_name"]: calculate_expected_utility_buy(0.5, calculate_utilities(c))
+            for c in candidates
+        }
+        self.assertEqual(
+            [row[1] for row in rows], sorted(eu_buy, key=eu_buy.get, reverse=True)
+        )
+        self.assertEqual(
+            [row[3] for row in rows], [f"{eu_buy[row[1]]:.2f}" for row in rows]
+        )
+        # Every laptop gains; the two cheapest gain the most within 1500
+        self.assertEqual({row[1] for row in rows if row[-1]}, {"Laptop 0", "Laptop 1"})
+
+    async def test_reports_overflowing_life_span(self):
+        """Test that a life span too large for a float is reported, not raised."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "candidates.jsonl")
+            line = json.dumps(PURCHASE).replace('"life_span": 36', '"life_span": 1e400')
+            write_text(path, line + "\n")
+
+            app = isolated_app()
+            async with app.run_test(size=(140, 50)) as pilot:
+                await pilot.click("#compare")
+                await pilot.pause()
+                screen = app.screen
+                screen.query_one("#ranking_path", Input).value = path
+                with mock.patch.object(app, "notify") as notify:
+                    await pilot.click("#rank")
+                    await screen.workers.wait_for_complete()
+                    await pilot.pause()
+                table = screen.query_one("#ranking_table", DataTable)
+                self.assertEqual(table.row_count, 0)
+        notify.assert_called_once()
+        self.assertIn("Record 1: Life span", notify.call_args.args[0])
+
+
+class TestSchema(unittest.TestCase):
+    def test_messages_match_the_forms(self):
+        """Test that each field reports the message its screen showed."""
+        raw = {
+            "item_name": "  ",
+            "price": "0",
+            "income_level": "high",
+            "life_areas": "career;health",
+            "necessity": "essential",
+            "time_use": "169",
+            "use_probability": "low",
+            "life_span": "36.5",
+            "category": "luxury",
+            "p_useful_if_buy": "1x",
+            "p_useful_if_not_buy": "2",
+        }
+        values, errors = validate(raw, raw)
+        self.assertEqual(
+            errors,
+            {
+                "item_name": "Item name is required",
+                "price": "Price must be greater than 0",
+                "time_use": "Hours per week cannot exceed 168 (hours in a week)",
+                "life_span": "Life span must be a valid whole number",
+                "category": "Category must be one of entertainment, efficiency, qol",
+                "p_useful_if_buy": "Probability must be a valid number",
+                "p_useful_if_not_buy": "Probability must be between 0 and 1",
+            },
+        )
+        self.assertEqual(values["life_areas"], ["career", "health"])
+        self.assertEqual(
+            validate({"time_use": "-1"}, ["time_use"])[1],
+            {"time_use": "Hours per week cannot be negative"},
+        )
+        self.assertEqual(
+            validate({"price": "inf"}, ["price"])[1],
+            {"price": "Price must be a valid number"},
+        )
+        self.assertEqual(validate(PURCHASE), (PURCHASE, {}))
+
+
+class TestTemplates(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "templates.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_store_round_trip(self):
+        """Test that saved templates load back and invalid ones are refused."""
+        store = TemplateStore(self.path)
+        self.assertEqual(store.load(), {})
+        store.save("Laptop", {**PURCHASE, "price": "1000"})
+        self.assertEqual(store.load(), {"Laptop": PURCHASE})
+        with self.assertRaisesRegex(ValueError, "Price must be greater than 0"):
+            store.save("Free laptop", {**PURCHASE, "price": 0})
+        store.delete("Laptop")
+        self.assertEqual(store.load(), {})
+
+        with open(self.path, "w", encoding="utf-8") as file:
+            json.dump({"Broken": {**PURCHASE, "life_span": 700}}, file)
+        with self.assertRaisesRegex(ValueError, "Template 'Broken'"):
+            store.load()
+
+    async def test_template_fills_every_screen(self):
+        """Test that a chosen template pre-fills all three form screens."""
+        template = {**PURCHASE, "life_areas": ["career", "health"], "time_use": 7.5}
+        TemplateStore(self.path).save("Work laptop", template)
+        app = isolated_app(templates_path=self.path)
+        async with app.run_test(size=(140, 50)) as pilot:
+            await pilot.pause()
+            app.screen.query_one("#template", Select).value = "Work laptop"
+            await pilot.pause()
+            self.assertEqual(app.screen.query_one("#price", Input).value, "1000")
+            await pilot.click("#continue")
+            await pilot.pause()
+
+            screen = app.screen
+            self.assertTrue(screen.query_one("#health", Checkbox).value)
+            self.assertFalse(screen.query_one("#personal", Checkbox).value)
+            await pilot.click("#continue")
+            await pilot.pause()
+
+            screen = app.screen
+            self.assertEqual(screen.query_one("#hours_pr_week", Input).value, "7.5")
+            category = screen.query_one("#category", RadioSet)
+            self.assertEqual(category.pressed_button.id, "efficiency")
+            await pilot.click("#continue")
+            await pilot.pause()
+
+            self.assertIs(type(app.screen), load_screen("results"))
+            self.assertEqual(app.screen.purchase_data, template)
+
+
+class TestBulkEdit(unittest.IsolatedAsyncioTestCase):
+    def test_rows_match_scalar(self):
+        """Test that bulk rows score like the scalar calculator."""
+        rows = BulkRows([PURCHASE, {**PURCHASE, "price": 400, "p_useful_if_buy": 0.9}])
+        rows.set_cell(0, "income_level", "high")
+        scores = rows.score()
+        for index, (purchase, p_buy) in enumerate(
+            [
+                ({**PURCHASE, "income_level": "high"}, 0.5),
+                ({**PURCHASE, "price": 400}, 0.9),
+            ]
+        ):
+            results = calculate_utilities(purchase)
+            self.assertAlmostEqual(
+                scores["eu_buy"][index], calculate_expected_utility_buy(p_buy, results)
+            )
+            self.assertAlmostEqual(
+                scores["eu_not_buy"][index],
+                calculate_expected_utility_not_buy(0.1, results),
+            )
+
+        self.assertEqual(
+            rows.set_cell(1, "price", "-3"), "Price must be greater than 0"
+        )
+        self.assertTrue(math.isnan(rows.score()["gain"][1]))
+        rows.delete(0)
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows.errors, ["Price must be greater than 0"])
+
+    async def test_editing_a_cell_rescores_its_row(self):
+        """Test that a submitted cell edit updates the row's results."""
+        app = isolated_app()
+        async with app.run_test(size=(200, 50)) as pilot:
+            screen = load_screen("bulk_edit")([PURCHASE, PURCHASE])
+            await app.push_screen(screen)
+            await pilot.pause()
+            table = screen.query_one("#bulk_table", DataTable)
+            before = table.get_row_at(1)
+
+            table.move_cursor(row=1, column=1)
+            await pilot.press("enter")
+            await pilot.pause()
+            editor = screen.query_one("#bulk_cell", Input)
+            self.assertEqual(editor.value, "1000")
+            editor.value = "500"
+            await pilot.press("enter")
+            await pilot.pause()
+
+            after = table.get_row_at(1)
+            self.assertEqual(after[1], "500")
+            self.assertNotEqual(after[-4], before[-4])
+            self.assertEqual(table.get_row_at(0), before)
+
+            screen.edit_cell(0, "life_span", "0")
+            await pilot.pause()
+            self.assertEqual(
+                table.get_row_at(0)[-1], "Life span must be greater than 0"
+            )
+            await pilot.click("#save_all")
+            await pilot.pause()
+            (decision,) = app.history.page().decisions
+            self.assertEqual(decision["purchase_data"]["price"], 500)
+
+
+class TestDebugScreen(unittest.IsolatedAsyncioTestCase):
+    async def test_hidden_binding_shows_screen_spans(self):
+        """Test that F12 toggles the debug screen listing transition spans."""
+        METRICS.reset()
+        self.addCleanup(METRICS.reset)
+        with mock.patch.object(METRICS, "enabled", True):
+            app = isolated_app()
+            async with app.run_test(size=(140, 50)) as pilot:
+                await pilot.click("#compare")
+                await pilot.pause()
+                await pilot.press("f12")
+                await pilot.pause()
+                screen = app.screen
+                self.assertIs(type(screen), load_screen("debug"))
+                table = screen.query_one("#debug_spans", DataTable)
+                spans = {table.get_row_at(i)[0] for i in range(table.row_count)}
+
+                await pilot.press("f12")
+                await pilot.pause()
+                self.assertIs(type(app.screen), load_screen("ranking"))
+
+        self.assertIn("screen.push.WelcomeScreen", spans)
+        self.assertIn("screen.push.RankingScreen", spans)
+        self.assertIn("screen.pop.DebugScreen", METRICS.snapshot()["spans"])
+
+
+class TestSessions(unittest.IsolatedAsyncioTestCase):
+    async def test_sessions_keep_their_own_purchase(self):
+        """Test that apps in one process share the worker but not their state."""
+        first = isolated_app()
+        second = isolated_app()
+        first.purchase_data["item_name"] = "Laptop"
+        self.assertEqual(second.purchase_data, {})
+        self.assertIs(first.calculator, second.calculator)
+
+        async with first.run_test(size=(140, 50)) as pilot:
+            await pilot.pause()
+            first.screen.query_one("#item_name", Input).value = "Desk"
+            first.screen.query_one("#price", Input).value = "300"
+            await pilot.click("#continue")
+            await pilot.pause()
+        self.assertEqual(first.purchase_data["item_name"], "Desk")
+        self.assertEqual(second.purchase_data, {})
+
+    async def test_sensitivity_runs_on_the_calculator_worker(self):
+        """Test that the results screen computes its scenarios off the loop."""
+        worker = CalculatorWorker(max_workers=1)
+        self.addCleanup(worker.shutdown)
+        app = isolated_app(calculator=worker)
+        async with app.run_test(size=(140, 50)) as pilot:
+            with mock.patch.object(worker, "run", wraps=worker.run) as run:
+                screen = await open_results(pilot)
+            ((function, purchase), _) = run.call_args
+            self.assertEqual(function.__name__, "sensitivity_scenarios")
+            self.assertIs(purchase, PURCHASE)
+            report = str(screen.query_one("#sensitivity_report", Static).render())
+            self.assertIn("Flips at", report)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,7 +3,8 @@ from textual.containers import Container, Horizontal, Vertical
 from textual.screen import Screen
 from textual.widgets import Button, Input, RadioButton, RadioSet, Static
 
-from src.forms.results import ResultsScreen
+from src.forms import load_screen
+from src.forms.schema import validate
 
 
 class TimeAndCategoryScreen(Screen):
@@ -21,6 +22,21 @@ class TimeAndCategoryScreen(Screen):
         )
         self.query_one("#life_span", Input).border_title = "Life span (months)"
         self.query_one("#category", RadioSet).border_title = "Benefit Category"
+        self._prefill(self.app.purchase_data)
+
+    def _prefill(self, purchase_data: dict) -> None:
+        """Show values from a template or an earlier pass through the form."""
+        if "time_use" in purchase_data:
+            hours = self.query_one("#hours_pr_week", Input)
+            hours.value = f"{purchase_data['time_use']:g}"
+        if "life_span" in purchase_data:
+            life_span = self.query_one("#life_span", Input)
+            life_span.value = str(purchase_data["life_span"])
+        for field in ("use_probability", "category"):
+            if field in purchase_data:
+                radio_set = self.query_one(f"#{field}", RadioSet)
+                button = radio_set.query_one(f"#{purchase_data[field]}", RadioButton)
+                button.value = True
 
     def compose(self) -> ComposeResult:
 
@@ -53,53 +69,22 @@ class TimeAndCategoryScreen(Screen):
 
     def on_button_pressed(self, event: Button.Pressed) -> None:
         if event.button.id == "continue":
-            time_use = self.query_one("#hours_pr_week", Input).value
-            use_probability_radio = self.query_one("#use_probability", RadioSet)
-            use_probability = use_probability_radio.pressed_button.id
-            life_span = self.query_one("#life_span", Input).value
-
-            category_radio = self.query_one("#category", RadioSet)
-            category = category_radio.pressed_button.id
-
-            # Validate hours per week
-            if not time_use or len(time_use.strip()) == 0:
-                self.app.notify("Hours per week is required", severity="error")
+            use_probability = self.query_one("#use_probability", RadioSet)
+            category = self.query_one("#category", RadioSet)
+            raw = {
+                "time_use": self.query_one("#hours_pr_week", Input).value,
+                "use_probability": use_probability.pressed_button.id,
+                "life_span": self.query_one("#life_span", Input).value,
+                "category": category.pressed_button.id,
+            }
+            values, errors = validate(raw, raw)
+            if errors:
+                self.app.notify(next(iter(errors.values())), severity="error")
                 return
-            try:
-                time_use_value = float(time_use)
-                if time_use_value < 0:
-                    self.app.notify("Hours per week cannot be negative", severity="error")
-                    return
-                if time_use_value > 168:
-                    self.app.notify("Hours per week cannot exceed 168 (hours in a week)", severity="error")
-                    return
-            except ValueError:
-                self.app.notify("Hours per week must be a valid number", severity="error")
-                return
-
-            # Validate life span
-            if not life_span or len(life_span.strip()) == 0:
-                self.app.notify("Life span is required", severity="error")
-                return
-            try:
-                life_span_value = int(life_span)
-                if life_span_value <= 0:
-                    self.app.notify("Life span must be greater than 0", severity="error")
-                    return
-                if life_span_value > 600:
-                    self.app.notify("Life span cannot exceed 600 months (50 years)", severity="error")
-                    return
-            except ValueError:
-                self.app.notify("Life span must be a valid whole number", severity="error")
-                return
-
-            self.app.purchase_data["time_use"] = time_use_value
-            self.app.purchase_data["use_probability"] = use_probability
-            self.app.purchase_data["life_span"] = life_span_value
-            self.app.purchase_data["category"] = category
+            self.app.purchase_data.update(values)
 
             # Navigate to results screen
-            self.app.push_screen(ResultsScreen(self.app.purchase_data))
+            self.app.push_screen(load_screen("results")(self.app.purchase_data))
 
         elif event.button.id == "back":
             self.app.pop_screen()
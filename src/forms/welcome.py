@@ -1,20 +1,47 @@
 from textual.app import ComposeResult
 from textual.containers import Container, Horizontal
 from textual.screen import Screen
-from textual.widgets import Button, Input, RadioButton, RadioSet, Static
+from textual.widgets import Button, Input, RadioButton, RadioSet, Select, Static
 
-from src.forms.life_areas import LifeAreasScreen
+from src.forms import load_screen
+from src.forms.schema import validate
 
 
 class WelcomeScreen(Screen):
+    def __init__(self):
+        super().__init__()
+        self._templates: dict[str, dict] = {}
+
     def on_mount(self) -> None:
         """Set border title when screen is mounted"""
         self.query_one("#welcome-panel", Container).border_title = (
             "Welcome to DGs Utility Agency"
         )
+        self.query_one("#template", Select).border_title = "Template"
         self.query_one("#item_name", Input).border_title = "Item name"
         self.query_one("#price", Input).border_title = "Price (dollars)"
         self.query_one("#income_level", RadioSet).border_title = "Income Level"
+        self._load_templates()
+
+    def _load_templates(self) -> None:
+        try:
+            self._templates = self.app.templates.load()
+        except (OSError, ValueError) as error:
+            self.app.notify(f"Could not load templates: {error}", severity="error")
+            return
+        self.query_one("#template", Select).set_options(
+            (name, name) for name in self._templates
+        )
+
+    def on_select_changed(self, event: Select.Changed) -> None:
+        """Pre-fill this screen from the chosen template."""
+        template = self._templates.get(event.value)
+        if template is None:
+            return
+        self.query_one("#item_name", Input).value = template["item_name"]
+        self.query_one("#price", Input).value = f"{template['price']:g}"
+        income_level = self.query_one("#income_level", RadioSet)
+        income_level.query_one(f"#{template['income_level']}", RadioButton).value = True
 
     def compose(self) -> ComposeResult:
         with Container(classes="panel", id="welcome-panel"):
@@ -24,6 +51,7 @@ class WelcomeScreen(Screen):
                 id="welcome-text",
             )
 
+            yield Select([], prompt="No template", id="template")
             yield Input(placeholder="e.g., Laptop", id="item_name")
             yield Input(placeholder="e.g., 1200", id="price", type="number")
 
@@ -33,44 +61,35 @@ class WelcomeScreen(Screen):
                 yield RadioButton("High", id="high")
 
             with Horizontal(id="button-group"):
+                yield Button("History", variant="default", id="history")
+                yield Button("Compare", variant="default", id="compare")
+                yield Button("Bulk Edit", variant="default", id="bulk_edit")
                 yield Button("Continue →", variant="primary", id="continue")
 
     def on_button_pressed(self, event: Button.Pressed) -> None:
-        """Handle continue button"""
-        if event.button.id == "continue":
+        """Handle continue, history, compare and bulk edit buttons"""
+        if event.button.id == "history":
+            self.app.push_screen(load_screen("history")())
+        elif event.button.id == "compare":
+            self.app.push_screen(load_screen("ranking")())
+        elif event.button.id == "bulk_edit":
+            self.app.push_screen(load_screen("bulk_edit")())
+        elif event.button.id == "continue":
             # Collect data from this screen
-            item_name = self.query_one("#item_name", Input).value
-            price = self.query_one("#price", Input).value
             income_radio = self.query_one("#income_level", RadioSet)
-            income_level = income_radio.pressed_button.id
-
-            # Validate item name
-            if not item_name or len(item_name.strip()) == 0:
-                self.app.notify("Item name is required", severity="error")
-                return
-            if len(item_name) > 100:
-                self.app.notify("Item name must be 100 characters or less", severity="error")
-                return
-
-            # Validate price
-            if not price or len(price.strip()) == 0:
-                self.app.notify("Price is required", severity="error")
-                return
-            try:
-                price_value = float(price)
-                if price_value <= 0:
-                    self.app.notify("Price must be greater than 0", severity="error")
-                    return
-            except ValueError:
-                self.app.notify("Price must be a valid number", severity="error")
+            raw = {
+                "item_name": self.query_one("#item_name", Input).value,
+                "price": self.query_one("#price", Input).value,
+                "income_level": income_radio.pressed_button.id,
+            }
+            values, errors = validate(raw, raw)
+            if errors:
+                self.app.notify(next(iter(errors.values())), severity="error")
                 return
 
-            # Store in app's data
-            self.app.purchase_data = {
-                "item_name": item_name.strip(),
-                "price": price_value,
-                "income_level": income_level,
-            }
+            # Store in app's data; a chosen template fills the later screens
+            template = self._templates.get(self.query_one("#template", Select).value)
+            self.app.purchase_data = {**(template or {}), **values}
 
             # Go to next screen
-            self.app.push_screen(LifeAreasScreen())
+            self.app.push_screen(load_screen("life_areas")())
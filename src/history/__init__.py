@@ -0,0 +1,19 @@
+"""
+Persistent history of purchase decisions.
+"""
+
+from .store import (
+    Cursor,
+    Decision,
+    DecisionStore,
+    Page,
+    default_history_path,
+)
+
+__all__ = [
+    "Cursor",
+    "Decision",
+    "DecisionStore",
+    "Page",
+    "default_history_path",
+]
@@ -0,0 +1,270 @@
+"""
+Append-only SQLite store of past purchase decisions.
+
+Each row holds the PurchaseData, its UtilityMetrics and the probabilities
+the user settled on. The database runs in WAL mode, rows cannot be updated
+or deleted, and queries page through results with a keyset cursor on
+(created_at, id) so every page costs the same however deep it is.
+"""
+
+import os
+import sqlite3
+import time
+from collections.abc import Iterable
+from pathlib import Path
+from typing import NamedTuple, Self, TypedDict
+
+from src.calculator import summarize_decision
+from src.calculator.utility_calculator import PurchaseData, UtilityMetrics
+
+DEFAULT_PAGE_SIZE = 50
+
+# Environment variable overriding the default database location
+HISTORY_PATH_ENV = "DGSUTILITYAGENCY_HISTORY"
+
+# Separator for the life_areas column, as in the CSV scoring input
+LIFE_AREAS_SEPARATOR = ";"
+
+# Columns that can be filtered on; each has an index ordered by time
+FILTERS = ("item_name", "category", "income_level")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS decisions (
+    id INTEGER PRIMARY KEY,
+    created_at REAL NOT NULL,
+    item_name TEXT NOT NULL COLLATE NOCASE,
+    price REAL NOT NULL,
+    income_level TEXT NOT NULL,
+    life_areas TEXT NOT NULL,
+    necessity TEXT NOT NULL,
+    time_use REAL NOT NULL,
+    use_probability TEXT NOT NULL,
+    life_span INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    use_factor REAL NOT NULL,
+    u_buy_useful REAL NOT NULL,
+    u_buy_not_useful REAL NOT NULL,
+    u_not_buy_useful REAL NOT NULL,
+    u_not_buy_not_useful REAL NOT NULL,
+    p_useful_if_buy REAL NOT NULL,
+    p_useful_if_not_buy REAL NOT NULL,
+    eu_buy REAL NOT NULL,
+    eu_not_buy REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS decisions_created_at ON decisions (created_at, id);
+CREATE INDEX IF NOT EXISTS decisions_item_name ON decisions (item_name, created_at, id);
+CREATE INDEX IF NOT EXISTS decisions_category ON decisions (category, created_at, id);
+CREATE INDEX IF NOT EXISTS decisions_income_level
+    ON decisions (income_level, created_at, id);
+CREATE TRIGGER IF NOT EXISTS decisions_no_update BEFORE UPDATE ON decisions
+BEGIN
+    SELECT RAISE(ABORT, 'decision history is append-only');
+END;
+CREATE TRIGGER IF NOT EXISTS decisions_no_delete BEFORE DELETE ON decisions
+BEGIN
+    SELECT RAISE(ABORT, 'decision history is append-only');
+END;
+"""
+
+_PURCHASE_COLUMNS = (
+    "item_name",
+    "price",
+    "income_level",
+    "life_areas",
+    "necessity",
+    "time_use",
+    "use_probability",
+    "life_span",
+    "category",
+)
+_UTILITY_COLUMNS = (
+    "use_factor",
+    "u_buy_useful",
+    "u_buy_not_useful",
+    "u_not_buy_useful",
+    "u_not_buy_not_useful",
+)
+_COLUMNS = (
+    ("created_at",)
+    + _PURCHASE_COLUMNS
+    + _UTILITY_COLUMNS
+    + ("p_useful_if_buy", "p_useful_if_not_buy", "eu_buy", "eu_not_buy")
+)
+_INSERT = (
+    f"INSERT INTO decisions ({', '.join(_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(_COLUMNS))})"
+)
+
+
+class Decision(TypedDict):
+    """One stored decision."""
+
+    id: int
+    created_at: float  # Unix time
+    purchase_data: PurchaseData
+    results: UtilityMetrics
+    p_useful_if_buy: float
+    p_useful_if_not_buy: float
+    eu_buy: float
+    eu_not_buy: float
+
+
+class Cursor(NamedTuple):
+    """Position after the last row of a page."""
+
+    created_at: float
+    id: int
+
+
+class Page(NamedTuple):
+    decisions: list[Decision]
+    next: Cursor | None  # None on the last page
+
+
+def default_history_path() -> Path:
+    """Database location, overridable with DGSUTILITYAGENCY_HISTORY."""
+    path = os.environ.get(HISTORY_PATH_ENV)
+    if path:
+        return Path(path)
+    return Path.home() / ".dgsutilityagency" / "history.sqlite3"
+
+
+class DecisionStore:
+    """Durable, append-only decision history."""
+
+    def __init__(self, path: str | Path = ":memory:"):
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._connection = sqlite3.connect(path)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        # WAL keeps committed rows durable across crashes with NORMAL sync
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def record(
+        self,
+        purchase_data: PurchaseData,
+        results: UtilityMetrics,
+        p_useful_if_buy: float,
+        p_useful_if_not_buy: float,
+        created_at: float | None = None,
+    ) -> int:
+        """Append one decision and return its id."""
+        with self._connection:
+            cursor = self._connection.execute(
+                _INSERT,
+                _row(
+                    purchase_data,
+                    results,
+                    p_useful_if_buy,
+                    p_useful_if_not_buy,
+                    time.time() if created_at is None else created_at,
+                ),
+            )
+        return cursor.lastrowid
+
+    def record_many(
+        self,
+        decisions: Iterable[tuple[PurchaseData, UtilityMetrics, float, float, float]],
+    ) -> None:
+        """Append ``(purchase_data, results, p_buy, p_not_buy, created_at)``
+        tuples in a single transaction."""
+        with self._connection:
+            self._connection.executemany(
+                _INSERT, (_row(*decision) for decision in decisions)
+            )
+
+    def page(
+        self,
+        after: Cursor | None = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        **filters: str,
+    ) -> Page:
+        """Newest-first page of decisions, starting after ``after``.
+
+        ``filters`` match FILTERS columns exactly; item names ignore case.
+        """
+        unknown = set(filters) - set(FILTERS)
+        if unknown:
+            raise ValueError(f"Cannot filter on {', '.join(sorted(unknown))}")
+        if limit < 1:
+            raise ValueError("Page size must be at least 1")
+
+        conditions = [f"{column} = ?" for column in filters]
+        parameters: list = list(filters.values())
+        if after is not None:
+            conditions.append("(created_at, id) < (?, ?)")
+            parameters.extend(after)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = self._connection.execute(
+            f"SELECT id, {', '.join(_COLUMNS)} FROM decisions {where} "
+            "ORDER BY created_at DESC, id DESC LIMIT ?",
+            (*parameters, limit + 1),
+        ).fetchall()
+
+        decisions = [_decision(row) for row in rows[:limit]]
+        last = decisions[-1] if decisions and len(rows) > limit else None
+        return Page(
+            decisions, None if last is None else Cursor(last["created_at"], last["id"])
+        )
+
+    def count(self) -> int:
+        return self._connection.execute("SELECT count(*) FROM decisions").fetchone()[0]
+
+
+def _row(
+    purchase_data: PurchaseData,
+    results: UtilityMetrics,
+    p_useful_if_buy: float,
+    p_useful_if_not_buy: float,
+    created_at: float,
+) -> tuple:
+    summary = summarize_decision(results, p_useful_if_buy, p_useful_if_not_buy)
+    purchase = [purchase_data[name] for name in _PURCHASE_COLUMNS]
+    purchase[_PURCHASE_COLUMNS.index("life_areas")] = LIFE_AREAS_SEPARATOR.join(
+        purchase_data["life_areas"]
+    )
+    return (
+        created_at,
+        *purchase,
+        *(results[name] for name in _UTILITY_COLUMNS),
+        p_useful_if_buy,
+        p_useful_if_not_buy,
+        summary["eu_buy"],
+        summary["eu_not_buy"],
+    )
+
+
+def _decision(row: tuple) -> Decision:
+    decision_id, created_at, *values = row
+    purchase = dict(zip(_PURCHASE_COLUMNS, values))
+    purchase["life_areas"] = (
+        purchase["life_areas"].split(LIFE_AREAS_SEPARATOR)
+        if purchase["life_areas"]
+        else []
+    )
+    values = values[len(_PURCHASE_COLUMNS) :]
+    results = dict(zip(_UTILITY_COLUMNS, values))
+    p_useful_if_buy, p_useful_if_not_buy, eu_buy, eu_not_buy = values[
+        len(_UTILITY_COLUMNS) :
+    ]
+    return {
+        "id": decision_id,
+        "created_at": created_at,
+        "purchase_data": purchase,
+        "results": results,
+        "p_useful_if_buy": p_useful_if_buy,
+        "p_useful_if_not_buy": p_useful_if_not_buy,
+        "eu_buy": eu_buy,
+        "eu_not_buy": eu_not_buy,
+    }
@@ -0,0 +1,100 @@
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.calculator import calculate_utilities
+from src.history import DecisionStore
+
+PURCHASE = {
+    "item_name": "Laptop",
+    "price": 1000,
+    "income_level": "medium",
+    "life_areas": ["career", "personal"],
+    "necessity": "essential",
+    "time_use": 20,
+    "use_probability": "medium",
+    "life_span": 36,
+    "category": "efficiency",
+}
+
+
+def _decisions(count):
+    for i in range(count):
+        purchase = dict(
+            PURCHASE,
+            item_name=f"Item {i % 3}",
+            category=("efficiency", "health")[i % 2],
+        )
+        yield purchase, calculate_utilities(purchase), 0.5, 0.1, float(i)
+
+
+class TestDecisionStore(unittest.TestCase):
+    def test_round_trip(self):
+        """Test that a recorded decision reads back unchanged."""
+        with DecisionStore() as store:
+            results = calculate_utilities(PURCHASE)
+            decision_id = store.record(PURCHASE, results, 0.8, 0.2, created_at=1.0)
+
+            (decision,) = store.page().decisions
+            self.assertEqual(decision["id"], decision_id)
+            self.assertEqual(decision["purchase_data"], PURCHASE)
+            self.assertEqual(decision["results"], results)
+            self.assertEqual(decision["p_useful_if_buy"], 0.8)
+            self.assertEqual(decision["p_useful_if_not_buy"], 0.2)
+            self.assertGreater(decision["eu_buy"], decision["eu_not_buy"])
+
+    def test_keyset_paging_and_filters(self):
+        """Test that pages are newest first, disjoint and filterable."""
+        with DecisionStore() as store:
+            store.record_many(_decisions(25))
+
+            seen = []
+            page = store.page(limit=10)
+            while True:
+                seen.extend(decision["created_at"] for decision in page.decisions)
+                if page.next is None:
+                    break
+                page = store.page(after=page.next, limit=10)
+            self.assertEqual(seen, [float(i) for i in reversed(range(25))])
+
+            page = store.page(item_name="item 1", category="health", limit=100)
+            self.assertEqual(
+                [decision["created_at"] for decision in page.decisions],
+                [float(i) for i in reversed(range(25)) if i % 3 == 1 and i % 2 == 1],
+            )
+            self.assertIsNone(page.next)
+
+            with self.assertRaises(ValueError):
+                store.page(price="1000")
+
+    def test_append_only_and_durable(self):
+        """Test that rows survive reopening and cannot be changed."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "history.sqlite3"
+            with DecisionStore(path) as store:
+                store.record_many(_decisions(3))
+                with self.assertRaises(sqlite3.IntegrityError):
+                    store._connection.execute("DELETE FROM decisions")
+
+            with DecisionStore(path) as store:
+                self.assertEqual(store.count(), 3)
+                mode = store._connection.execute("PRAGMA journal_mode").fetchone()
+                self.assertEqual(mode[0], "wal")
+
+    def test_queries_use_indexes(self):
+        """Test that filtered pages are served from an index, not a scan."""
+        with DecisionStore() as store:
+            for column in ("item_name", "category", "income_level"):
+                plan = store._connection.execute(
+                    "EXPLAIN QUERY PLAN SELECT id FROM decisions "
+                    f"WHERE {column} = ? ORDER BY created_at DESC, id DESC LIMIT 10",
+                    ("x",),
+                ).fetchall()
+                detail = " ".join(row[-1] for row in plan)
+                self.assertIn(f"decisions_{column}", detail)
+                self.assertNotIn("TEMP B-TREE", detail)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,17 @@
+"""
+Histograms, timing spans and counters shared by the calculator, the TUI
+and the scoring service.
+"""
+
+from .histogram import Histogram, HistogramSnapshot
+from .metrics import METRICS, Metrics, MetricsSnapshot, enable, timed
+
+__all__ = [
+    "METRICS",
+    "Histogram",
+    "HistogramSnapshot",
+    "Metrics",
+    "MetricsSnapshot",
+    "enable",
+    "timed",
+]
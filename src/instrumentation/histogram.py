@@ -0,0 +1,70 @@
+"""
+Fixed-bucket histograms for latencies and batch sizes.
+
+Observations are counted per bucket, so recording takes O(log buckets)
+time in constant memory. Quantiles are estimated by linear interpolation
+inside the bucket that holds them.
+"""
+
+import bisect
+from typing import TypedDict
+
+# Upper bounds in milliseconds
+LATENCY_BUCKETS_MS = (
+    0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000,
+)  # fmt: skip
+
+# Upper bounds in records
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+
+
+class HistogramSnapshot(TypedDict):
+    count: int
+    sum: float
+    buckets: dict[str, int]  # upper bound -> count, ending with "+Inf"
+    p50: float
+    p90: float
+    p99: float
+
+
+class Histogram:
+    """Counts of observations per bucket."""
+
+    def __init__(self, bounds: tuple[float, ...] = LATENCY_BUCKETS_MS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Estimate the ``q`` quantile, or 0 with no observations."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.bounds[index - 1] if index else 0.0
+                # The overflow bucket has no upper bound; report its lower one
+                if index == len(self.bounds):
+                    return lower
+                return lower + (self.bounds[index] - lower) * (rank - seen) / count
+            seen += count
+        return self.bounds[-1]
+
+    def snapshot(self) -> HistogramSnapshot:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "buckets": dict(
+                zip([f"{bound:g}" for bound in self.bounds] + ["+Inf"], self.counts)
+            ),
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+        }
@@ -0,0 +1,175 @@
+"""
+Timing spans and counters for the calculator and the TUI.
+
+Instrumentation is off unless it is enabled before the instrumented
+modules are imported, with ``main.py --metrics``, the DGSUA_METRICS
+environment variable or enable(). While it is off, ``@timed`` returns the
+function it decorates unchanged and span() returns a shared no-op context,
+so the calculator pays nothing for it.
+
+Spans are recorded into per-name histograms in milliseconds and exported
+as Prometheus text or JSON.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from collections.abc import Callable
+from contextlib import AbstractContextManager, nullcontext
+from typing import TypedDict, TypeVar
+
+from .histogram import Histogram, HistogramSnapshot
+
+ENV_VAR = "DGSUA_METRICS"
+PROMETHEUS_PREFIX = "dgsua"
+
+# Upper bounds in milliseconds, from a scalar calculation to a screen paint
+SPAN_BUCKETS_MS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000,
+)  # fmt: skip
+
+EXPORT_FORMATS = ("prometheus", "json")
+
+F = TypeVar("F", bound=Callable)
+
+_NO_SPAN = nullcontext()
+
+
+class MetricsSnapshot(TypedDict):
+    enabled: bool
+    counters: dict[str, int]
+    spans: dict[str, HistogramSnapshot]
+
+
+class Metrics:
+    """Thread-safe registry of counters and span histograms."""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._counters: dict[str, int] = {}
+        self._spans: dict[str, Histogram] = {}
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def observe(self, name: str, milliseconds: float) -> None:
+        with self._lock:
+            histogram = self._spans.get(name)
+            if histogram is None:
+                histogram = self._spans[name] = Histogram(SPAN_BUCKETS_MS)
+            histogram.observe(milliseconds)
+
+    def span(self, name: str) -> AbstractContextManager:
+        """Context manager timing its body as ``name``; a no-op while disabled."""
+        if not self.enabled:
+            return _NO_SPAN
+        return _Span(self, name)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._spans.clear()
+
+    def snapshot(self) -> MetricsSnapshot:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "counters": dict(sorted(self._counters.items())),
+                "spans": {
+                    name: self._spans[name].snapshot() for name in sorted(self._spans)
+                },
+            }
+
+    def export(self, export_format: str = "prometheus") -> str:
+        """The current values as Prometheus text exposition format or JSON."""
+        if export_format == "json":
+            return json.dumps(self.snapshot(), indent=2)
+        if export_format != "prometheus":
+            raise ValueError(f"Unsupported format: {export_format!r}")
+        return _prometheus(self.snapshot())
+
+
+class _Span:
+    __slots__ = ("_metrics", "_name", "_started")
+
+    def __init__(self, metrics: Metrics, name: str):
+        self._metrics = metrics
+        self._name = name
+
+    def __enter__(self) -> None:
+        self._started = time.perf_counter()
+
+    def __exit__(self, error_type, error, traceback) -> None:
+        self._metrics.observe(self._name, (time.perf_counter() - self._started) * 1000)
+        if error_type is not None:
+            self._metrics.increment(f"{self._name}.errors")
+
+
+METRICS = Metrics(enabled=os.environ.get(ENV_VAR, "") not in ("", "0"))
+
+
+def enable() -> None:
+    """Turn instrumentation on; call before importing the instrumented modules."""
+    METRICS.enabled = True
+
+
+def timed(name: str) -> Callable[[F], F]:
+    """Decorator recording every call of the function as span ``name``.
+
+    Returns the function itself when instrumentation is disabled at
+    decoration time.
+    """
+
+    def decorate(function: F) -> F:
+        if not METRICS.enabled:
+            return function
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not METRICS.enabled:
+                return function(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            except BaseException:
+                METRICS.increment(f"{name}.errors")
+                raise
+            finally:
+                METRICS.observe(name, (time.perf_counter() - started) * 1000)
+
+        return wrapper
+
+    return decorate
+
+
+def _prometheus(snapshot: MetricsSnapshot) -> str:
+    counters = f"{PROMETHEUS_PREFIX}_events_total"
+    spans = f"{PROMETHEUS_PREFIX}_span_duration_milliseconds"
+    lines = [
+        f"# HELP {counters} Events counted by the application.",
+        f"# TYPE {counters} counter",
+    ]
+    for name, value in snapshot["counters"].items():
+        lines.append(f'{counters}{{event="{_label(name)}"}} {value}')
+    lines += [
+        f"# HELP {spans} Duration of instrumented calls and screen transitions.",
+        f"# TYPE {spans} histogram",
+    ]
+    for name, histogram in snapshot["spans"].items():
+        label = f'span="{_label(name)}"'
+        cumulative = 0
+        for bound, count in histogram["buckets"].items():
+            cumulative += count
+            lines.append(f'{spans}_bucket{{{label},le="{bound}"}} {cumulative}')
+        lines.append(f"{spans}_sum{{{label}}} {histogram['sum']!r}")
+        lines.append(f"{spans}_count{{{label}}} {histogram['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,130 @@
+"""
+Unit tests for histograms and instrumentation.
+
+Run with: python -m unittest src.instrumentation.test
+"""
+
+import json
+import os
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from . import metrics
+from .histogram import Histogram
+from .metrics import Metrics, timed
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+class TestHistogram(unittest.TestCase):
+    def test_quantiles(self):
+        """Test that quantile estimates fall inside the observed buckets."""
+        histogram = Histogram((1, 2, 4, 8))
+        for value in (0.5, 1.5, 1.5, 3, 3, 3, 3, 6, 6, 100):
+            histogram.observe(value)
+        self.assertEqual(histogram.counts, [1, 2, 4, 2, 1])
+        self.assertTrue(2 <= histogram.quantile(0.5) <= 4)
+        self.assertEqual(histogram.quantile(1.0), 8)
+        self.assertEqual(Histogram().quantile(0.5), 0.0)
+
+
+class TestMetrics(unittest.TestCase):
+    """Test cases for spans, counters and their export."""
+
+    def test_disabled_span_records_nothing(self):
+        """Test that a disabled registry hands out the shared no-op span."""
+        registry = Metrics()
+        self.assertIs(registry.span("a"), registry.span("b"))
+        with registry.span("a"):
+            pass
+        self.assertEqual(registry.snapshot()["spans"], {})
+
+    def test_span_records_duration_and_errors(self):
+        """Test that spans are observed and failing ones counted."""
+        registry = Metrics(enabled=True)
+        with registry.span("work"):
+            pass
+        with self.assertRaises(KeyError), registry.span("work"):
+            raise KeyError
+        snapshot = registry.snapshot()
+        self.assertEqual(snapshot["spans"]["work"]["count"], 2)
+        self.assertEqual(snapshot["counters"], {"work.errors": 1})
+
+        registry.reset()
+        self.assertEqual(registry.snapshot()["spans"], {})
+
+    def test_prometheus_export(self):
+        """Test cumulative buckets, sum and count in the text format."""
+        registry = Metrics(enabled=True)
+        for milliseconds in (0.002, 0.002, 3, 2000):
+            registry.observe('screen "a"', milliseconds)
+        registry.increment("screen.errors", 2)
+        text = registry.export("prometheus")
+        name = "dgsua_span_duration_milliseconds"
+        label = 'span="screen \\"a\\""'
+        self.assertIn(f'{name}_bucket{{{label},le="0.0025"}} 2', text)
+        self.assertIn(f'{name}_bucket{{{label},le="5"}} 3', text)
+        self.assertIn(f'{name}_bucket{{{label},le="+Inf"}} 4', text)
+        self.assertIn(f"{name}_count{{{label}}} 4", text)
+        self.assertIn('dgsua_events_total{event="screen.errors"} 2', text)
+
+        exported = json.loads(registry.export("json"))
+        self.assertEqual(exported["spans"]['screen "a"']["count"], 4)
+        with self.assertRaises(ValueError):
+            registry.export("xml")
+
+    def test_timed_is_free_when_disabled(self):
+        """Test that @timed returns the function itself while disabled."""
+
+        def square(value):
+            return value * value
+
+        with mock.patch.object(metrics.METRICS, "enabled", False):
+            self.assertIs(timed("square")(square), square)
+
+        with mock.patch.object(metrics.METRICS, "enabled", True):
+            wrapped = timed("test.square")(square)
+            self.assertEqual(wrapped(3), 9)
+            self.assertEqual(
+                metrics.METRICS.snapshot()["spans"]["test.square"]["count"], 1
+            )
+        metrics.METRICS.reset()
+
+    def test_calculator_spans(self):
+        """Test that the calculator records spans when enabled at startup."""
+        script = (
+            "import json\n"
+            "from src.calculator import calculate_utilities, summarize_decision\n"
+            "from src.instrumentation import METRICS\n"
+            "results = calculate_utilities({'item_name': 'x', 'price': 100,"
+            " 'income_level': 'medium', 'life_areas': ['career'],"
+            " 'necessity': 'essential', 'time_use': 5, 'use_probability': 'high',"
+            " 'life_span': 24, 'category': 'qol'})\n"
+            "summarize_decision(results, 0.5, 0.1)\n"
+            "print(json.dumps(METRICS.snapshot()))\n"
+        )
+        completed = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=ROOT,
+            env={**os.environ, "DGSUA_METRICS": "1"},
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        spans = json.loads(completed.stdout)["spans"]
+        counts = {
+            "calculate_utilities": 1,
+            "calculate_expected_utility_buy": 1,
+            # Once directly and once inside the breakeven
+            "calculate_expected_utility_not_buy": 2,
+            "calculate_breakeven_probability": 1,
+        }
+        for name, count in counts.items():
+            self.assertEqual(spans[f"calculator.{name}"]["count"], count)
+
+
+if __name__ == "__main__":
+    unittest.main()
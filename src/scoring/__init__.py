@@ -0,0 +1,11 @@
+"""
+Headless scoring of purchase records outside the Textual application.
+"""
+
+from .stream import read_records, score_chunk, score_stream
+
+__all__ = [
+    "read_records",
+    "score_chunk",
+    "score_stream",
+]
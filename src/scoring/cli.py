@@ -0,0 +1,289 @@
+"""
+Command line interface for headless scoring.
+
+Usage: python main.py score [INPUT] [--format csv|jsonl|parquet|arrow]
+                            [--chunk-size N]
+                            [--profile PATH] [--explain]
+                            [--workers N [--shards N] [--split-output]]
+"""
+
+import argparse
+import contextlib
+import sys
+import time
+from pathlib import Path
+
+from .parallel import RunStats, score_file_parallel
+from .stream import (
+    COLUMNAR_FORMATS,
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_P_USEFUL_IF_BUY,
+    DEFAULT_P_USEFUL_IF_NOT_BUY,
+    ENGINES,
+    FORMATS,
+    score_stream,
+)
+
+# File extension -> format
+EXTENSIONS = {
+    "csv": "csv",
+    "jsonl": "jsonl",
+    "parquet": "parquet",
+    "arrow": "arrow",
+    "feather": "arrow",
+    "ipc": "arrow",
+}
+
+
+def probability(value: str) -> float:
+    """argparse type for a probability between 0 and 1."""
+    try:
+        parsed = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("Probability must be a valid number")
+    if not 0 <= parsed <= 1:
+        raise argparse.ArgumentTypeError("Probability must be between 0 and 1")
+    return parsed
+
+
+def positive_int(value: str) -> int:
+    """argparse type for an integer greater than 0."""
+    try:
+        parsed = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("Must be a valid whole number")
+    if parsed < 1:
+        raise argparse.ArgumentTypeError("Must be greater than 0")
+    return parsed
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="main.py score",
+        description="Score purchase records from CSV or JSONL without the TUI.",
+    )
+    add_scoring_arguments(parser)
+    parser.add_argument(
+        "input",
+        nargs="?",
+        default="-",
+        help="Input file, or '-' for stdin (default)",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="-",
+        help="Output file, or '-' for stdout (default)",
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=positive_int,
+        default=1,
+        help="Worker processes; more than 1 shards INPUT across a process pool",
+    )
+    parser.add_argument(
+        "--shards",
+        type=positive_int,
+        help="Byte-range shards for a parallel run (default: 4 per worker)",
+    )
+    parser.add_argument(
+        "--split-output",
+        action="store_true",
+        help="Keep one output file per shard instead of merging in input order",
+    )
+    parser.add_argument(
+        "--explain",
+        action="store_true",
+        help="Add every intermediate term of the calculation to each row "
+        "(csv and jsonl output only)",
+    )
+    return parser
+
+
+def add_scoring_arguments(parser: argparse.ArgumentParser) -> None:
+    """Options shared by every headless scoring command."""
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=FORMATS + COLUMNAR_FORMATS,
+        help="Input format (default: from the file extension, else jsonl); "
+        "parquet and arrow need the arrow extra",
+    )
+    parser.add_argument(
+        "--output-format",
+        choices=FORMATS + COLUMNAR_FORMATS,
+        help="Output format (default: from the output file extension, else the "
+        "input format)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=positive_int,
+        default=DEFAULT_CHUNK_SIZE,
+        help=f"Records scored per vectorized chunk (default: {DEFAULT_CHUNK_SIZE})",
+    )
+    add_model_arguments(parser)
+    add_profile_argument(parser)
+
+
+def add_model_arguments(parser: argparse.ArgumentParser) -> None:
+    """Default probabilities and scoring engine."""
+    parser.add_argument(
+        "--p-useful-if-buy",
+        type=probability,
+        default=DEFAULT_P_USEFUL_IF_BUY,
+        help="P(useful|buy) for records without their own value",
+    )
+    parser.add_argument(
+        "--p-useful-if-not-buy",
+        type=probability,
+        default=DEFAULT_P_USEFUL_IF_NOT_BUY,
+        help="P(useful|not buy) for records without their own value",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default="batch",
+        help="Vectorized batch engine, compiled table or the scalar reference "
+        "(default: batch)",
+    )
+
+
+def add_profile_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--profile",
+        metavar="PATH",
+        help="Weight profile file (.toml or .json) to score with "
+        "(default: the built-in weights)",
+    )
+
+
+def scoring_options(args: argparse.Namespace) -> dict:
+    """score_stream keyword arguments selected on the command line."""
+    return {
+        "chunk_size": args.chunk_size,
+        "p_useful_if_buy": args.p_useful_if_buy,
+        "p_useful_if_not_buy": args.p_useful_if_not_buy,
+        "engine": args.engine,
+        "profile": args.profile,
+    }
+
+
+def open_text(path: str, mode: str = "r"):
+    """Context manager for a text file, or stdin/stdout for '-', left open."""
+    if path == "-":
+        return contextlib.nullcontext(sys.stdin if mode == "r" else sys.stdout)
+    return open(path, mode, encoding="utf-8", newline="")
+
+
+def detect_format(path: str, explicit: str | None, default: str = "jsonl") -> str:
+    if explicit:
+        return explicit
+    suffix = Path(path).suffix.lower().lstrip(".")
+    return EXTENSIONS.get(suffix, default)
+
+
+def score_columnar_file(
+    args: argparse.Namespace, input_format: str, output_format: str
+) -> int:
+    """Score with Parquet or Arrow on either side; returns the exit status."""
+    try:
+        from .columnar import ColumnarWriter, score_columnar
+    except ImportError:
+        print(
+            "error: Parquet and Arrow support needs pyarrow; "
+            "install the arrow extra: pip install 'dgsutilityagency[arrow]'",
+            file=sys.stderr,
+        )
+        return 1
+
+    output = sys.stdout.buffer if args.output == "-" else args.output
+    started = time.perf_counter()
+    try:
+        if input_format in COLUMNAR_FORMATS:
+            records = score_columnar(
+                args.input,
+                output,
+                input_format=input_format,
+                output_format=output_format,
+                **scoring_options(args),
+            )
+        else:
+            with open_text(args.input) as instream:
+                writer = ColumnarWriter(output, output_format)
+                try:
+                    records = score_stream(
+                        instream,
+                        None,
+                        input_format=input_format,
+                        writer=writer,
+                        **scoring_options(args),
+                    )
+                finally:
+                    writer.close()
+    except (OSError, ValueError) as error:
+        print(f"error: {error}", file=sys.stderr)
+        return 1
+    stats = RunStats(records, time.perf_counter() - started, workers=1, shards=1)
+    print(stats, file=sys.stderr)
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    input_format = detect_format(args.input, args.format)
+    output_format = detect_format(args.output, args.output_format, input_format)
+
+    if input_format in COLUMNAR_FORMATS or output_format in COLUMNAR_FORMATS:
+        if args.explain:
+            parser.error("--explain supports csv and jsonl output only")
+        if args.workers > 1 or args.split_output:
+            parser.error("parallel scoring supports csv and jsonl only")
+        if input_format in COLUMNAR_FORMATS and args.input == "-":
+            parser.error(f"{input_format} input needs an input file, not stdin")
+        return score_columnar_file(args, input_format, output_format)
+
+    if args.workers > 1 or args.split_output:
+        if args.input == "-":
+            parser.error("parallel scoring needs an input file, not stdin")
+        if args.split_output and args.output == "-":
+            parser.error("--split-output needs an output file")
+        try:
+            stats = score_file_parallel(
+                args.input,
+                sys.stdout.buffer if args.output == "-" else args.output,
+                input_format=input_format,
+                output_format=output_format,
+                workers=args.workers,
+                shards=args.shards,
+                split_output=args.split_output,
+                explain=args.explain,
+                **scoring_options(args),
+            )
+        except (OSError, ValueError) as error:
+            print(f"error: {error}", file=sys.stderr)
+            return 1
+        print(stats, file=sys.stderr)
+        return 0
+
+    started = time.perf_counter()
+    try:
+        with (
+            open_text(args.input) as instream,
+            open_text(args.output, "w") as outstream,
+        ):
+            records = score_stream(
+                instream,
+                outstream,
+                input_format=input_format,
+                output_format=output_format,
+                explain=args.explain,
+                **scoring_options(args),
+            )
+    except (OSError, ValueError) as error:
+        print(f"error: {error}", file=sys.stderr)
+        return 1
+    stats = RunStats(records, time.perf_counter() - started, workers=1, shards=1)
+    print(stats, file=sys.stderr)
+    return 0
@@ -0,0 +1,363 @@
+"""
+Arrow and Parquet input and output for headless scoring.
+
+Needs pyarrow, installed with the optional ``arrow`` extra; nothing else
+imports this module, so the base install does not need it.
+
+Record batches go straight to the vectorized calculator and back without
+building a dict per record:
+
+- float64 columns without nulls are viewed as NumPy arrays without copying;
+  other numeric columns are cast once per batch
+- categorical columns are dictionary-encoded (or already are), so only the
+  distinct values are looked up and the codes are mapped in one step
+- life_areas may be a list<string> column or a ``;``-separated string
+- output columns are built from the result arrays without copying, and
+  profile_version is dictionary-encoded
+
+Parquet output is written one row group per scored batch, so memory depends
+on the chunk size and not on the input size.
+"""
+
+import contextlib
+import io
+from collections.abc import Iterable, Iterator
+from typing import BinaryIO
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from src.calculator import (
+    ScoringTable,
+    build_scoring_table,
+    calculate_breakeven_probability_batch,
+    calculate_expected_utility_buy,
+    calculate_expected_utility_not_buy,
+    calculate_utilities_batch,
+    calculate_utilities_compiled,
+    get_scoring_table,
+    load_profile,
+)
+from src.calculator.batch import UTILITY_COLUMNS, LookupTables, PurchaseColumns
+
+from .stream import (
+    COLUMNAR_FORMATS,
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_P_USEFUL_IF_BUY,
+    DEFAULT_P_USEFUL_IF_NOT_BUY,
+    INPUT_FIELDS,
+    LIFE_AREAS_SEPARATOR,
+    OUTPUT_FIELDS,
+    RowWriter,
+    score_chunk,
+)
+
+NUMERIC_FIELDS = ("price", "time_use", "life_span")
+CATEGORICAL_FIELDS = ("income_level", "necessity", "use_probability", "category")
+PROBABILITY_FIELDS = ("p_useful_if_buy", "p_useful_if_not_buy")
+
+OUTPUT_SCHEMA = pa.schema(
+    [
+        ("item_name", pa.string()),
+        *((name, pa.float64()) for name in OUTPUT_FIELDS[1:-1]),
+        ("profile_version", pa.dictionary(pa.int32(), pa.string())),
+    ]
+)
+
+
+def read_batches(
+    path: str, input_format: str, batch_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[pa.RecordBatch]:
+    """Lazily read record batches of at most ``batch_size`` rows."""
+    if input_format == "parquet":
+        file = pq.ParquetFile(path)
+        wanted = (*INPUT_FIELDS, *PROBABILITY_FIELDS)
+        columns = [name for name in file.schema_arrow.names if name in wanted]
+        yield from file.iter_batches(batch_size=batch_size, columns=columns)
+    elif input_format == "arrow":
+        with pa.memory_map(path) as source:
+            try:
+                reader = pa.ipc.open_file(source)
+                batches = (
+                    reader.get_batch(i) for i in range(reader.num_record_batches)
+                )
+            except pa.ArrowInvalid:
+                source.seek(0)
+                batches = pa.ipc.open_stream(source)
+            for batch in batches:
+                for start in range(0, batch.num_rows, batch_size):
+                    yield batch.slice(start, batch_size)
+    else:
+        raise ValueError(f"Unsupported format: {input_format!r}")
+
+
+def encode_batch(
+    batch: pa.RecordBatch, tables: LookupTables, first_record: int = 1
+) -> PurchaseColumns:
+    """Encode a record batch into PurchaseColumns for ``tables``."""
+    missing = [name for name in INPUT_FIELDS if name not in batch.schema.names]
+    if missing:
+        raise ValueError(f"Missing fields: {', '.join(missing)}")
+
+    columns = {
+        name: _numeric(batch.column(name), name, first_record)
+        for name in NUMERIC_FIELDS
+    }
+    not_positive = np.flatnonzero(columns["price"] <= 0)
+    if not_positive.size:
+        raise ValueError(
+            f"Record {first_record + int(not_positive[0])}: "
+            "Price must be greater than 0"
+        )
+    life_span = columns["life_span"]
+    not_whole = np.flatnonzero(
+        (life_span < 0) | (np.floor(life_span) != life_span) | np.isinf(life_span)
+    )
+    if not_whole.size:
+        raise ValueError(
+            f"Record {first_record + int(not_whole[0])}: "
+            "Life span must be a whole number of 0 or more"
+        )
+    for name in CATEGORICAL_FIELDS:
+        columns[name] = _categorical(batch.column(name), name, tables, first_record)
+    columns["life_areas"], columns["life_area_mult"] = _life_areas(
+        batch.column("life_areas"), tables, first_record
+    )
+    return columns
+
+
+def batch_probabilities(
+    batch: pa.RecordBatch,
+    p_useful_if_buy: float = DEFAULT_P_USEFUL_IF_BUY,
+    p_useful_if_not_buy: float = DEFAULT_P_USEFUL_IF_NOT_BUY,
+    first_record: int = 1,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Per-record probabilities, with the defaults where a column or value is missing."""
+    arrays = []
+    for name, default in zip(
+        PROBABILITY_FIELDS, (p_useful_if_buy, p_useful_if_not_buy)
+    ):
+        if name not in batch.schema.names:
+            arrays.append(np.full(batch.num_rows, default))
+            continue
+        column = pc.fill_null(pc.cast(batch.column(name), pa.float64()), default)
+        values = _numeric(column, name, first_record)
+        outside = np.flatnonzero((values < 0) | (values > 1))
+        if outside.size:
+            raise ValueError(
+                f"Record {first_record + int(outside[0])}: "
+                "Probability must be between 0 and 1"
+            )
+        arrays.append(values)
+    return arrays[0], arrays[1]
+
+
+def score_batch(
+    batch: pa.RecordBatch,
+    p_useful_if_buy: float = DEFAULT_P_USEFUL_IF_BUY,
+    p_useful_if_not_buy: float = DEFAULT_P_USEFUL_IF_NOT_BUY,
+    engine: str = "batch",
+    table: ScoringTable | None = None,
+    first_record: int = 1,
+) -> pa.RecordBatch:
+    """Score a record batch into a batch of OUTPUT_SCHEMA.
+
+    Matches score_chunk row for row. The scalar engine goes through
+    score_chunk one dict per record.
+    """
+    if table is None:
+        table = get_scoring_table()
+    if engine == "scalar":
+        rows = score_chunk(
+            batch.to_pylist(),
+            p_useful_if_buy,
+            p_useful_if_not_buy,
+            engine,
+            table,
+            first_record,
+        )
+        return pa.RecordBatch.from_pylist(rows, schema=OUTPUT_SCHEMA)
+
+    columns = encode_batch(batch, table.lookup, first_record)
+    if engine == "batch":
+        results = calculate_utilities_batch(columns, table.lookup)
+    elif engine == "compiled":
+        results = calculate_utilities_compiled(columns, table)
+    else:
+        raise ValueError(f"Unsupported engine: {engine!r}")
+    p_buy, p_not_buy = batch_probabilities(
+        batch, p_useful_if_buy, p_useful_if_not_buy, first_record
+    )
+
+    outputs = {name: results[name] for name in UTILITY_COLUMNS}
+    outputs["p_useful_if_buy"] = p_buy
+    outputs["p_useful_if_not_buy"] = p_not_buy
+    outputs["eu_buy"] = calculate_expected_utility_buy(p_buy, results)
+    outputs["eu_not_buy"] = calculate_expected_utility_not_buy(p_not_buy, results)
+    outputs["breakeven"] = calculate_breakeven_probability_batch(results, p_not_buy)
+    version = pa.DictionaryArray.from_arrays(
+        pa.array(np.zeros(batch.num_rows, dtype=np.int32)),
+        pa.array([table.version], pa.string()),
+    )
+    return pa.RecordBatch.from_arrays(
+        [
+            pc.cast(batch.column("item_name"), pa.string()),
+            *(pa.array(outputs[name]) for name in OUTPUT_FIELDS[1:-1]),
+            version,
+        ],
+        schema=OUTPUT_SCHEMA,
+    )
+
+
+class ColumnarWriter:
+    """Incrementally writes scored batches or rows as Parquet or Arrow IPC.
+
+    Each write becomes one Parquet row group or one IPC record batch.
+    """
+
+    def __init__(self, sink: str | BinaryIO, output_format: str):
+        if output_format == "parquet":
+            self._writer = pq.ParquetWriter(sink, OUTPUT_SCHEMA)
+        elif output_format == "arrow":
+            self._writer = pa.ipc.new_file(sink, OUTPUT_SCHEMA)
+        else:
+            raise ValueError(f"Unsupported format: {output_format!r}")
+
+    def write_batch(self, batch: pa.RecordBatch) -> None:
+        if batch.num_rows:
+            self._writer.write_batch(batch)
+
+    def write(self, rows: Iterable[dict]) -> None:
+        """RowWriter-compatible: write dict rows from score_chunk."""
+        self.write_batch(pa.RecordBatch.from_pylist(list(rows), schema=OUTPUT_SCHEMA))
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+class _TextBatchWriter:
+    """Writes scored batches as CSV or JSONL rows."""
+
+    def __init__(self, sink: BinaryIO, output_format: str):
+        self._stream = io.TextIOWrapper(sink, encoding="utf-8", newline="")
+        self._rows = RowWriter(self._stream, output_format)
+
+    def write_batch(self, batch: pa.RecordBatch) -> None:
+        self._rows.write(batch.to_pylist())
+
+    def close(self) -> None:
+        # Flush, but leave the binary stream to whoever opened it
+        self._stream.detach()
+
+
+def score_columnar(
+    input_path: str,
+    output: str | BinaryIO,
+    input_format: str,
+    output_format: str | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    p_useful_if_buy: float = DEFAULT_P_USEFUL_IF_BUY,
+    p_useful_if_not_buy: float = DEFAULT_P_USEFUL_IF_NOT_BUY,
+    engine: str = "batch",
+    profile: str | None = None,
+) -> int:
+    """Score a Parquet or Arrow IPC file into ``output``, one batch at a time.
+
+    ``output`` is a path or a binary stream. ``output_format`` defaults to
+    ``input_format`` and may also be csv or jsonl. Returns the number of
+    records scored.
+    """
+    if profile is not None:
+        table = build_scoring_table(profile=load_profile(profile))
+    else:
+        table = get_scoring_table()
+    output_format = output_format or input_format
+    count = 0
+    with contextlib.ExitStack() as resources:
+        if output_format in COLUMNAR_FORMATS:
+            writer = ColumnarWriter(output, output_format)
+        else:
+            if isinstance(output, str):
+                output = resources.enter_context(open(output, "wb"))
+            writer = _TextBatchWriter(output, output_format)
+        resources.callback(writer.close)
+        for batch in read_batches(input_path, input_format, chunk_size):
+            writer.write_batch(
+                score_batch(
+                    batch,
+                    p_useful_if_buy,
+                    p_useful_if_not_buy,
+                    engine,
+                    table,
+                    first_record=count + 1,
+                )
+            )
+            count += batch.num_rows
+    return count
+
+
+def _numeric(column: pa.Array, name: str, first_record: int) -> np.ndarray:
+    """A numeric column as float64, without copying when it already is one."""
+    if column.null_count:
+        missing = column.is_null().to_numpy(zero_copy_only=False).argmax()
+        raise ValueError(f"Record {first_record + int(missing)}: Missing {name}")
+    if column.type != pa.float64():
+        column = pc.cast(column, pa.float64())
+    return column.to_numpy(zero_copy_only=True)
+
+
+def _categorical(
+    column: pa.Array, name: str, tables: LookupTables, first_record: int
+) -> np.ndarray:
+    """Integer codes of a categorical column, looking up each distinct value once."""
+    if column.null_count:
+        missing = column.is_null().to_numpy(zero_copy_only=False).argmax()
+        raise ValueError(f"Record {first_record + int(missing)}: Missing {name}")
+    if not pa.types.is_dictionary(column.type):
+        column = column.dictionary_encode()
+    dictionary = [str(value) for value in column.dictionary.to_pylist()]
+    codes = (
+        tables.encode(name, dictionary) if dictionary else np.empty(0, dtype=np.intp)
+    )
+    return codes[column.indices.to_numpy(zero_copy_only=False)]
+
+
+def _life_areas(
+    column: pa.Array, tables: LookupTables, first_record: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Bitmask and averaged weight per record from a list<string> or separated
+    string column, as LookupTables.encode_life_area_lists."""
+    if column.null_count:
+        missing = column.is_null().to_numpy(zero_copy_only=False).argmax()
+        raise ValueError(f"Record {first_record + int(missing)}: Missing life_areas")
+    if pa.types.is_dictionary(column.type):
+        column = column.dictionary_decode()
+    if pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+        column = pc.split_pattern(column, LIFE_AREAS_SEPARATOR)
+
+    parents = pc.list_parent_indices(column).to_numpy(zero_copy_only=False)
+    areas = pc.list_flatten(column).dictionary_encode()
+    names = areas.dictionary.to_pylist()
+    known = {area: 1 << bit for bit, area in enumerate(tables.life_areas)}
+    bits = np.array([known.get(area, 0) for area in names], dtype=np.intp)
+    weights = np.array(
+        [tables.life_area_weights.get(area, 1.0) for area in names], dtype=np.float64
+    )
+    # Empty names come from separators with nothing between them
+    counted = np.array([bool(area) for area in names], dtype=bool)
+
+    masks = np.zeros(len(column), dtype=np.intp)
+    totals = np.zeros(len(column), dtype=np.float64)
+    counts = np.zeros(len(column), dtype=np.intp)
+    if parents.size:
+        codes = areas.indices.to_numpy(zero_copy_only=False)
+        np.bitwise_or.at(masks, parents, bits[codes])
+        keep = counted[codes]
+        # Unbuffered, in list order, so the sums match calculate_utilities'
+        np.add.at(totals, parents[keep], weights[codes[keep]])
+        counts = np.bincount(parents[keep], minlength=len(column))
+    mults = np.ones(len(column), dtype=np.float64)
+    np.divide(totals, counts, out=mults, where=counts > 0)
+    return masks, mults
@@ -0,0 +1,227 @@
+"""
+Multi-process scoring of large input files.
+
+The input file is split into byte-range shards aligned to line boundaries.
+Each shard is scored by score_stream in a worker process and written to its
+own part file, so the calculator is reused unchanged and a parallel run
+produces the same bytes as a serial one.
+"""
+
+import csv
+import io
+import os
+import shutil
+import tempfile
+import time
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import pairwise
+from typing import BinaryIO
+
+from .stream import EXPLAIN_FIELDS, OUTPUT_FIELDS, RowWriter, score_stream
+
+
+@dataclass(frozen=True)
+class Shard:
+    """A line-aligned byte range of the input file."""
+
+    index: int
+    start: int
+    end: int
+
+
+@dataclass(frozen=True)
+class ShardTask:
+    """Everything a worker process needs to score one shard."""
+
+    path: str
+    shard: Shard
+    output_path: str
+    input_format: str
+    output_format: str
+    fieldnames: list[str] | None
+    header: bool
+    options: dict = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class RunStats:
+    """Summary of a scoring run."""
+
+    records: int
+    seconds: float
+    workers: int
+    shards: int
+
+    @property
+    def throughput(self) -> float:
+        return self.records / self.seconds if self.seconds > 0 else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"Scored {self.records:,} records in {self.seconds:.2f}s "
+            f"({self.throughput:,.0f} records/s, {self.workers} workers, "
+            f"{self.shards} shards)"
+        )
+
+
+def plan_shards(path: str, shard_count: int, skip_header: bool) -> list[Shard]:
+    """Split ``path`` into at most ``shard_count`` line-aligned byte ranges."""
+    size = os.path.getsize(path)
+    with open(path, "rb") as file:
+        if skip_header:
+            file.readline()
+        start = file.tell()
+        bounds = [start]
+        for i in range(1, shard_count):
+            target = start + (size - start) * i // shard_count
+            if target <= bounds[-1]:
+                continue
+            # Back up one byte so a target already at a line start is kept
+            file.seek(target - 1)
+            file.readline()
+            boundary = file.tell()
+            if bounds[-1] < boundary < size:
+                bounds.append(boundary)
+        bounds.append(size)
+
+    return [
+        Shard(index, begin, end)
+        for index, (begin, end) in enumerate(pairwise(bounds))
+        if end > begin
+    ]
+
+
+def read_shard_lines(path: str, shard: Shard) -> Iterator[str]:
+    """Lazily yield the decoded lines of one shard."""
+    remaining = shard.end - shard.start
+    with open(path, "rb") as file:
+        file.seek(shard.start)
+        while remaining > 0:
+            line = file.readline()
+            if not line:
+                break
+            remaining -= len(line)
+            yield line.decode("utf-8")
+
+
+def score_shard(task: ShardTask) -> int:
+    """Worker entry point: score one shard into its part file."""
+    with open(task.output_path, "w", encoding="utf-8", newline="") as out:
+        try:
+            return score_stream(
+                read_shard_lines(task.path, task.shard),
+                out,
+                input_format=task.input_format,
+                output_format=task.output_format,
+                fieldnames=task.fieldnames,
+                header=task.header,
+                **task.options,
+            )
+        except ValueError as error:
+            raise ValueError(f"Shard {task.shard.index}: {error}") from None
+
+
+def read_csv_header(path: str) -> list[str]:
+    with open(path, encoding="utf-8", newline="") as file:
+        return next(csv.reader(file), [])
+
+
+def part_path(output_path: str, index: int) -> str:
+    """Name of the per-shard output file for ``output_path``."""
+    root, ext = os.path.splitext(output_path)
+    return f"{root}.part-{index:05d}{ext}"
+
+
+def score_file_parallel(
+    path: str,
+    output: str | BinaryIO,
+    input_format: str = "jsonl",
+    output_format: str | None = None,
+    workers: int | None = None,
+    shards: int | None = None,
+    split_output: bool = False,
+    **options,
+) -> RunStats:
+    """Score ``path`` across a process pool.
+
+    With ``split_output`` every shard is kept as its own file named by
+    part_path (``output`` must then be a path). Otherwise the parts are
+    merged back into ``output`` in input order. ``options`` are passed on to
+    score_stream (chunk size, probabilities, engine, explain).
+    """
+    output_format = output_format or input_format
+    workers = workers or os.cpu_count() or 1
+    started = time.perf_counter()
+
+    fieldnames = read_csv_header(path) if input_format == "csv" else None
+    plan = plan_shards(path, shards or workers * 4, skip_header=bool(fieldnames))
+
+    if split_output:
+        if not isinstance(output, str):
+            raise ValueError("Split output needs an output file path")
+        part_dir = None
+        part_paths = [part_path(output, shard.index) for shard in plan]
+    else:
+        part_dir = tempfile.mkdtemp(
+            prefix="dgscore-",
+            dir=os.path.dirname(os.path.abspath(output))
+            if isinstance(output, str)
+            else None,
+        )
+        part_paths = [
+            os.path.join(part_dir, f"part-{shard.index:05d}") for shard in plan
+        ]
+
+    tasks = [
+        ShardTask(
+            path=path,
+            shard=shard,
+            output_path=part,
+            input_format=input_format,
+            output_format=output_format,
+            fieldnames=fieldnames,
+            header=split_output,
+            options=options,
+        )
+        for shard, part in zip(plan, part_paths)
+    ]
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            records = sum(executor.map(score_shard, tasks))
+        if not split_output:
+            fields = EXPLAIN_FIELDS if options.get("explain") else OUTPUT_FIELDS
+            _merge_parts(part_paths, output, output_format, fields)
+    finally:
+        if part_dir is not None:
+            shutil.rmtree(part_dir, ignore_errors=True)
+
+    return RunStats(
+        records=records,
+        seconds=time.perf_counter() - started,
+        workers=workers,
+        shards=len(plan),
+    )
+
+
+def _merge_parts(
+    part_paths: list[str],
+    output: str | BinaryIO,
+    output_format: str,
+    fields: tuple[str, ...],
+) -> None:
+    if isinstance(output, str):
+        with open(output, "wb") as out:
+            _merge_parts(part_paths, out, output_format, fields)
+        return
+
+    # Header written the same way as a serial run, before any shard output
+    header = io.StringIO(newline="")
+    RowWriter(header, output_format, fields=fields)
+    output.write(header.getvalue().encode("utf-8"))
+    for part in part_paths:
+        with open(part, "rb") as file:
+            shutil.copyfileobj(file, output)
+    output.flush()
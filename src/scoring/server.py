@@ -0,0 +1,408 @@
+"""
+HTTP/JSON scoring service on asyncio streams.
+
+Usage: python main.py serve [--host HOST] [--port PORT] [--max-batch N]
+                            [--max-delay-ms MS]
+                            [--profile PATH [--reload-interval S]]
+
+Endpoints take one record or a list of records with the same fields as the
+headless scorer (see stream.INPUT_FIELDS) and answer with one row or a list
+of rows:
+
+    POST /score             every output field
+    POST /utilities         calculate_utilities metrics
+    POST /expected-utility  expected utility of buying and not buying
+    POST /breakeven         breakeven probability
+    GET  /metrics           latency and batch size histograms
+    GET  /health
+
+Records from concurrent requests are micro-batched: they are queued until
+``max_batch`` records are waiting or ``max_delay`` has passed and then scored
+with a single vectorized call. Connections are kept alive between requests
+unless the client asks otherwise.
+
+With --profile the weight profile file is watched and hot-swapped when it
+changes. Each batch is scored with the profile that was active when it
+started, and every /score row carries its ``profile_version``.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor
+from http import HTTPStatus
+
+from src.calculator import ProfileWatcher, ScoringTable, get_scoring_table
+from src.calculator.batch import UTILITY_COLUMNS
+from src.calculator.reload import DEFAULT_INTERVAL
+from src.instrumentation.histogram import SIZE_BUCKETS, Histogram
+
+from .cli import add_model_arguments, add_profile_argument, positive_int
+from .stream import OUTPUT_FIELDS, score_chunk
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_MAX_BATCH = 1024
+DEFAULT_MAX_DELAY = 0.001  # seconds
+DEFAULT_KEEP_ALIVE_TIMEOUT = 15.0  # seconds
+MAX_BODY_SIZE = 16 * 1024 * 1024
+
+# Endpoint -> output fields it returns
+ENDPOINTS = {
+    "/score": OUTPUT_FIELDS,
+    "/utilities": ("item_name", *UTILITY_COLUMNS),
+    "/expected-utility": (
+        "item_name",
+        "p_useful_if_buy",
+        "p_useful_if_not_buy",
+        "eu_buy",
+        "eu_not_buy",
+    ),
+    "/breakeven": ("item_name", "p_useful_if_not_buy", "breakeven"),
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: HTTPStatus, message: str | None = None):
+        super().__init__(message or status.phrase)
+        self.status = status
+
+
+class ScoringError(Exception):
+    """A batch failed for a reason other than an invalid record."""
+
+
+class MicroBatcher:
+    """Coalesces records from concurrent callers into single scoring calls.
+
+    Batches are scored on ``executor`` (the loop's default executor when
+    None), so the event loop keeps accepting requests while a batch runs.
+    """
+
+    def __init__(
+        self,
+        score: Callable[[list[dict]], list[dict]],
+        max_batch: int = DEFAULT_MAX_BATCH,
+        max_delay: float = DEFAULT_MAX_DELAY,
+        executor: Executor | None = None,
+    ):
+        self._score = score
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.batch_sizes = Histogram(SIZE_BUCKETS)
+        self._executor = executor
+        self._pending: list[tuple[list[dict], asyncio.Future]] = []
+        self._pending_records = 0
+        self._timer: asyncio.TimerHandle | None = None
+        self._batches: set[asyncio.Task] = set()
+
+    async def submit(self, raws: list[dict]) -> list[dict]:
+        """Score ``raws`` together with whatever else is waiting."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((raws, future))
+        self._pending_records += len(raws)
+        if self._pending_records >= self.max_batch:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self.flush)
+        return await future
+
+    def flush(self) -> None:
+        """Start scoring every waiting record."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        self._pending_records = 0
+        if not pending:
+            return
+        batch = asyncio.create_task(self._run(pending))
+        # The loop only keeps weak references to tasks
+        self._batches.add(batch)
+        batch.add_done_callback(self._batches.discard)
+
+    async def _run(self, pending: list[tuple[list[dict], asyncio.Future]]) -> None:
+        raws = [raw for request, _ in pending for raw in request]
+        try:
+            rows = await self._score_async(raws)
+        except ValueError:
+            # Score requests one by one so a bad record only fails its own request
+            for request, future in pending:
+                await self._settle(future, request)
+            return
+        except ScoringError as error:
+            # Nothing in the batch can be scored; fail every request waiting on it
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        self.batch_sizes.observe(len(raws))
+        start = 0
+        for request, future in pending:
+            if not future.done():
+                future.set_result(rows[start : start + len(request)])
+            start += len(request)
+
+    async def _settle(self, future: asyncio.Future, raws: list[dict]) -> None:
+        try:
+            rows = await self._score_async(raws)
+        except (ValueError, ScoringError) as error:
+            if not future.done():
+                future.set_exception(error)
+            return
+        self.batch_sizes.observe(len(raws))
+        if not future.done():
+            future.set_result(rows)
+
+    async def _score_async(self, raws: list[dict]) -> list[dict]:
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._executor, self._score, raws)
+        except ValueError:
+            raise
+        except Exception as error:
+            raise ScoringError(str(error)) from error
+
+
+class ScoringServer:
+    """asyncio HTTP/1.1 server around a MicroBatcher."""
+
+    def __init__(
+        self,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        max_delay: float = DEFAULT_MAX_DELAY,
+        keep_alive_timeout: float = DEFAULT_KEEP_ALIVE_TIMEOUT,
+        **options,
+    ):
+        """``options`` are score_chunk keyword arguments (probabilities, engine)."""
+        self.batcher = MicroBatcher(
+            lambda raws: score_chunk(raws, **options),
+            max_batch=max_batch,
+            max_delay=max_delay,
+        )
+        self.keep_alive_timeout = keep_alive_timeout
+        self.latencies = {path: Histogram() for path in ENDPOINTS}
+        self.errors = 0
+        self._server: asyncio.Server | None = None
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> None:
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        await self._server.serve_forever()
+
+    async def close(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    def metrics(self) -> dict:
+        return {
+            "latency_ms": {
+                path: histogram.snapshot() for path, histogram in self.latencies.items()
+            },
+            "batch_size": self.batcher.batch_sizes.snapshot(),
+            "errors": self.errors,
+        }
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            keep_alive = True
+            while keep_alive:
+                try:
+                    head = await asyncio.wait_for(
+                        reader.readuntil(b"\r\n\r\n"), self.keep_alive_timeout
+                    )
+                except (TimeoutError, asyncio.IncompleteReadError):
+                    break
+                started = time.perf_counter()
+                method, path, version, headers = _parse_head(head)
+                keep_alive = _wants_keep_alive(version, headers)
+                try:
+                    body = await _read_body(reader, headers)
+                    status, payload = await self._route(method, path, body)
+                except HTTPError as error:
+                    status, payload = error.status, {"error": str(error)}
+                if status >= 400:
+                    self.errors += 1
+                writer.write(_response(status, payload, keep_alive))
+                await writer.drain()
+                if path in self.latencies and status == HTTPStatus.OK:
+                    self.latencies[path].observe((time.perf_counter() - started) * 1000)
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method: str, path: str, body: bytes) -> tuple[int, object]:
+        if path == "/health":
+            return HTTPStatus.OK, {
+                "status": "ok",
+                "profile_version": get_scoring_table().version,
+            }
+        if path == "/metrics":
+            return HTTPStatus.OK, self.metrics()
+        if path not in ENDPOINTS:
+            raise HTTPError(HTTPStatus.NOT_FOUND)
+        if method != "POST":
+            raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED)
+
+        try:
+            request = json.loads(body)
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Body must be valid JSON") from None
+        single = isinstance(request, dict)
+        raws = [request] if single else request
+        if not isinstance(raws, list) or not all(isinstance(r, dict) for r in raws):
+            raise HTTPError(
+                HTTPStatus.BAD_REQUEST, "Body must be a record or a list of records"
+            )
+        if not raws:
+            return HTTPStatus.OK, []
+
+        try:
+            rows = await self.batcher.submit(raws)
+        except ValueError as error:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, str(error)) from None
+        except ScoringError as error:
+            raise HTTPError(
+                HTTPStatus.INTERNAL_SERVER_ERROR, f"Scoring failed: {error}"
+            ) from None
+        fields = ENDPOINTS[path]
+        rows = [{field: row[field] for field in fields} for row in rows]
+        return HTTPStatus.OK, rows[0] if single else rows
+
+
+def _parse_head(head: bytes) -> tuple[str, str, str, dict[str, str]]:
+    request_line, *header_lines = head.decode("latin-1").split("\r\n")
+    method, target, version = request_line.split(" ", 2)
+    headers = {}
+    for line in header_lines:
+        if line:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+    return method, target.split("?", 1)[0], version, headers
+
+
+def _wants_keep_alive(version: str, headers: dict[str, str]) -> bool:
+    connection = headers.get("connection", "").lower()
+    if version == "HTTP/1.0":
+        return connection == "keep-alive"
+    return connection != "close"
+
+
+async def _read_body(reader: asyncio.StreamReader, headers: dict[str, str]) -> bytes:
+    if "transfer-encoding" in headers:
+        raise HTTPError(HTTPStatus.LENGTH_REQUIRED)
+    try:
+        length = int(headers.get("content-length", "0"))
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length") from None
+    if length > MAX_BODY_SIZE:
+        raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+    return await reader.readexactly(length) if length else b""
+
+
+def _response(status: int, payload: object, keep_alive: bool) -> bytes:
+    body = json.dumps(payload).encode()
+    status = HTTPStatus(status)
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode() + body
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="main.py serve",
+        description="Serve the calculator over HTTP/JSON with micro-batching.",
+    )
+    add_model_arguments(parser)
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Address to bind")
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=DEFAULT_PORT,
+        help=f"Port to listen on, 0 for any free port (default: {DEFAULT_PORT})",
+    )
+    parser.add_argument(
+        "--max-batch",
+        type=positive_int,
+        default=DEFAULT_MAX_BATCH,
+        help=f"Records that trigger an immediate batch (default: {DEFAULT_MAX_BATCH})",
+    )
+    parser.add_argument(
+        "--max-delay-ms",
+        type=float,
+        default=DEFAULT_MAX_DELAY * 1000,
+        help="Longest a record waits for its batch to fill "
+        f"(default: {DEFAULT_MAX_DELAY * 1000:g})",
+    )
+    add_profile_argument(parser)
+    parser.add_argument(
+        "--reload-interval",
+        type=float,
+        default=DEFAULT_INTERVAL,
+        help="Seconds between checks of the profile file for changes "
+        f"(default: {DEFAULT_INTERVAL:g})",
+    )
+    return parser
+
+
+def _report_reload(table: ScoringTable) -> None:
+    print(f"Loaded profile {table.version}", file=sys.stderr, flush=True)
+
+
+def _report_error(error: Exception) -> None:
+    print(f"Profile not reloaded: {error}", file=sys.stderr, flush=True)
+
+
+async def serve(args: argparse.Namespace) -> None:
+    watcher = None
+    if args.profile is not None:
+        watcher = ProfileWatcher(
+            args.profile,
+            interval=args.reload_interval,
+            on_reload=_report_reload,
+            on_error=_report_error,
+        )
+        watcher.load()
+        watcher.start()
+    server = ScoringServer(
+        max_batch=args.max_batch,
+        max_delay=args.max_delay_ms / 1000,
+        p_useful_if_buy=args.p_useful_if_buy,
+        p_useful_if_not_buy=args.p_useful_if_not_buy,
+        engine=args.engine,
+    )
+    await server.start(args.host, args.port)
+    print(f"Listening on http://{args.host}:{server.port}", file=sys.stderr, flush=True)
+    try:
+        await server.serve_forever()
+    finally:
+        if watcher is not None:
+            watcher.stop()
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+    except (OSError, ValueError) as error:
+        print(f"error: {error}", file=sys.stderr)
+        return 1
+    return 0
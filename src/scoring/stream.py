@@ -0,0 +1,368 @@
+"""
+Streaming scorer for CSV and JSONL purchase records.
+
+Records are read lazily, grouped into fixed-size chunks and scored chunk by
+chunk, so memory use depends on the chunk size and not on the input size.
+"""
+
+import csv
+import json
+import math
+from collections.abc import Iterable, Iterator
+from itertools import islice
+from typing import TextIO
+
+import numpy as np
+
+from src.calculator import (
+    TRACE_COLUMNS,
+    ScoringTable,
+    build_scoring_table,
+    calculate_breakeven_probability,
+    calculate_breakeven_probability_batch,
+    calculate_expected_utility_buy,
+    calculate_expected_utility_not_buy,
+    calculate_utilities,
+    calculate_utilities_batch,
+    calculate_utilities_compiled,
+    encode_purchases,
+    explain_batch,
+    explain_utilities,
+    get_scoring_table,
+    load_profile,
+)
+from src.calculator.batch import UTILITY_COLUMNS, BatchUtilityMetrics
+from src.calculator.constants import (
+    DEFAULT_P_USEFUL_IF_BUY,
+    DEFAULT_P_USEFUL_IF_NOT_BUY,
+)
+from src.calculator.profiles import BUILTIN_VERSION
+from src.calculator.utility_calculator import PurchaseData
+
+FORMATS = ("csv", "jsonl")
+# Need the optional pyarrow dependency, see columnar.py
+COLUMNAR_FORMATS = ("parquet", "arrow")
+ENGINES = ("batch", "compiled", "scalar")
+
+DEFAULT_CHUNK_SIZE = 10_000
+
+# Separator for the life_areas column in CSV input, e.g. "career;health"
+LIFE_AREAS_SEPARATOR = ";"
+
+INPUT_FIELDS = (
+    "item_name",
+    "price",
+    "income_level",
+    "life_areas",
+    "necessity",
+    "time_use",
+    "use_probability",
+    "life_span",
+    "category",
+)
+
+OUTPUT_FIELDS = (
+    "item_name",
+    *UTILITY_COLUMNS,
+    "p_useful_if_buy",
+    "p_useful_if_not_buy",
+    "eu_buy",
+    "eu_not_buy",
+    "breakeven",
+    "profile_version",
+)
+# Output of explain mode: every row also carries its trace
+EXPLAIN_FIELDS = (*OUTPUT_FIELDS, *TRACE_COLUMNS)
+
+
+def read_records(
+    lines: Iterable[str], input_format: str, fieldnames: list[str] | None = None
+) -> Iterator[dict]:
+    """Lazily parse raw records from CSV or JSONL lines.
+
+    ``fieldnames`` supplies the CSV header when ``lines`` does not start with it.
+    """
+    if input_format == "csv":
+        yield from csv.DictReader(lines, fieldnames=fieldnames)
+    elif input_format == "jsonl":
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+    else:
+        raise ValueError(f"Unsupported format: {input_format!r}")
+
+
+def parse_record(raw: dict) -> tuple[PurchaseData, float | None, float | None]:
+    """Convert a raw CSV/JSON record into PurchaseData and optional probabilities.
+
+    Every invalid field raises ValueError, whatever the type of its value.
+    """
+    missing = [field for field in INPUT_FIELDS if field not in raw]
+    if missing:
+        raise ValueError(f"Missing fields: {', '.join(missing)}")
+
+    life_areas = raw["life_areas"]
+    if isinstance(life_areas, str):
+        life_areas = [area for area in life_areas.split(LIFE_AREAS_SEPARATOR) if area]
+    if not isinstance(life_areas, list) or not all(
+        isinstance(area, str) for area in life_areas
+    ):
+        raise ValueError("Life areas must be a list of names")
+
+    purchase: PurchaseData = {
+        "item_name": str(raw["item_name"]),
+        "price": _finite(raw["price"], "Price"),
+        "income_level": raw["income_level"],
+        "life_areas": list(life_areas),
+        "necessity": raw["necessity"],
+        "time_use": _finite(raw["time_use"], "Time use"),
+        "use_probability": raw["use_probability"],
+        "life_span": _whole(raw["life_span"], "Life span"),
+        "category": raw["category"],
+    }
+    if purchase["price"] <= 0:
+        raise ValueError("Price must be greater than 0")
+    return (
+        purchase,
+        _parse_probability(raw.get("p_useful_if_buy")),
+        _parse_probability(raw.get("p_useful_if_not_buy")),
+    )
+
+
+def _finite(value, name: str) -> float:
+    try:
+        number = float(value)
+    except (TypeError, OverflowError):
+        # e.g. a list, or an integer too large for a float
+        raise ValueError(f"{name} must be a finite number") from None
+    if not math.isfinite(number):
+        raise ValueError(f"{name} must be a finite number")
+    return number
+
+
+def _whole(value, name: str) -> int:
+    number = _finite(value, name)
+    if number < 0 or not number.is_integer():
+        raise ValueError(f"{name} must be a whole number of 0 or more")
+    return int(number)
+
+
+def _parse_probability(value) -> float | None:
+    if value is None or value == "":
+        return None
+    probability = _finite(value, "Probability")
+    if not 0 <= probability <= 1:
+        raise ValueError("Probability must be between 0 and 1")
+    return probability
+
+
+def iter_chunks(records: Iterable, chunk_size: int) -> Iterator[list]:
+    """Group an iterable into lists of at most ``chunk_size`` items."""
+    if chunk_size < 1:
+        raise ValueError("Chunk size must be at least 1")
+    iterator = iter(records)
+    while chunk := list(islice(iterator, chunk_size)):
+        yield chunk
+
+
+def score_chunk(
+    raws: list[dict],
+    p_useful_if_buy: float = DEFAULT_P_USEFUL_IF_BUY,
+    p_useful_if_not_buy: float = DEFAULT_P_USEFUL_IF_NOT_BUY,
+    engine: str = "batch",
+    table: ScoringTable | None = None,
+    first_record: int = 1,
+    explain: bool = False,
+) -> list[dict]:
+    """Score one chunk of raw records into output rows.
+
+    Per-record ``p_useful_if_buy``/``p_useful_if_not_buy`` fields override the
+    given defaults. The batch and compiled engines use ``table``, by default
+    the active weight profile; the scalar engine always uses the constants
+    module. ``first_record`` is only used to number records in errors.
+    With ``explain`` the rows have EXPLAIN_FIELDS, scored by the explain
+    functions instead; the compiled engine then scores like the batch one.
+    """
+    purchases = []
+    p_buy = []
+    p_not_buy = []
+    for offset, raw in enumerate(raws):
+        try:
+            purchase, record_p_buy, record_p_not_buy = parse_record(raw)
+        except ValueError as error:
+            raise ValueError(f"Record {first_record + offset}: {error}") from None
+        purchases.append(purchase)
+        p_buy.append(p_useful_if_buy if record_p_buy is None else record_p_buy)
+        p_not_buy.append(
+            p_useful_if_not_buy if record_p_not_buy is None else record_p_not_buy
+        )
+
+    if table is None:
+        table = get_scoring_table()
+    fields = OUTPUT_FIELDS
+    if explain:
+        columns = _explain_columns(purchases, p_buy, p_not_buy, engine, table)
+        version = BUILTIN_VERSION if engine == "scalar" else table.version
+        fields = EXPLAIN_FIELDS
+    elif engine == "batch":
+        tables = table.lookup
+        results = calculate_utilities_batch(encode_purchases(purchases, tables), tables)
+        columns = _expected_columns(results, p_buy, p_not_buy)
+        version = table.version
+    elif engine == "compiled":
+        results = calculate_utilities_compiled(
+            encode_purchases(purchases, table.lookup), table
+        )
+        columns = _expected_columns(results, p_buy, p_not_buy)
+        version = table.version
+    elif engine == "scalar":
+        columns = _score_scalar(purchases, p_buy, p_not_buy)
+        version = BUILTIN_VERSION
+    else:
+        raise ValueError(f"Unsupported engine: {engine!r}")
+    columns["profile_version"] = [version] * len(purchases)
+
+    item_names = [purchase["item_name"] for purchase in purchases]
+    return [
+        dict(zip(fields, values))
+        for values in zip(item_names, *(columns[f] for f in fields[1:]))
+    ]
+
+
+def _expected_columns(
+    results: BatchUtilityMetrics, p_buy: list[float], p_not_buy: list[float]
+) -> dict[str, list]:
+    p_buy_array = np.asarray(p_buy, dtype=np.float64)
+    p_not_buy_array = np.asarray(p_not_buy, dtype=np.float64)
+
+    columns = {name: results[name].tolist() for name in UTILITY_COLUMNS}
+    columns["p_useful_if_buy"] = p_buy
+    columns["p_useful_if_not_buy"] = p_not_buy
+    columns["eu_buy"] = calculate_expected_utility_buy(p_buy_array, results).tolist()
+    columns["eu_not_buy"] = calculate_expected_utility_not_buy(
+        p_not_buy_array, results
+    ).tolist()
+    columns["breakeven"] = calculate_breakeven_probability_batch(
+        results, p_not_buy_array
+    ).tolist()
+    return columns
+
+
+def _explain_columns(
+    purchases: list[PurchaseData],
+    p_buy: list[float],
+    p_not_buy: list[float],
+    engine: str,
+    table: ScoringTable,
+) -> dict[str, list]:
+    if engine == "scalar":
+        traces = [explain_utilities(purchase) for purchase in purchases]
+        trace = {
+            name: np.array([trace[name] for trace in traces], dtype=np.float64)
+            for name in (*UTILITY_COLUMNS, *TRACE_COLUMNS)
+        }
+    elif engine in ENGINES:
+        trace = explain_batch(encode_purchases(purchases, table.lookup), table.lookup)
+    else:
+        raise ValueError(f"Unsupported engine: {engine!r}")
+    columns = _expected_columns(trace, p_buy, p_not_buy)
+    columns.update((name, trace[name].tolist()) for name in TRACE_COLUMNS)
+    return columns
+
+
+def _score_scalar(
+    purchases: list[PurchaseData], p_buy: list[float], p_not_buy: list[float]
+) -> dict[str, list]:
+    columns = {field: [] for field in OUTPUT_FIELDS[1:-1]}
+    for purchase, p_b, p_nb in zip(purchases, p_buy, p_not_buy):
+        results = calculate_utilities(purchase)
+        for name in UTILITY_COLUMNS:
+            columns[name].append(results[name])
+        columns["p_useful_if_buy"].append(p_b)
+        columns["p_useful_if_not_buy"].append(p_nb)
+        columns["eu_buy"].append(calculate_expected_utility_buy(p_b, results))
+        columns["eu_not_buy"].append(calculate_expected_utility_not_buy(p_nb, results))
+        columns["breakeven"].append(calculate_breakeven_probability(results, p_nb))
+    return columns
+
+
+class RowWriter:
+    """Incrementally writes scored rows as CSV or JSONL."""
+
+    def __init__(
+        self,
+        stream: TextIO,
+        output_format: str,
+        header: bool = True,
+        fields: tuple[str, ...] = OUTPUT_FIELDS,
+    ):
+        if output_format not in FORMATS:
+            raise ValueError(f"Unsupported format: {output_format!r}")
+        self.stream = stream
+        self.output_format = output_format
+        self._csv = None
+        if output_format == "csv":
+            self._csv = csv.DictWriter(stream, fields, lineterminator="\n")
+            if header:
+                self._csv.writeheader()
+
+    def write(self, rows: Iterable[dict]) -> None:
+        if self._csv is not None:
+            self._csv.writerows(rows)
+        else:
+            self.stream.writelines(json.dumps(row) + "\n" for row in rows)
+        self.stream.flush()
+
+
+def score_stream(
+    instream: TextIO,
+    outstream: TextIO,
+    input_format: str = "jsonl",
+    output_format: str | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    p_useful_if_buy: float = DEFAULT_P_USEFUL_IF_BUY,
+    p_useful_if_not_buy: float = DEFAULT_P_USEFUL_IF_NOT_BUY,
+    engine: str = "batch",
+    fieldnames: list[str] | None = None,
+    header: bool = True,
+    profile: str | None = None,
+    writer: RowWriter | None = None,
+    explain: bool = False,
+) -> int:
+    """Score every record of ``instream`` into ``outstream``, one chunk at a time.
+
+    ``fieldnames`` and ``header`` let a caller score a headerless slice of a
+    CSV file and append to output that already has a header. ``profile`` is
+    the path of a weight profile file; without it the active profile is used.
+    The whole stream is scored with one profile. ``writer`` replaces the
+    RowWriter for ``outstream``, for example with a columnar.ColumnarWriter.
+    ``explain`` adds the trace of every record to its row (see score_chunk).
+    Returns the number of records scored.
+    """
+    if writer is None:
+        writer = RowWriter(
+            outstream,
+            output_format or input_format,
+            header=header,
+            fields=EXPLAIN_FIELDS if explain else OUTPUT_FIELDS,
+        )
+    if profile is not None:
+        table = build_scoring_table(profile=load_profile(profile))
+    else:
+        table = get_scoring_table()
+    records = read_records(instream, input_format, fieldnames)
+    count = 0
+    for chunk in iter_chunks(records, chunk_size):
+        writer.write(
+            score_chunk(
+                chunk,
+                p_useful_if_buy,
+                p_useful_if_not_buy,
+                engine,
+                table,
+                first_record=count + 1,
+                explain=explain,
+            )
+        )
+        count += len(chunk)
+    return count
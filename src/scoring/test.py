@@ -0,0 +1,583 @@
+"""
+Unit tests for headless scoring.
+
+Run with: python -m unittest src.scoring.test
+"""
+
+import asyncio
+import csv
+import io
+import itertools
+import json
+import os
+import tempfile
+import unittest
+from typing import ClassVar
+from unittest import mock
+
+from src.calculator import UsageEstimator, calculate_utilities
+
+from .cli import main as score_main
+from .parallel import plan_shards, score_file_parallel
+from .server import ScoringServer
+from .stream import (
+    EXPLAIN_FIELDS,
+    OUTPUT_FIELDS,
+    parse_record,
+    score_chunk,
+    score_stream,
+)
+from .usage import ingest_usage_events
+from .usage import main as usage_main
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+CSV_INPUT = (
+    "item_name,price,income_level,life_areas,necessity,time_use,"
+    "use_probability,life_span,category\n"
+    "Work Laptop,1000,medium,career,essential,20,high,36,efficiency\n"
+    "Fitness Tracker,200,low,health;personal,nice_to_have,2,high,24,qol\n"
+    "Gaming Console,500,medium,personal,nice_to_have,10,medium,60,entertainment\n"
+)
+JSONL_RECORD = (
+    '{"item_name": "Work Laptop", "price": 1000, "income_level": "medium", '
+    '"life_areas": ["career"], "necessity": "essential", "time_use": 20, '
+    '"use_probability": "high", "life_span": 36, "category": "efficiency"}\n'
+)
+
+
+class TestScoreStream(unittest.TestCase):
+    """Test cases for streaming CSV/JSONL scoring."""
+
+    def test_csv_to_jsonl_matches_scalar(self):
+        """Test that streamed rows match calculate_utilities for any chunk size."""
+        raws = [
+            dict(zip(CSV_INPUT.splitlines()[0].split(","), line.split(",")))
+            for line in CSV_INPUT.splitlines()[1:]
+        ]
+        for chunk_size in (1, 2, 100):
+            output = io.StringIO()
+            count = score_stream(
+                io.StringIO(CSV_INPUT),
+                output,
+                input_format="csv",
+                output_format="jsonl",
+                chunk_size=chunk_size,
+            )
+            self.assertEqual(count, 3)
+
+            rows = [json.loads(line) for line in output.getvalue().splitlines()]
+            for raw, row in zip(raws, rows):
+                expected = calculate_utilities(parse_record(raw)[0])
+                self.assertEqual(row["item_name"], raw["item_name"])
+                for name, value in expected.items():
+                    self.assertAlmostEqual(row[name], value, places=9)
+
+    def test_per_record_probabilities(self):
+        """Test that per-record probabilities override the defaults."""
+        record = {
+            "item_name": "Work Laptop",
+            "price": 1000.0,
+            "income_level": "medium",
+            "life_areas": ["career"],
+            "necessity": "essential",
+            "time_use": 20.0,
+            "use_probability": "high",
+            "life_span": 36,
+            "category": "efficiency",
+            "p_useful_if_buy": 0.9,
+        }
+        output = io.StringIO()
+        score_stream(io.StringIO(json.dumps(record) + "\n"), output)
+        row = json.loads(output.getvalue())
+        self.assertEqual(row["p_useful_if_buy"], 0.9)
+        self.assertEqual(row["p_useful_if_not_buy"], 0.1)
+
+    def test_profile_version_recorded(self):
+        """Test that rows carry the version of the profile they were scored with."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "profile.json")
+            with open(path, "w", encoding="utf-8") as file:
+                weights = {"career": 3.0, "personal": 3.0, "health": 3.0}
+                json.dump({"version": "test-1", "life_area_weights": weights}, file)
+            outputs = {}
+            for profile in (None, path):
+                output = io.StringIO()
+                score_stream(
+                    io.StringIO(CSV_INPUT),
+                    output,
+                    input_format="csv",
+                    output_format="jsonl",
+                    profile=profile,
+                )
+                outputs[profile] = [
+                    json.loads(line) for line in output.getvalue().splitlines()
+                ]
+
+        self.assertEqual({row["profile_version"] for row in outputs[None]}, {"builtin"})
+        self.assertEqual({row["profile_version"] for row in outputs[path]}, {"test-1"})
+        for builtin, loaded in zip(outputs[None], outputs[path]):
+            self.assertNotEqual(builtin["u_buy_useful"], loaded["u_buy_useful"])
+
+    def test_explain_adds_trace(self):
+        """Test that explain rows add the trace and keep every scored value."""
+        for engine in ("batch", "compiled", "scalar"):
+            outputs = {}
+            for explain in (False, True):
+                output = io.StringIO()
+                score_stream(
+                    io.StringIO(CSV_INPUT),
+                    output,
+                    input_format="csv",
+                    engine=engine,
+                    explain=explain,
+                )
+                outputs[explain] = list(csv.DictReader(io.StringIO(output.getvalue())))
+            with self.subTest(engine=engine):
+                self.assertEqual(tuple(outputs[False][0]), OUTPUT_FIELDS)
+                self.assertEqual(tuple(outputs[True][0]), EXPLAIN_FIELDS)
+                for plain, explained in zip(outputs[False], outputs[True]):
+                    self.assertEqual(plain["item_name"], explained["item_name"])
+                    for name in OUTPUT_FIELDS[1:-1]:
+                        self.assertAlmostEqual(
+                            float(plain[name]), float(explained[name]), places=9
+                        )
+                self.assertEqual(float(outputs[True][0]["category_mult"]), 1.2)
+
+    def test_invalid_record_reports_position(self):
+        """Test that a bad record raises with its 1-based record number."""
+        bad_input = CSV_INPUT.replace("200,low", "0,low")
+        with self.assertRaisesRegex(ValueError, "Record 2"):
+            score_stream(io.StringIO(bad_input), io.StringIO(), input_format="csv")
+
+    def test_out_of_range_numbers_report_position(self):
+        """Test that JSON numbers beyond float range fail as invalid records."""
+        record = json.loads(JSONL_RECORD)
+        for field in ("life_span", "price", "time_use"):
+            line = JSONL_RECORD.replace(
+                f'"{field}": {record[field]}', f'"{field}": 1e400'
+            )
+            with self.subTest(field=field):
+                self.assertIn("1e400", line)
+                with self.assertRaisesRegex(ValueError, "Record 2"):
+                    score_stream(io.StringIO(JSONL_RECORD + line), io.StringIO())
+
+    def test_life_span_must_be_whole_months(self):
+        """Test that fractional, negative and infinite life spans are rejected."""
+        record = json.loads(JSONL_RECORD)
+        self.assertEqual(parse_record(dict(record, life_span="36"))[0]["life_span"], 36)
+        self.assertEqual(parse_record(dict(record, life_span=36.0))[0]["life_span"], 36)
+        for life_span in (11.9, "11.9", -1, float("inf"), float("nan")):
+            with (
+                self.subTest(life_span=life_span),
+                self.assertRaisesRegex(ValueError, "Life span"),
+            ):
+                parse_record(dict(record, life_span=life_span))
+
+    def test_invalid_fields_raise_value_error(self):
+        """Test that odd JSON values surface as ValueError, not other errors."""
+        record = json.loads(JSONL_RECORD)
+        for field, value in (
+            ("life_span", 10**400),
+            ("price", [1]),
+            ("time_use", {"hours": 1}),
+            ("p_useful_if_buy", 10**400),
+            ("life_areas", 5),
+            ("life_areas", ["career", 1]),
+        ):
+            with self.subTest(field=field, value=value), self.assertRaises(ValueError):
+                parse_record(dict(record, **{field: value}))
+
+    def test_cli_reports_unwritable_output(self):
+        """Test that a failed output open is an error, not a traceback."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "input.csv")
+            with open(path, "w", encoding="utf-8", newline="") as file:
+                file.write(CSV_INPUT)
+            output = os.path.join(tmp, "missing", "output.csv")
+            with mock.patch("sys.stderr", io.StringIO()) as stderr:
+                self.assertEqual(score_main([path, "-o", output]), 1)
+            self.assertIn("error:", stderr.getvalue())
+
+
+class TestParallelScoring(unittest.TestCase):
+    """Test cases for process-pool sharded scoring."""
+
+    def setUp(self):
+        header, *rows = CSV_INPUT.splitlines(keepends=True)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "input.csv")
+        with open(self.path, "w", encoding="utf-8", newline="") as file:
+            file.write(header)
+            file.writelines(rows * 20)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_shards_cover_file_on_line_boundaries(self):
+        """Test that shards are contiguous and start at line starts."""
+        shards = plan_shards(self.path, 7, skip_header=True)
+        with open(self.path, "rb") as file:
+            data = file.read()
+        self.assertEqual(shards[0].start, data.index(b"\n") + 1)
+        self.assertEqual(shards[-1].end, len(data))
+        for previous, shard in itertools.pairwise(shards):
+            self.assertEqual(previous.end, shard.start)
+            self.assertEqual(data[shard.start - 1 : shard.start], b"\n")
+
+    def test_parallel_output_is_byte_identical(self):
+        """Test that a parallel run writes exactly what a serial run does."""
+        serial = io.StringIO(newline="")
+        with open(self.path, encoding="utf-8", newline="") as file:
+            score_stream(file, serial, input_format="csv", chunk_size=7)
+
+        output_path = os.path.join(self.tmp.name, "output.csv")
+        stats = score_file_parallel(
+            self.path,
+            output_path,
+            input_format="csv",
+            workers=2,
+            shards=5,
+            chunk_size=7,
+        )
+        self.assertEqual(stats.records, 60)
+        with open(output_path, "rb") as file:
+            self.assertEqual(file.read(), serial.getvalue().encode("utf-8"))
+
+
+@unittest.skipIf(pa is None, "pyarrow is not installed")
+class TestColumnarScoring(unittest.TestCase):
+    """Test cases for Parquet and Arrow scoring."""
+
+    def setUp(self):
+        header, *lines = CSV_INPUT.splitlines()
+        self.raws = [dict(zip(header.split(","), line.split(","))) for line in lines]
+        self.expected = score_chunk(self.raws)
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.tmp.name, name)
+
+    def _input_table(self, life_areas_as_lists: bool = True):
+        rows = []
+        for raw in self.raws:
+            row = {
+                **raw,
+                "price": float(raw["price"]),
+                "time_use": float(raw["time_use"]),
+                "life_span": int(raw["life_span"]),
+            }
+            if life_areas_as_lists:
+                row["life_areas"] = raw["life_areas"].split(";")
+            rows.append(row)
+        return pa.Table.from_pylist(rows)
+
+    def _assert_rows_match(self, rows: list[dict]):
+        self.assertEqual(len(rows), len(self.expected))
+        for row, expected in zip(rows, self.expected):
+            self.assertEqual(row["item_name"], expected["item_name"])
+            self.assertEqual(row["profile_version"], expected["profile_version"])
+            for name, value in expected.items():
+                if isinstance(value, float):
+                    self.assertAlmostEqual(row[name], value, places=9)
+
+    def test_parquet_matches_score_chunk(self):
+        """Test that Parquet output matches score_chunk for every engine."""
+        from .columnar import score_columnar
+
+        source = self._path("input.parquet")
+        table = self._input_table()
+        # Dictionary-encoded categoricals are read as they are
+        table = table.set_column(
+            table.schema.get_field_index("category"),
+            "category",
+            table.column("category").dictionary_encode(),
+        )
+        pq.write_table(table, source)
+        for engine in ("scalar", "batch", "compiled"):
+            with self.subTest(engine=engine):
+                output = self._path(f"{engine}.parquet")
+                count = score_columnar(source, output, "parquet", engine=engine)
+                self.assertEqual(count, 3)
+                self._assert_rows_match(pq.read_table(output).to_pylist())
+
+    def test_string_life_areas_and_row_groups(self):
+        """Test ";"-separated life areas and one row group per chunk."""
+        from .columnar import score_columnar
+
+        source = self._path("input.arrow")
+        with pa.ipc.new_file(source, self._input_table(False).schema) as writer:
+            writer.write_table(self._input_table(False))
+        output = self._path("output.parquet")
+        score_columnar(source, output, "arrow", "parquet", chunk_size=2)
+        self.assertEqual(pq.ParquetFile(output).num_row_groups, 2)
+        self._assert_rows_match(pq.read_table(output).to_pylist())
+
+    def test_explain_adds_trace(self):
+        """Test that explain rows add the trace and keep every scored value."""
+        for engine in ("batch", "compiled", "scalar"):
+            outputs = {}
+            for explain in (False, True):
+                output = io.StringIO()
+                score_stream(
+                    io.StringIO(CSV_INPUT),
+                    output,
+                    input_format="csv",
+                    engine=engine,
+                    explain=explain,
+                )
+                outputs[explain] = list(csv.DictReader(io.StringIO(output.getvalue())))
+            with self.subTest(engine=engine):
+                self.assertEqual(tuple(outputs[False][0]), OUTPUT_FIELDS)
+                self.assertEqual(tuple(outputs[True][0]), EXPLAIN_FIELDS)
+                for plain, explained in zip(outputs[False], outputs[True]):
+                    self.assertEqual(plain["item_name"], explained["item_name"])
+                    for name in OUTPUT_FIELDS[1:-1]:
+                        self.assertAlmostEqual(
+                            float(plain[name]), float(explained[name]), places=9
+                        )
+                self.assertEqual(float(outputs[True][0]["category_mult"]), 1.2)
+
+    def test_invalid_record_reports_position(self):
+        """Test that a bad record raises with its 1-based record number."""
+        from .columnar import score_columnar
+
+        source = self._path("input.parquet")
+        table = self._input_table()
+        prices = table.column("price").to_pylist()
+        prices[2] = 0.0
+        table = table.set_column(1, "price", pa.array(prices))
+        pq.write_table(table, source)
+        with self.assertRaisesRegex(ValueError, "Record 3"):
+            score_columnar(source, io.BytesIO(), "parquet", chunk_size=2)
+
+    def test_fractional_life_span_rejected(self):
+        """Test that columnar life spans must be whole months, as in text input."""
+        from .columnar import score_columnar
+
+        source = self._path("input.parquet")
+        table = self._input_table()
+        index = table.schema.get_field_index("life_span")
+        table = table.set_column(index, "life_span", pa.array([36.0, 11.9, 60.0]))
+        pq.write_table(table, source)
+        with self.assertRaisesRegex(ValueError, "Record 2: Life span"):
+            score_columnar(source, io.BytesIO(), "parquet")
+
+    def test_text_to_parquet(self):
+        """Test that score_stream writes Parquet through a ColumnarWriter."""
+        from .columnar import ColumnarWriter
+
+        output = self._path("output.parquet")
+        writer = ColumnarWriter(output, "parquet")
+        try:
+            score_stream(
+                io.StringIO(CSV_INPUT), None, input_format="csv", writer=writer
+            )
+        finally:
+            writer.close()
+        self._assert_rows_match(pq.read_table(output).to_pylist())
+
+
+class TestUsageEvents(unittest.TestCase):
+    """Test cases for streaming usage events into the usage estimator."""
+
+    JSONL_EVENTS = (
+        '{"category": "efficiency", "life_areas": ["career"], "used": true}\n'
+        '{"category": "efficiency", "life_areas": "career", "used": false}\n'
+        "\n"
+        '{"category": "qol", "life_areas": ["personal", "health"], "used": true}\n'
+    )
+    CSV_EVENTS = (
+        "category,life_areas,used\n"
+        "efficiency,career,1\n"
+        "efficiency,career,false\n"
+        "qol,health;personal,TRUE\n"
+    )
+
+    def test_jsonl_and_csv_match(self):
+        """Test that both formats and any chunk size give the same counts."""
+        states = []
+        for events, input_format in (
+            (self.JSONL_EVENTS, "jsonl"),
+            (self.CSV_EVENTS, "csv"),
+        ):
+            for chunk_size in (1, 2, 100):
+                estimator = UsageEstimator()
+                count = ingest_usage_events(
+                    io.StringIO(events), estimator, input_format, chunk_size
+                )
+                self.assertEqual(count, 3)
+                states.append(estimator.to_dict())
+        self.assertTrue(all(state == states[0] for state in states))
+        self.assertEqual(
+            states[0]["segments"],
+            {"efficiency|career": [1, 2], "qol|personal;health": [1, 1]},
+        )
+
+    def test_invalid_event_reports_position(self):
+        """Test that a bad event raises with its 1-based event number."""
+        for bad in ("efficiency,career,maybe", "efficiency,hobbies,1"):
+            with self.subTest(bad=bad), self.assertRaisesRegex(ValueError, "Event 4"):
+                ingest_usage_events(
+                    io.StringIO(self.CSV_EVENTS + bad + "\n"), UsageEstimator(), "csv"
+                )
+        with self.assertRaisesRegex(ValueError, "Event 1: missing 'used'"):
+            ingest_usage_events(
+                io.StringIO('{"category": "qol", "life_areas": []}\n'),
+                UsageEstimator(),
+            )
+
+    def test_cli_accumulates_state(self):
+        """Test that every run adds its events to the saved state."""
+        with tempfile.TemporaryDirectory() as directory:
+            events = os.path.join(directory, "events.csv")
+            state = os.path.join(directory, "usage.json")
+            with open(events, "w", encoding="utf-8") as file:
+                file.write(self.CSV_EVENTS)
+            for _ in range(2):
+                self.assertEqual(usage_main([events, "--state", state]), 0)
+            posterior = UsageEstimator.load(state).posterior("efficiency", ["career"])
+            self.assertEqual(posterior["events"], 4)
+            self.assertAlmostEqual(posterior["mean"], 3 / 6)
+
+
+class TestScoringServer(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the HTTP scoring service."""
+
+    RECORD: ClassVar[dict] = {
+        "item_name": "Work Laptop",
+        "price": 1000,
+        "income_level": "medium",
+        "life_areas": ["career"],
+        "necessity": "essential",
+        "time_use": 20,
+        "use_probability": "high",
+        "life_span": 36,
+        "category": "efficiency",
+    }
+
+    async def asyncSetUp(self):
+        self.server = ScoringServer(max_delay=0.01)
+        await self.server.start(port=0)
+        self.reader, self.writer = await asyncio.open_connection(
+            "127.0.0.1", self.server.port
+        )
+
+    async def asyncTearDown(self):
+        self.writer.close()
+        await self.server.close()
+
+    async def _request(self, path, payload=None, reader=None, writer=None):
+        reader = reader or self.reader
+        writer = writer or self.writer
+        body = b"" if payload is None else json.dumps(payload).encode()
+        method = "GET" if payload is None else "POST"
+        writer.write(
+            f"{method} {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n".encode()
+            + body
+        )
+        head = await reader.readuntil(b"\r\n\r\n")
+        status = int(head.split()[1])
+        length = int(head.lower().split(b"content-length: ")[1].split(b"\r\n")[0])
+        return status, json.loads(await reader.readexactly(length))
+
+    async def test_health_reports_profile_version(self):
+        """Test that /health names the active weight profile."""
+        status, health = await self._request("/health")
+        self.assertEqual(status, 200)
+        self.assertEqual(health["profile_version"], "builtin")
+
+    async def test_endpoints_match_score_chunk(self):
+        """Test that every endpoint returns its slice of the scored row."""
+        (expected,) = score_chunk([self.RECORD])
+        # One keep-alive connection serves every request
+        status, row = await self._request("/score", self.RECORD)
+        self.assertEqual((status, row), (200, expected))
+        status, rows = await self._request("/utilities", [self.RECORD])
+        self.assertEqual(status, 200)
+        self.assertEqual(rows[0]["u_buy_useful"], expected["u_buy_useful"])
+        self.assertNotIn("eu_buy", rows[0])
+        _, row = await self._request("/expected-utility", self.RECORD)
+        self.assertEqual(row["eu_not_buy"], expected["eu_not_buy"])
+        _, row = await self._request("/breakeven", self.RECORD)
+        self.assertEqual(row["breakeven"], expected["breakeven"])
+
+    async def test_concurrent_requests_are_batched(self):
+        """Test that concurrent requests share one batch and bad ones fail alone."""
+        connections = [
+            await asyncio.open_connection("127.0.0.1", self.server.port)
+            for _ in range(4)
+        ]
+        records = [
+            dict(self.RECORD, item_name="Bad", price=0),
+            dict(self.RECORD, p_useful_if_buy=0.9),
+            self.RECORD,
+            self.RECORD,
+        ]
+        responses = await asyncio.gather(
+            *(
+                self._request("/score", record, reader, writer)
+                for record, (reader, writer) in zip(records, connections)
+            )
+        )
+        batches = self.server.batcher.batch_sizes.count
+        await asyncio.gather(
+            *(
+                self._request("/score", self.RECORD, reader, writer)
+                for reader, writer in connections
+            )
+        )
+        for _, writer in connections:
+            writer.close()
+        self.assertEqual(self.server.batcher.batch_sizes.count, batches + 1)
+
+        self.assertEqual(responses[0][0], 400)
+        self.assertIn("Price must be greater than 0", responses[0][1]["error"])
+        self.assertEqual([status for status, _ in responses[1:]], [200] * 3)
+        self.assertEqual(responses[1][1]["p_useful_if_buy"], 0.9)
+
+        _, metrics = await self._request("/metrics")
+        self.assertEqual(metrics["latency_ms"]["/score"]["count"], 7)
+        self.assertEqual(metrics["errors"], 1)
+
+    async def test_scoring_failure_fails_whole_batch(self):
+        """Test that an unexpected error answers every request in its batch."""
+        connections = [
+            await asyncio.open_connection("127.0.0.1", self.server.port)
+            for _ in range(2)
+        ]
+        with mock.patch.object(
+            self.server.batcher, "_score", side_effect=RuntimeError("out of memory")
+        ):
+            responses = await asyncio.gather(
+                *(
+                    self._request("/score", self.RECORD, reader, writer)
+                    for reader, writer in connections
+                )
+            )
+        for _, writer in connections:
+            writer.close()
+        self.assertEqual([status for status, _ in responses], [500, 500])
+        self.assertIn("out of memory", responses[0][1]["error"])
+
+        status, _ = await self._request("/score", self.RECORD)
+        self.assertEqual(status, 200)
+
+    async def test_errors(self):
+        """Test that bad paths, methods and bodies get HTTP errors."""
+        self.assertEqual((await self._request("/nope"))[0], 404)
+        self.assertEqual((await self._request("/score"))[0], 405)
+        status, body = await self._request("/score", "not a record")
+        self.assertEqual(status, 400)
+        self.assertIn("error", body)
+
+
+if __name__ == "__main__":
+    unittest.main()
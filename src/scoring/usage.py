@@ -0,0 +1,145 @@
+"""
+Streaming ingestion of usage events into the usage estimator.
+
+Usage: python main.py usage [EVENTS] [--state PATH] [--format csv|jsonl]
+                            [--chunk-size N]
+
+Every event says whether a purchase in one segment got used, e.g.
+{"category": "efficiency", "life_areas": ["career"], "used": true} in JSONL,
+or ``category,life_areas,used`` in CSV with life areas separated by ";".
+EVENTS is a file or '-' for stdin, which also stands in for a socket:
+``nc -lk 9000 | python main.py usage -``.
+
+Events are added in chunks. Each distinct category and life areas pair is
+encoded once per run, so a chunk costs a dict lookup per event and one
+bincount, and the estimator state is saved once at the end.
+"""
+
+import argparse
+import sys
+import time
+from collections.abc import Iterable
+
+import numpy as np
+
+from src.calculator import UsageEstimator, default_usage_path
+
+from .cli import open_text, positive_int
+from .stream import (
+    DEFAULT_CHUNK_SIZE,
+    FORMATS,
+    LIFE_AREAS_SEPARATOR,
+    iter_chunks,
+    read_records,
+)
+
+_USED = {"true": True, "1": True, "false": False, "0": False}
+
+
+def parse_used(value) -> bool:
+    """A JSON boolean, or true/false/1/0 as in CSV."""
+    if isinstance(value, bool):
+        return value
+    try:
+        return _USED[str(value).strip().lower()]
+    except KeyError:
+        raise ValueError(f"used must be true or false, not {value!r}") from None
+
+
+def ingest_usage_events(
+    lines: Iterable[str],
+    estimator: UsageEstimator,
+    input_format: str = "jsonl",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> int:
+    """Add every event in ``lines`` to ``estimator``; returns the event count.
+
+    A chunk is only added once all its events parse, so after an error the
+    estimator holds every chunk before the one with the bad event.
+    """
+    segments: dict = {}  # (category, life areas) -> segment index
+    events = 0
+    for chunk in iter_chunks(read_records(lines, input_format), chunk_size):
+        index = np.empty(len(chunk), dtype=np.intp)
+        used = np.empty(len(chunk), dtype=bool)
+        for i, raw in enumerate(chunk):
+            try:
+                areas = raw["life_areas"]
+                if isinstance(areas, list):
+                    areas = tuple(areas)
+                key = (raw["category"], areas)
+                segment = segments.get(key)
+                if segment is None:
+                    if isinstance(areas, str):
+                        areas = [a for a in areas.split(LIFE_AREAS_SEPARATOR) if a]
+                    segment = segments[key] = estimator.segment(key[0], areas)
+                index[i] = segment
+                used[i] = parse_used(raw["used"])
+            except KeyError as error:
+                raise ValueError(f"Event {events + i + 1}: missing {error}") from None
+            except (TypeError, ValueError) as error:
+                raise ValueError(f"Event {events + i + 1}: {error}") from None
+        estimator.observe_segments(index, used)
+        events += len(chunk)
+    return events
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="main.py usage",
+        description="Update the usage estimates with usage events from CSV or JSONL.",
+    )
+    parser.add_argument(
+        "input",
+        nargs="?",
+        default="-",
+        help="Events file, or '-' for stdin (default)",
+    )
+    parser.add_argument(
+        "--state",
+        default=None,
+        help="Estimator state file, created if missing "
+        "(default: $DGSUTILITYAGENCY_USAGE or ~/.dgsutilityagency/usage.json)",
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=FORMATS,
+        help="Input format (default: csv for .csv files, else jsonl)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=positive_int,
+        default=DEFAULT_CHUNK_SIZE,
+        help=f"Events added per chunk (default: {DEFAULT_CHUNK_SIZE})",
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    input_format = args.format or (
+        "csv" if args.input.lower().endswith(".csv") else "jsonl"
+    )
+    state = args.state or default_usage_path()
+    started = time.perf_counter()
+    try:
+        try:
+            estimator = UsageEstimator.load(state)
+        except FileNotFoundError:
+            estimator = UsageEstimator()
+        with open_text(args.input) as instream:
+            events = ingest_usage_events(
+                instream, estimator, input_format, args.chunk_size
+            )
+        estimator.save(state)
+    except (OSError, ValueError) as error:
+        print(f"error: {error}", file=sys.stderr)
+        return 1
+    seconds = time.perf_counter() - started
+    rate = events / seconds if seconds > 0 else 0.0
+    print(
+        f"Added {events:,} usage events in {seconds:.2f}s ({rate:,.0f} events/s)",
+        file=sys.stderr,
+    )
+    return 0